@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Benchmark JSON framing of the CLI's stream-json output.
+
+Compares the incremental JSONFrameDecoder used by SubprocessCLITransport with
+the previous strategy of re-parsing an ever-growing buffer after every chunk.
+
+Usage:
+    python benchmarks/bench_framing.py [--size-mb 4] [--chunk-size 65536]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src._internal.transport.json_framing import JSONFrameDecoder  # noqa: E402
+
+
+def legacy_decode(chunks: list[str]) -> list[Any]:
+    """The pre-framing algorithm: speculative json.loads after every fragment."""
+    objects = []
+    json_buffer = ""
+    for chunk in chunks:
+        line_str = chunk.strip()
+        if not line_str:
+            continue
+        for json_line in line_str.split("\n"):
+            json_line = json_line.strip()
+            if not json_line:
+                continue
+            json_buffer += json_line
+            try:
+                objects.append(json.loads(json_buffer))
+                json_buffer = ""
+            except json.JSONDecodeError:
+                continue
+    return objects
+
+
+def framed_decode(chunks: list[str]) -> list[Any]:
+    decoder = JSONFrameDecoder(max_buffer_size=sys.maxsize)
+    objects = []
+    for chunk in chunks:
+        objects.extend(decoder.feed(chunk))
+    objects.extend(decoder.flush())
+    return objects
+
+
+def make_stream(size_mb: float, message_size: int) -> str:
+    """Build a stream of tool-result messages totalling roughly size_mb."""
+    message = json.dumps(
+        {
+            "type": "user",
+            "message": {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "tool_result",
+                        "tool_use_id": "toolu_bench",
+                        "content": "x" * message_size,
+                    }
+                ],
+            },
+        }
+    )
+    count = max(1, int(size_mb * 1024 * 1024) // len(message))
+    return (message + "\n") * count
+
+
+def run(name: str, fn: Any, chunks: list[str], total_bytes: int) -> dict[str, Any]:
+    start = time.perf_counter()
+    objects = fn(chunks)
+    elapsed = time.perf_counter() - start
+    return {
+        "decoder": name,
+        "messages": len(objects),
+        "seconds": round(elapsed, 4),
+        "mb_per_second": round(total_bytes / (1024 * 1024) / elapsed, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=float, default=4.0)
+    parser.add_argument("--message-size", type=int, default=900 * 1024)
+    parser.add_argument("--chunk-size", type=int, default=64 * 1024)
+    args = parser.parse_args()
+
+    stream = make_stream(args.size_mb, args.message_size)
+    chunks = [
+        stream[i : i + args.chunk_size]
+        for i in range(0, len(stream), args.chunk_size)
+    ]
+
+    results = [
+        run("legacy", legacy_decode, chunks, len(stream)),
+        run("framed", framed_decode, chunks, len(stream)),
+    ]
+    print(json.dumps({"bytes": len(stream), "chunks": len(chunks), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Benchmark CPU saved by message-type pushdown on a tool-heavy session.
+
+Runs the transport's read path (JSON framing, type filtering and
+parse_message) over a synthetic stream of tool calls with large tool
+results, once delivering every message and once with message_types limited
+to the final ResultMessage, as query(..., message_types={ResultMessage}) does.
+
+Usage:
+    python benchmarks/bench_message_filter.py [--tool-calls 2000] [--result-kb 32]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src._internal.message_parser import parse_message  # noqa: E402
+from src._internal.transport.json_framing import JSONFrameDecoder  # noqa: E402
+
+
+def make_stream(tool_calls: int, result_kb: int) -> bytes:
+    """Build a session where every tool call returns result_kb of output."""
+    lines = [{"type": "system", "subtype": "init", "session_id": "bench"}]
+    for i in range(tool_calls):
+        lines.append(
+            {
+                "type": "assistant",
+                "message": {
+                    "model": "claude-opus-4-1-20250805",
+                    "content": [
+                        {"type": "text", "text": f"Reading file {i}."},
+                        {
+                            "type": "tool_use",
+                            "id": f"toolu_{i}",
+                            "name": "Read",
+                            "input": {"file_path": f"/src/module_{i}.py"},
+                        },
+                    ],
+                },
+            }
+        )
+        lines.append(
+            {
+                "type": "user",
+                "message": {
+                    "content": [
+                        {
+                            "type": "tool_result",
+                            "tool_use_id": f"toolu_{i}",
+                            "content": "x = 1\n" * (result_kb * 1024 // 6),
+                        }
+                    ]
+                },
+            }
+        )
+    lines.append(
+        {
+            "type": "result",
+            "subtype": "success",
+            "duration_ms": 1,
+            "duration_api_ms": 1,
+            "is_error": False,
+            "num_turns": tool_calls,
+            "session_id": "bench",
+            "total_cost_usd": 0.5,
+        }
+    )
+    return "".join(json.dumps(line) + "\n" for line in lines).encode()
+
+
+def read_session(chunks: list[bytes], wanted: frozenset[str] | None) -> int:
+    """Mirror SubprocessCLITransport.receive_messages plus parse_message."""
+    decoder = JSONFrameDecoder(max_buffer_size=sys.maxsize)
+    if wanted is not None:
+        decoder.wanted_types = frozenset(t.encode() for t in wanted)
+    delivered = 0
+    for chunk in chunks:
+        for data in decoder.feed(chunk):
+            if wanted is not None and data.get("type") not in wanted:
+                continue
+            parse_message(data)
+            delivered += 1
+    return delivered
+
+
+def run(
+    name: str, chunks: list[bytes], wanted: frozenset[str] | None, repeat: int
+) -> dict[str, Any]:
+    best = float("inf")
+    delivered = 0
+    for _ in range(repeat):
+        start = time.process_time()
+        delivered = read_session(chunks, wanted)
+        best = min(best, time.process_time() - start)
+    return {"mode": name, "delivered": delivered, "cpu_seconds": round(best, 4)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tool-calls", type=int, default=2000)
+    parser.add_argument("--result-kb", type=int, default=32)
+    parser.add_argument("--chunk-size", type=int, default=64 * 1024)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    stream = make_stream(args.tool_calls, args.result_kb)
+    chunks = [
+        stream[i : i + args.chunk_size]
+        for i in range(0, len(stream), args.chunk_size)
+    ]
+
+    results = [
+        run("all", chunks, None, args.repeat),
+        run("result_only", chunks, frozenset({"result"}), args.repeat),
+    ]
+    saved = 1 - results[1]["cpu_seconds"] / results[0]["cpu_seconds"]
+    report = {
+        "bytes": len(stream),
+        "messages": stream.count(b"\n"),
+        "results": results,
+        "cpu_saved": round(saved, 3),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
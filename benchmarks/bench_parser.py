@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""Benchmark parse_message throughput on a typical CLI transcript.
+
+Compares the registry-based parser with the previous implementation, which
+duplicated a `match` over block types for user and assistant messages and
+built every dataclass with keyword arguments.
+
+Usage:
+    python benchmarks/bench_parser.py [--messages 200000] [--repeat 3]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src._errors import MessageParseError  # noqa: E402
+from src._internal.message_parser import parse_message  # noqa: E402
+from src.sdk_types import (  # noqa: E402
+    AssistantMessage,
+    ContentBlock,
+    Message,
+    ResultMessage,
+    SystemMessage,
+    TextBlock,
+    ThinkingBlock,
+    ToolResultBlock,
+    ToolUseBlock,
+    UserMessage,
+)
+
+
+def legacy_parse_message(data: dict[str, Any]) -> Message:
+    """The pre-registry parser, copied verbatim."""
+    if not isinstance(data, dict):
+        raise MessageParseError(
+            f"Invalid message data type (expected dict, got {type(data).__name__})",
+            data,
+        )
+
+    message_type = data.get("type")
+    if not message_type:
+        raise MessageParseError("Message missing 'type' field", data)
+
+    match message_type:
+        case "user":
+            try:
+                if isinstance(data["message"]["content"], list):
+                    user_content_blocks: list[ContentBlock] = []
+                    for block in data["message"]["content"]:
+                        match block["type"]:
+                            case "text":
+                                user_content_blocks.append(
+                                    TextBlock(text=block["text"])
+                                )
+                            case "tool_use":
+                                user_content_blocks.append(
+                                    ToolUseBlock(
+                                        id=block["id"],
+                                        name=sys.intern(block["name"]),
+                                        input=block["input"],
+                                    )
+                                )
+                            case "tool_result":
+                                user_content_blocks.append(
+                                    ToolResultBlock(
+                                        tool_use_id=block["tool_use_id"],
+                                        content=block.get("content"),
+                                        is_error=block.get("is_error"),
+                                    )
+                                )
+                    return UserMessage(content=user_content_blocks)
+                return UserMessage(content=data["message"]["content"])
+            except KeyError as e:
+                raise MessageParseError(
+                    f"Missing required field in user message: {e}", data
+                ) from e
+
+        case "assistant":
+            try:
+                content_blocks: list[ContentBlock] = []
+                for block in data["message"]["content"]:
+                    match block["type"]:
+                        case "text":
+                            content_blocks.append(TextBlock(text=block["text"]))
+                        case "thinking":
+                            content_blocks.append(
+                                ThinkingBlock(
+                                    thinking=block["thinking"],
+                                    signature=block["signature"],
+                                )
+                            )
+                        case "tool_use":
+                            content_blocks.append(
+                                ToolUseBlock(
+                                    id=block["id"],
+                                    name=sys.intern(block["name"]),
+                                    input=block["input"],
+                                )
+                            )
+                        case "tool_result":
+                            content_blocks.append(
+                                ToolResultBlock(
+                                    tool_use_id=block["tool_use_id"],
+                                    content=block.get("content"),
+                                    is_error=block.get("is_error"),
+                                )
+                            )
+
+                return AssistantMessage(
+                    content=content_blocks, model=sys.intern(data["message"]["model"])
+                )
+            except KeyError as e:
+                raise MessageParseError(
+                    f"Missing required field in assistant message: {e}", data
+                ) from e
+
+        case "system":
+            try:
+                return SystemMessage(
+                    subtype=sys.intern(data["subtype"]),
+                    data=data,
+                )
+            except KeyError as e:
+                raise MessageParseError(
+                    f"Missing required field in system message: {e}", data
+                ) from e
+
+        case "result":
+            try:
+                return ResultMessage(
+                    subtype=sys.intern(data["subtype"]),
+                    duration_ms=data["duration_ms"],
+                    duration_api_ms=data["duration_api_ms"],
+                    is_error=data["is_error"],
+                    num_turns=data["num_turns"],
+                    session_id=data["session_id"],
+                    total_cost_usd=data.get("total_cost_usd"),
+                    usage=data.get("usage"),
+                    result=data.get("result"),
+                )
+            except KeyError as e:
+                raise MessageParseError(
+                    f"Missing required field in result message: {e}", data
+                ) from e
+
+        case _:
+            raise MessageParseError(f"Unknown message type: {message_type}", data)
+
+
+def make_transcript(count: int) -> list[dict[str, Any]]:
+    """Build a mix of assistant, tool round-trip, system and result messages."""
+    model = "claude-opus-4-1-20250805"
+    template = [
+        {"type": "system", "subtype": "init", "session_id": "bench"},
+        {
+            "type": "assistant",
+            "message": {
+                "model": model,
+                "content": [
+                    {"type": "thinking", "thinking": "Plan", "signature": "sig"},
+                    {"type": "text", "text": "Reading the file."},
+                    {
+                        "type": "tool_use",
+                        "id": "toolu_1",
+                        "name": "Read",
+                        "input": {"file_path": "/tmp/a.py"},
+                    },
+                ],
+            },
+        },
+        {
+            "type": "user",
+            "message": {
+                "content": [
+                    {
+                        "type": "tool_result",
+                        "tool_use_id": "toolu_1",
+                        "content": "print('hi')",
+                    }
+                ]
+            },
+        },
+        {
+            "type": "assistant",
+            "message": {"model": model, "content": [{"type": "text", "text": "Done."}]},
+        },
+        {
+            "type": "result",
+            "subtype": "success",
+            "duration_ms": 1200,
+            "duration_api_ms": 900,
+            "is_error": False,
+            "num_turns": 2,
+            "session_id": "bench",
+            "total_cost_usd": 0.01,
+            "usage": {"input_tokens": 10, "output_tokens": 20},
+            "result": "Done.",
+        },
+    ]
+    return [template[i % len(template)] for i in range(count)]
+
+
+def run(name: str, fn: Any, messages: list[dict[str, Any]], repeat: int) -> dict:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for data in messages:
+            fn(data)
+        best = min(best, time.perf_counter() - start)
+    return {
+        "parser": name,
+        "messages": len(messages),
+        "seconds": round(best, 4),
+        "messages_per_second": round(len(messages) / best),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    messages = make_transcript(args.messages)
+    results = [
+        run("legacy", legacy_parse_message, messages, args.repeat),
+        run("registry", parse_message, messages, args.repeat),
+    ]
+    speedup = results[1]["messages_per_second"] / results[0]["messages_per_second"]
+    print(json.dumps({"results": results, "speedup": round(speedup, 2)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Benchmark the transport's stdout reading path.
+
+Compares decoding stdout to str before framing (the previous
+TextReceiveStream path) with framing raw bytes and handing slices straight to
+the JSON decoder, using the standard library and, when installed, orjson.
+
+Usage:
+    python benchmarks/bench_stdout_reader.py [--messages 20000] [--chunk-size 65536]
+"""
+
+import argparse
+import codecs
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src._internal.transport.json_framing import (  # noqa: E402
+    JSONFrameDecoder,
+    resolve_json_loads,
+)
+
+
+def text_path(chunks: list[bytes]) -> int:
+    """UTF-8 decode each chunk, split lines as str, json.loads each line."""
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    count = 0
+    for chunk in chunks:
+        buffer += utf8.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            if line.strip():
+                json.loads(line)
+                count += 1
+    return count
+
+
+def bytes_path(chunks: list[bytes], decoder: str) -> int:
+    framer = JSONFrameDecoder(
+        max_buffer_size=sys.maxsize, loads=resolve_json_loads(decoder)
+    )
+    count = 0
+    for chunk in chunks:
+        count += len(framer.feed(chunk))
+    return count + len(framer.flush())
+
+
+def make_stream(messages: int) -> bytes:
+    """A tool-heavy session: small assistant messages with periodic large results."""
+    assistant = {
+        "type": "assistant",
+        "message": {
+            "role": "assistant",
+            "model": "claude-opus-4-1-20250805",
+            "content": [{"type": "text", "text": "Lendo o arquivo… " * 8}],
+        },
+    }
+    tool_result = {
+        "type": "user",
+        "message": {
+            "role": "user",
+            "content": [
+                {
+                    "type": "tool_result",
+                    "tool_use_id": "toolu_bench",
+                    "content": "linha de código ✓\n" * 2000,
+                }
+            ],
+        },
+    }
+    lines = []
+    for i in range(messages):
+        message = tool_result if i % 20 == 0 else assistant
+        lines.append(json.dumps(message, ensure_ascii=False))
+    return ("\n".join(lines) + "\n").encode()
+
+
+def run(name: str, fn: Any, chunks: list[bytes], total_bytes: int) -> dict[str, Any]:
+    start = time.perf_counter()
+    count = fn(chunks)
+    elapsed = time.perf_counter() - start
+    return {
+        "reader": name,
+        "messages": count,
+        "seconds": round(elapsed, 4),
+        "mb_per_second": round(total_bytes / (1024 * 1024) / elapsed, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--chunk-size", type=int, default=64 * 1024)
+    args = parser.parse_args()
+
+    stream = make_stream(args.messages)
+    chunks = [
+        stream[i : i + args.chunk_size]
+        for i in range(0, len(stream), args.chunk_size)
+    ]
+
+    results = [
+        run("text+json", text_path, chunks, len(stream)),
+        run("bytes+json", lambda c: bytes_path(c, "json"), chunks, len(stream)),
+    ]
+    try:
+        import orjson  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        results.append(
+            run("bytes+orjson", lambda c: bytes_path(c, "orjson"), chunks, len(stream))
+        )
+
+    print(json.dumps({"bytes": len(stream), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,9 +7,28 @@ from ._errors import (
     CLINotFoundError,
     ProcessError,
 )
+from ._internal.message_parser import (
+    LazyContentBlocks,
+    register_block_parser,
+    register_message_parser,
+)
 from ._internal.transport import Transport
-from .client import ClaudeSDKClient
-from .query import query
+from ._internal.transport.cli_discovery import (
+    cli_version,
+    find_cli,
+    invalidate_cli_cache,
+)
+from ._internal.transport.recording import (
+    RecordingTransport,
+    ReplayTransport,
+    TransportRecording,
+)
+from ._internal.transport.shutdown import ShutdownReport, close_all
+from .cache import CacheStats, QueryCache
+from .client import ClaudeSDKClient, ResponseTiming
+from .multiplex import ClaudeSessionMultiplexer, MultiplexedSession
+from .pool import ClaudeProcessPool, PoolStats
+from .query import QueryBatch, QueryResult, query, query_many
 from .sdk_types import (
     AssistantMessage,
     ClaudeCodeOptions,
@@ -18,6 +37,7 @@ from .sdk_types import (
     Message,
     PermissionMode,
     ResultMessage,
+    StreamEvent,
     SystemMessage,
     TextBlock,
     ThinkingBlock,
@@ -25,15 +45,45 @@ from .sdk_types import (
     ToolUseBlock,
     UserMessage,
 )
+from .single_flight import SingleFlight
 
 __version__ = "0.0.20"
 
 __all__ = [
     # Main exports
     "query",
+    "query_many",
+    "QueryBatch",
+    "QueryResult",
     # Transport
     "Transport",
+    "RecordingTransport",
+    "ReplayTransport",
+    "TransportRecording",
+    # Shutdown
+    "close_all",
+    "ShutdownReport",
+    # CLI discovery
+    "find_cli",
+    "cli_version",
+    "invalidate_cli_cache",
+    # Message parsing
+    "register_message_parser",
+    "register_block_parser",
+    "LazyContentBlocks",
     "ClaudeSDKClient",
+    "ResponseTiming",
+    # Result cache
+    "QueryCache",
+    "CacheStats",
+    # Deduplication
+    "SingleFlight",
+    # Process pool
+    "ClaudeProcessPool",
+    "PoolStats",
+    # Session multiplexing
+    "ClaudeSessionMultiplexer",
+    "MultiplexedSession",
     # Types
     "PermissionMode",
     "McpServerConfig",
@@ -41,6 +91,7 @@ __all__ = [
     "AssistantMessage",
     "SystemMessage",
     "ResultMessage",
+    "StreamEvent",
     "Message",
     "ClaudeCodeOptions",
     "TextBlock",
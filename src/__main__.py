@@ -4,14 +4,19 @@ Claude Code SDK - Interface de linha de comando interativa
 
 Uso:
     python -m claude_code_sdk                    # Modo interativo
+    python -m claude_code_sdk --timings          # Modo interativo com latências
     python -m claude_code_sdk "Sua pergunta"     # Query única
     python -m claude_code_sdk --chat             # Modo chat contínuo
+    python -m claude_code_sdk --batch in.jsonl --out out.jsonl --workers 8
+    python -m claude_code_sdk bench --out bench.json   # Mede o overhead do SDK
     python -m claude_code_sdk --example          # Executar exemplos
     python -m claude_code_sdk --help             # Ajuda
 """
 
 import anyio
 import sys
+import json
+import time
 import argparse
 from typing import Optional
 from pathlib import Path
@@ -25,6 +30,7 @@ from . import (
     ResultMessage,
     __version__
 )
+from ._internal.line_reader import AsyncLineReader
 
 
 def print_header():
@@ -65,31 +71,120 @@ async def single_query(prompt: str, options: Optional[ClaudeCodeOptions] = None)
     return True
 
 
-async def interactive_mode():
-    """Modo interativo - permite múltiplas perguntas."""
+async def connect_client(options: Optional[ClaudeCodeOptions] = None):
+    """Inicia um processo do CLI e retorna o cliente e o tempo de spawn."""
+    inicio = time.perf_counter()
+    client = ClaudeSDKClient(options)
+    await client.connect()
+    return client, time.perf_counter() - inicio
+
+
+async def receive_with_interrupt(
+    client: ClaudeSDKClient, reader: AsyncLineReader, on_message
+):
+    """Recebe a resposta atual; no terminal, Enter interrompe o Claude.
+    
+    A leitura continua pendente se a resposta terminar antes, e a linha vai
+    para o próximo readline() do reader.
+    """
+    async with anyio.create_task_group() as tg:
+        async def aguarda_interrupcao():
+            await reader.readline()
+            print("\n⏹️  Interrompendo...")
+            try:
+                await client.interrupt()
+            except Exception as e:
+                print(f"\n❌ Erro ao interromper: {e}")
+        
+        if reader.isatty():
+            tg.start_soon(aguarda_interrupcao)
+        async for message in client.receive_response():
+            on_message(message)
+        tg.cancel_scope.cancel()
+
+
+async def client_query(
+    client: ClaudeSDKClient, prompt: str, reader: Optional[AsyncLineReader] = None
+):
+    """Executa uma pergunta no processo já aberto do cliente."""
+    print(f"\n🔍 Pergunta: {prompt}")
+    print("-" * 40)
+    
+    try:
+        await client.query(prompt)
+        await receive_with_interrupt(
+            client, reader or AsyncLineReader(), print_response
+        )
+        print()
+    except Exception as e:
+        print(f"\n❌ Erro: {e}")
+        return False
+    return True
+
+
+def print_timings(spawn: Optional[float], timing):
+    """Imprime as latências de um turno (spawn, primeiro token, total)."""
+    def ms(segundos):
+        return "-" if segundos is None else f"{segundos * 1000:.0f} ms"
+    
+    spawn_texto = "reutilizado" if spawn is None else ms(spawn)
+    print(
+        f"⏱️  spawn: {spawn_texto} | primeiro token: {ms(timing.time_to_first_token)}"
+        f" | total: {ms(timing.duration)}"
+    )
+
+
+async def interactive_mode(
+    options: Optional[ClaudeCodeOptions] = None,
+    timings: bool = False,
+    stateless: bool = False,
+):
+    """Modo interativo - reutiliza um único processo do CLI entre perguntas.
+    
+    Com stateless=True o contexto é descartado a cada turno: o processo usado
+    é encerrado e outro é iniciado logo em seguida, aquecendo enquanto o
+    usuário digita a próxima pergunta.
+    """
     print("\n💬 Modo Interativo")
     print("Digite suas perguntas (ou 'sair' para terminar)")
     print("-" * 60)
     
-    while True:
-        try:
-            prompt = input("\n👤 Você: ").strip()
-            
-            if prompt.lower() in ['sair', 'exit', 'quit', 'q']:
+    reader = AsyncLineReader()
+    if reader.isatty():
+        print("⏹️  Pressione Enter durante uma resposta para interrompê-la")
+    client, spawn = await connect_client(options)
+    try:
+        while True:
+            try:
+                prompt = (await reader.readline("\n👤 Você: ")).strip()
+                
+                if prompt.lower() in ['sair', 'exit', 'quit', 'q']:
+                    print("\n👋 Até logo!")
+                    break
+                
+                if not prompt:
+                    continue
+                
+                sucesso = await client_query(client, prompt, reader)
+                if sucesso and timings and client.last_timing is not None:
+                    print_timings(spawn, client.last_timing)
+                
+                if stateless or not sucesso:
+                    # O processo antigo precisa ser encerrado antes de abrir
+                    # o novo, na mesma task que o abriu
+                    await client.disconnect()
+                    client, spawn = await connect_client(options)
+                else:
+                    spawn = None
+                
+            except KeyboardInterrupt:
+                print("\n\n👋 Interrompido pelo usuário!")
+                break
+            except EOFError:
                 print("\n👋 Até logo!")
                 break
-            
-            if not prompt:
-                continue
-            
-            await single_query(prompt)
-            
-        except KeyboardInterrupt:
-            print("\n\n👋 Interrompido pelo usuário!")
-            break
-        except EOFError:
-            print("\n👋 Até logo!")
-            break
+    finally:
+        await client.disconnect()
 
 
 async def chat_mode():
@@ -98,10 +193,23 @@ async def chat_mode():
     print("Digite suas mensagens (ou 'sair' para terminar)")
     print("-" * 60)
     
+    reader = AsyncLineReader()
+    if reader.isatty():
+        print("⏹️  Pressione Enter durante uma resposta para interrompê-la")
+    
+    def mostra_mensagem(message):
+        if isinstance(message, AssistantMessage):
+            for block in message.content:
+                if isinstance(block, TextBlock):
+                    print(block.text, end="", flush=True)
+        elif isinstance(message, ResultMessage):
+            if message.total_cost_usd:
+                print(f"\n💰 Custo: ${message.total_cost_usd:.6f}")
+    
     async with ClaudeSDKClient() as client:
         while True:
             try:
-                prompt = input("\n👤 Você: ").strip()
+                prompt = (await reader.readline("\n👤 Você: ")).strip()
                 
                 if prompt.lower() in ['sair', 'exit', 'quit', 'q']:
                     print("\n👋 Até logo!")
@@ -113,16 +221,9 @@ async def chat_mode():
                 # Envia mensagem
                 await client.query(prompt)
                 
-                # Recebe resposta
+                # Recebe resposta (a entrada continua sendo lida em paralelo)
                 print("\n📝 Claude: ", end="", flush=True)
-                async for message in client.receive_response():
-                    if isinstance(message, AssistantMessage):
-                        for block in message.content:
-                            if isinstance(block, TextBlock):
-                                print(block.text, end="", flush=True)
-                    elif isinstance(message, ResultMessage):
-                        if message.total_cost_usd:
-                            print(f"\n💰 Custo: ${message.total_cost_usd:.6f}")
+                await receive_with_interrupt(client, reader, mostra_mensagem)
                 print()
                 
             except KeyboardInterrupt:
@@ -133,6 +234,248 @@ async def chat_mode():
                 break
 
 
+def parse_batch_line(line: str, numero: int):
+    """Extrai (id, prompt) de uma linha do arquivo de lote.
+    
+    Aceita {"id": ..., "prompt": ...} ou uma string JSON; sem "id", o número
+    da linha é usado, o que mantém os ids estáveis ao retomar o lote.
+    """
+    dados = json.loads(line)
+    if isinstance(dados, str):
+        return numero, dados
+    if not isinstance(dados, dict) or not isinstance(dados.get("prompt"), str):
+        raise ValueError('esperado {"id": ..., "prompt": "..."} ou uma string')
+    return dados.get("id", numero), dados["prompt"]
+
+
+def batch_key(item_id) -> str:
+    """Chave de comparação de um id: o próprio valor JSON, então 1 e "1"
+    são ids diferentes."""
+    return json.dumps(item_id, sort_keys=True)
+
+
+def read_done_ids(path: Path) -> set:
+    """Chaves (batch_key) dos ids que já terminaram com sucesso num arquivo
+    de resultados.
+    
+    Ids que falharam não entram, então rodam de novo ao retomar; a linha
+    nova vem depois da antiga e é a que vale. Linhas inválidas são ignoradas.
+    """
+    feitos = set()
+    if not path.exists():
+        return feitos
+    with open(path, encoding="utf-8") as arquivo:
+        for linha in arquivo:
+            try:
+                registro = json.loads(linha)
+                if registro["ok"] is True:
+                    feitos.add(batch_key(registro["id"]))
+            except (ValueError, KeyError, TypeError):
+                # Linha cortada por uma interrupção; o prompt roda de novo
+                continue
+    return feitos
+
+
+async def read_lines(arquivo, tamanho: int = 64 * 1024):
+    """Lê as linhas de um arquivo binário em blocos de até `tamanho` bytes.
+    
+    Cada bloco custa um salto para uma thread, não cada linha; read1 devolve
+    o que já estiver disponível, então um pipe não espera o bloco encher.
+    As linhas saem em bytes; quem lê decodifica cada uma e trata os erros.
+    """
+    entrada = anyio.wrap_file(arquivo)
+    resto = b""
+    while True:
+        bloco = await entrada.read1(tamanho)
+        if not bloco:
+            break
+        *linhas, resto = (resto + bloco).split(b"\n")
+        for linha in linhas:
+            yield linha
+    if resto:
+        yield resto
+
+
+def ends_with_newline(path: Path) -> bool:
+    """Se o último byte de um arquivo não vazio é uma quebra de linha."""
+    with open(path, "rb") as arquivo:
+        arquivo.seek(-1, 2)
+        return arquivo.read(1) == b"\n"
+
+
+def batch_record(item_id, messages, error: Optional[BaseException] = None) -> dict:
+    """Monta a linha de resultado de um prompt do lote."""
+    result = next((m for m in messages if isinstance(m, ResultMessage)), None)
+    texto = result.result if result is not None else None
+    if texto is None:
+        texto = "".join(
+            block.text
+            for m in messages if isinstance(m, AssistantMessage)
+            for block in m.content if isinstance(block, TextBlock)
+        ) or None
+    if error is None and result is None:
+        error = RuntimeError("resposta terminou sem ResultMessage")
+    return {
+        "id": item_id,
+        "ok": error is None and not result.is_error,
+        "result": texto,
+        "session_id": result.session_id if result else None,
+        "total_cost_usd": result.total_cost_usd if result else None,
+        "duration_ms": result.duration_ms if result else None,
+        "duration_api_ms": result.duration_api_ms if result else None,
+        "num_turns": result.num_turns if result else None,
+        "error": None if error is None else str(error),
+    }
+
+
+async def batch_mode(
+    input_path: str,
+    out_path: Optional[str] = None,
+    workers: int = 4,
+    options: Optional[ClaudeCodeOptions] = None,
+):
+    """Modo lote - roda os prompts de um JSONL em paralelo, com no máximo
+    `workers` ao mesmo tempo.
+    
+    A entrada (arquivo ou '-' para stdin) é lida em blocos, e a próxima linha
+    só é processada quando há um worker livre. Cada resultado é gravado como
+    uma linha JSON assim que termina. Com --out, ids que já terminaram com
+    sucesso são pulados e os que falharam são tentados outra vez, então
+    rodar de novo o mesmo comando retoma um lote interrompido.
+    
+    Retorna (sucessos, falhas, pulados).
+    """
+    if out_path is None or out_path == "-":
+        saida = sys.stdout
+        feitos = set()
+    else:
+        destino = Path(out_path)
+        feitos = read_done_ids(destino)
+        saida = open(destino, "a", encoding="utf-8")
+        if saida.tell() and not ends_with_newline(destino):
+            # Termina a linha cortada para não colar o próximo resultado nela
+            saida.write("\n")
+    entrada = sys.stdin.buffer if input_path == "-" else open(input_path, "rb")
+    
+    limiter = anyio.CapacityLimiter(workers)
+    contagem = {"ok": 0, "falhas": 0, "pulados": 0}
+    
+    def grava(registro):
+        saida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        saida.flush()
+        contagem["ok" if registro["ok"] else "falhas"] += 1
+    
+    async def roda(token, item_id, prompt):
+        messages = []
+        erro = None
+        try:
+            async for message in query(
+                prompt=prompt,
+                options=options,
+                message_types=(AssistantMessage, ResultMessage),
+            ):
+                messages.append(message)
+        except Exception as e:
+            erro = e
+        finally:
+            limiter.release_on_behalf_of(token)
+        grava(batch_record(item_id, messages, erro))
+    
+    try:
+        async with anyio.create_task_group() as tg:
+            numero = 0
+            async for linha in read_lines(entrada):
+                numero += 1
+                if not linha.strip():
+                    continue
+                try:
+                    item_id, prompt = parse_batch_line(linha.decode("utf-8"), numero)
+                except ValueError as e:
+                    # Inclui UnicodeDecodeError: só esta linha falha
+                    item_id, prompt, motivo = numero, None, e
+                chave = batch_key(item_id)
+                if chave in feitos:
+                    contagem["pulados"] += 1
+                    continue
+                feitos.add(chave)
+                if prompt is None:
+                    grava(batch_record(item_id, [], ValueError(f"linha {numero}: {motivo}")))
+                    continue
+                
+                token = object()
+                await limiter.acquire_on_behalf_of(token)
+                tg.start_soon(roda, token, item_id, prompt)
+    finally:
+        if entrada is not sys.stdin.buffer:
+            entrada.close()
+        if saida is not sys.stdout:
+            saida.close()
+    
+    return contagem["ok"], contagem["falhas"], contagem["pulados"]
+
+
+async def bench_mode(argv: list):
+    """Subcomando bench - mede o overhead do SDK contra um CLI falso local.
+    
+    Nenhum modelo é chamado: o CLI falso responde na hora com stream-json
+    sintético. O relatório JSON vai para --out (ou stdout) e o resumo para
+    stderr, para acompanhar regressões entre versões.
+    """
+    from ._internal.bench import BenchConfig, run_benchmarks
+    
+    padrao = BenchConfig()
+    parser = argparse.ArgumentParser(
+        prog="python -m claude_code_sdk bench",
+        description="Mede spawn, parsing, memória e overhead do SDK sem chamar o modelo",
+    )
+    parser.add_argument("--iterations", type=int, default=padrao.iterations,
+                        help="Amostras por medição de latência")
+    parser.add_argument("--messages", type=int, default=padrao.messages,
+                        help="Mensagens do assistente no teste de vazão")
+    parser.add_argument("--message-bytes", type=int, default=padrao.message_bytes,
+                        help="Bytes de texto por mensagem")
+    parser.add_argument("--delay", type=float, default=padrao.delay,
+                        help="Segundos de espera do CLI falso antes de cada mensagem")
+    parser.add_argument("--split-bytes", type=int, default=padrao.split_bytes,
+                        help="Tamanho de cada write do CLI falso (0 = linha inteira)")
+    parser.add_argument("--sessions", type=int, default=padrao.sessions,
+                        help="Clientes simultâneos na medição de memória")
+    parser.add_argument("--cli-path",
+                        help="Executável a medir no lugar do CLI falso embutido")
+    parser.add_argument("--out", metavar="ARQUIVO",
+                        help="Grava o relatório JSON aqui em vez do stdout")
+    args = parser.parse_args(argv)
+    
+    config = BenchConfig(
+        iterations=args.iterations,
+        messages=args.messages,
+        message_bytes=args.message_bytes,
+        delay=args.delay,
+        split_bytes=args.split_bytes,
+        sessions=args.sessions,
+        cli_path=args.cli_path,
+    )
+    report = await run_benchmarks(config)
+    
+    texto = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(texto + "\n", encoding="utf-8")
+    else:
+        print(texto)
+    
+    r = report["results"]
+    print(
+        f"⏱️  spawn p50: {r['spawn_ms']['p50']:.1f} ms"
+        f" | query() p50: {r['query_ms']['p50']:.1f} ms"
+        f" | turno p50: {r['client_turn_ms']['p50']:.2f} ms\n"
+        f"📈 parsing: {r['parse']['messages_per_s']:.0f} msg/s"
+        f" ({r['parse']['mb_per_s']:.1f} MB/s)"
+        f" | memória: {r['memory_per_session_bytes'] / 1024:.1f} KiB/sessão",
+        file=sys.stderr,
+    )
+    return report
+
+
 async def run_examples():
     """Executa exemplos demonstrativos."""
     print("\n🎯 Executando Exemplos")
@@ -157,16 +500,25 @@ async def run_examples():
 
 async def main():
     """Função principal do CLI."""
+    if sys.argv[1:2] == ["bench"]:
+        await bench_mode(sys.argv[2:])
+        return
+    
     parser = argparse.ArgumentParser(
         description="Claude Code SDK - Interface de linha de comando",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Exemplos:
   python -m claude_code_sdk                        # Modo interativo
+  python -m claude_code_sdk --timings              # Mostra latência de cada turno
+  python -m claude_code_sdk --stateless            # Sem contexto entre perguntas
   python -m claude_code_sdk "Quanto é 2+2?"        # Query única
   python -m claude_code_sdk --chat                 # Modo chat com contexto
   python -m claude_code_sdk --example              # Executar exemplos
   python -m claude_code_sdk --tools Read,Write     # Com ferramentas específicas
+  python -m claude_code_sdk --batch in.jsonl --out out.jsonl --workers 8
+                                                   # Lote em paralelo, retomável
+  python -m claude_code_sdk bench --out bench.json # Benchmark offline do SDK
   
         """
     )
@@ -201,6 +553,37 @@ Exemplos:
         help="System prompt personalizado"
     )
     
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Modo interativo: mostra spawn, primeiro token e tempo total por turno"
+    )
+    
+    parser.add_argument(
+        "--stateless",
+        action="store_true",
+        help="Modo interativo: descarta o contexto a cada pergunta"
+    )
+    
+    parser.add_argument(
+        "--batch",
+        metavar="ARQUIVO",
+        help='Modo lote: JSONL com {"id", "prompt"} por linha ("-" para stdin)'
+    )
+    
+    parser.add_argument(
+        "--out",
+        metavar="ARQUIVO",
+        help="Modo lote: grava os resultados aqui e pula ids que já deram certo"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Modo lote: prompts rodando ao mesmo tempo (padrão: 4)"
+    )
+    
     parser.add_argument(
         "--version", "-v",
         action="version",
@@ -214,9 +597,13 @@ Exemplos:
     )
     
     args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers precisa ser >= 1")
+    if args.out and not args.batch:
+        parser.error("--out só vale com --batch")
     
-    # Mostra cabeçalho (a menos que --no-header)
-    if not args.no_header:
+    # Mostra cabeçalho (a menos que --no-header); no lote o stdout é só JSONL
+    if not args.no_header and not args.batch:
         print_header()
     
     # Prepara opções se necessário
@@ -232,6 +619,18 @@ Exemplos:
         # Determina modo de execução
         if args.example:
             await run_examples()
+        elif args.batch:
+            inicio = time.perf_counter()
+            sucessos, falhas, pulados = await batch_mode(
+                args.batch, args.out, args.workers, options
+            )
+            print(
+                f"📦 Lote: {sucessos} ok, {falhas} com erro, {pulados} já feitos"
+                f" em {time.perf_counter() - inicio:.1f}s",
+                file=sys.stderr,
+            )
+            if falhas:
+                sys.exit(1)
         elif args.chat:
             await chat_mode()
         elif args.prompt:
@@ -239,7 +638,7 @@ Exemplos:
             await single_query(args.prompt, options)
         else:
             # Modo interativo padrão
-            await interactive_mode()
+            await interactive_mode(options, args.timings, args.stateless)
     
     except KeyboardInterrupt:
         print("\n\n👋 Interrompido pelo usuário!")
@@ -0,0 +1,248 @@
+"""Offline benchmarks of SDK overhead, run against the bundled fake CLI.
+
+Every measurement talks to a real subprocess through the real transport, but
+the process is ``fake_cli.py``, which answers instantly with scripted output.
+What is left is the SDK's own cost: process spawn, framing and parsing, and
+per-session memory.
+"""
+
+import atexit
+import platform
+import shlex
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import AsyncExitStack, aclosing
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from ..client import ClaudeSDKClient
+from ..query import query
+from ..sdk_types import AssistantMessage, ClaudeCodeOptions, ResultMessage
+from .transport.subprocess_cli import SubprocessCLITransport, idle_stream
+
+FAKE_CLI_PATH = Path(__file__).with_name("fake_cli.py")
+
+_launcher: str | None = None
+
+
+def fake_cli_launcher() -> str:
+    """
+    Return an executable that runs the fake CLI with this interpreter.
+
+    Transports launch ``cli_path`` directly, but fake_cli.py cannot be run
+    that way once installed: wheels drop the executable bit, and
+    ``python3`` on PATH may not be the interpreter running the SDK. The
+    launcher is a small wrapper script written once per process into a
+    private temporary directory and removed at exit.
+    """
+    global _launcher
+    if _launcher is not None and Path(_launcher).exists():
+        return _launcher
+    directory = Path(tempfile.mkdtemp(prefix="claude-fake-cli-"))
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    if sys.platform == "win32":
+        path = directory / "claude.cmd"
+        script = f'@"{sys.executable}" "{FAKE_CLI_PATH}" %*\r\n'
+    else:
+        path = directory / "claude"
+        script = (
+            "#!/bin/sh\n"
+            f"exec {shlex.quote(sys.executable)} {shlex.quote(str(FAKE_CLI_PATH))} "
+            '"$@"\n'
+        )
+    path.write_text(script, newline="")
+    path.chmod(0o700)
+    _launcher = str(path)
+    return _launcher
+
+
+# Bump when the report layout changes, so stored reports stay comparable
+REPORT_SCHEMA = 1
+
+
+@dataclass
+class BenchConfig:
+    """What to run and how big the scripted responses are."""
+
+    iterations: int = 20  # Samples for each latency measurement
+    messages: int = 1000  # Assistant messages in the throughput turn
+    message_bytes: int = 1024  # Text bytes per assistant message
+    delay: float = 0.0  # Seconds the fake CLI waits before each message
+    split_bytes: int = 0  # Fake CLI write size; 0 writes whole lines
+    sessions: int = 8  # Concurrent clients for the memory measurement
+    cli_path: str | None = None  # Defaults to fake_cli_launcher()
+
+
+def fake_cli_options(
+    messages: int = 1, message_bytes: int = 64, delay: float = 0.0, split_bytes: int = 0
+) -> ClaudeCodeOptions:
+    """Options whose env configures the fake CLI's responses."""
+    return ClaudeCodeOptions(
+        env={
+            "CLAUDE_FAKE_MESSAGES": str(messages),
+            "CLAUDE_FAKE_MESSAGE_BYTES": str(message_bytes),
+            "CLAUDE_FAKE_DELAY": str(delay),
+            "CLAUDE_FAKE_SPLIT_BYTES": str(split_bytes),
+        }
+    )
+
+
+def _latency_stats(samples: list[float]) -> dict[str, float]:
+    """Summarize samples given in seconds, in milliseconds."""
+    ordered = sorted(s * 1000 for s in samples)
+    return {
+        "n": len(ordered),
+        "min": round(ordered[0], 3),
+        "mean": round(statistics.fmean(ordered), 3),
+        "p50": round(statistics.median(ordered), 3),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+class _Runner:
+    def __init__(self, config: BenchConfig):
+        self.config = config
+        self.cli_path = config.cli_path or fake_cli_launcher()
+        self.options = fake_cli_options(
+            delay=config.delay, split_bytes=config.split_bytes
+        )
+
+    async def spawn(self) -> list[float]:
+        """Seconds from connect() until the process's first message arrives."""
+        samples = []
+        for _ in range(self.config.iterations):
+            transport = SubprocessCLITransport(
+                prompt=idle_stream(), options=self.options, cli_path=self.cli_path
+            )
+            started = time.perf_counter()
+            try:
+                await transport.connect()
+                async with aclosing(transport.receive_messages()) as messages:
+                    async for _message in messages:
+                        break
+                samples.append(time.perf_counter() - started)
+            finally:
+                await transport.disconnect()
+        return samples
+
+    async def one_shot(self) -> tuple[list[float], list[float]]:
+        """Wall time of query() calls, and that time minus the CLI's own."""
+        wall, overhead = [], []
+        for _ in range(self.config.iterations):
+            transport = SubprocessCLITransport(
+                prompt="ping",
+                options=self.options,
+                cli_path=self.cli_path,
+                close_stdin_after_prompt=True,
+            )
+            started = time.perf_counter()
+            result = None
+            async for message in query(
+                prompt="ping", options=self.options, transport=transport
+            ):
+                if isinstance(message, ResultMessage):
+                    result = message
+            elapsed = time.perf_counter() - started
+            wall.append(elapsed)
+            if result is not None:
+                overhead.append(elapsed - result.duration_ms / 1000)
+        return wall, overhead
+
+    async def client_turns(self) -> list[float]:
+        """Seconds per query/response turn on one already running client."""
+        samples = []
+        async with ClaudeSDKClient(self.options, cli_path=self.cli_path) as client:
+            for _ in range(self.config.iterations + 1):
+                started = time.perf_counter()
+                await client.query("ping")
+                async for _message in client.receive_response():
+                    pass
+                samples.append(time.perf_counter() - started)
+        # The first turn also waits for the process to start
+        return samples[1:]
+
+    async def throughput(self) -> dict[str, float]:
+        """Messages and bytes per second through framing and parsing."""
+        config = self.config
+        options = fake_cli_options(
+            messages=config.messages,
+            message_bytes=config.message_bytes,
+            delay=config.delay,
+            split_bytes=config.split_bytes,
+        )
+        best = float("inf")
+        async with ClaudeSDKClient(options, cli_path=self.cli_path) as client:
+            # Best of several turns; the first also waits for process startup
+            for _ in range(4):
+                started = time.perf_counter()
+                await client.query("ping")
+                received = 0
+                async for message in client.receive_response():
+                    if isinstance(message, AssistantMessage):
+                        received += 1
+                best = min(best, time.perf_counter() - started)
+        if received != config.messages:
+            raise RuntimeError(
+                f"Expected {config.messages} assistant messages, got {received}"
+            )
+        return {
+            "messages": config.messages,
+            "seconds": round(best, 6),
+            "messages_per_s": round(config.messages / best, 1),
+            "mb_per_s": round(config.messages * config.message_bytes / best / 1e6, 3),
+        }
+
+    async def memory_per_session(self) -> int:
+        """Python heap bytes held by each connected client after one turn."""
+        sessions = self.config.sessions
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            # Transports must be torn down in reverse order of connection
+            async with AsyncExitStack() as stack:
+                for _ in range(sessions):
+                    client = await stack.enter_async_context(
+                        ClaudeSDKClient(self.options, cli_path=self.cli_path)
+                    )
+                    await client.query("ping")
+                    async for _message in client.receive_response():
+                        pass
+                held = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+        return held // sessions
+
+
+async def run_benchmarks(config: BenchConfig | None = None) -> dict[str, Any]:
+    """Run every benchmark and return a JSON-serializable report."""
+    from .. import __version__
+
+    config = config or BenchConfig()
+    if config.iterations < 1:
+        raise ValueError("iterations must be >= 1")
+    runner = _Runner(config)
+
+    query_wall, query_overhead = await runner.one_shot()
+    results: dict[str, Any] = {
+        "spawn_ms": _latency_stats(await runner.spawn()),
+        "query_ms": _latency_stats(query_wall),
+        "query_overhead_ms": _latency_stats(query_overhead),
+        "client_turn_ms": _latency_stats(await runner.client_turns()),
+        "parse": await runner.throughput(),
+        "memory_per_session_bytes": await runner.memory_per_session(),
+    }
+    return {
+        "schema": REPORT_SCHEMA,
+        "sdk_version": __version__,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "config": {**asdict(config), "cli_path": runner.cli_path},
+        "results": results,
+    }
@@ -7,6 +7,7 @@ from ..sdk_types import (
     ClaudeCodeOptions,
     Message,
 )
+from .message_filter import receive_filtered
 from .message_parser import parse_message
 from .transport import Transport
 from .transport.subprocess_cli import SubprocessCLITransport
@@ -23,8 +24,12 @@ class InternalClient:
         prompt: str | AsyncIterable[dict[str, Any]],
         options: ClaudeCodeOptions,
         transport: Transport | None = None,
+        message_types: frozenset[str] | None = None,
     ) -> AsyncIterator[Message]:
-        """Process a query through transport."""
+        """Process a query through transport.
+
+        message_types holds the CLI "type" values to deliver; None delivers all.
+        """
 
         # Use provided transport or choose one based on configuration
         if transport is not None:
@@ -37,8 +42,8 @@ class InternalClient:
         try:
             await chosen_transport.connect()
 
-            async for data in chosen_transport.receive_messages():
-                yield parse_message(data)
+            async for data in receive_filtered(chosen_transport, message_types):
+                yield parse_message(data, options.lazy_content)
 
         finally:
             await chosen_transport.disconnect()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Scripted stand-in for the Claude Code CLI, used to benchmark the SDK offline.
+
+Accepts the same invocations as the real CLI (``--print PROMPT`` or
+``--input-format stream-json``) and answers every prompt with stream-json
+output shaped by environment variables, so SDK overhead can be measured
+without a model:
+
+    CLAUDE_FAKE_STARTUP_DELAY  Seconds to sleep before reading input (0)
+    CLAUDE_FAKE_MESSAGES       Assistant messages per turn (1)
+    CLAUDE_FAKE_MESSAGE_BYTES  Text bytes per assistant message (64)
+    CLAUDE_FAKE_DELAY          Seconds to sleep before each message (0)
+    CLAUDE_FAKE_SPLIT_BYTES    Write output in chunks of this size; 0 writes
+                               whole lines (0)
+
+With ``--include-partial-messages`` a stream_event text delta precedes each
+assistant message. Control requests are acknowledged immediately, and
+``--version`` prints a fixed version.
+
+Runs as a standalone script: it must not import the SDK.
+"""
+
+import json
+import os
+import sys
+import time
+import uuid
+from typing import Any
+
+_STARTUP_DELAY = float(os.environ.get("CLAUDE_FAKE_STARTUP_DELAY", "0"))
+_MESSAGES = int(os.environ.get("CLAUDE_FAKE_MESSAGES", "1"))
+_MESSAGE_BYTES = int(os.environ.get("CLAUDE_FAKE_MESSAGE_BYTES", "64"))
+_DELAY = float(os.environ.get("CLAUDE_FAKE_DELAY", "0"))
+_SPLIT_BYTES = int(os.environ.get("CLAUDE_FAKE_SPLIT_BYTES", "0"))
+
+_MODEL = "fake-claude"
+_VERSION = "0.0.0"
+
+
+def _write(message: dict[str, Any]) -> None:
+    data = (json.dumps(message) + "\n").encode()
+    if _SPLIT_BYTES <= 0:
+        os.write(1, data)
+        return
+    for start in range(0, len(data), _SPLIT_BYTES):
+        os.write(1, data[start : start + _SPLIT_BYTES])
+
+
+def _answer(prompt: str, session_id: str, partial: bool) -> None:
+    started = time.perf_counter()
+    text = (f"{prompt} " * (_MESSAGE_BYTES // (len(prompt) + 1) + 1))[:_MESSAGE_BYTES]
+    for _ in range(_MESSAGES):
+        if _DELAY:
+            time.sleep(_DELAY)
+        if partial:
+            _write(
+                {
+                    "type": "stream_event",
+                    "uuid": uuid.uuid4().hex,
+                    "session_id": session_id,
+                    "event": {
+                        "type": "content_block_delta",
+                        "index": 0,
+                        "delta": {"type": "text_delta", "text": text},
+                    },
+                    "parent_tool_use_id": None,
+                }
+            )
+        _write(
+            {
+                "type": "assistant",
+                "message": {
+                    "role": "assistant",
+                    "model": _MODEL,
+                    "content": [{"type": "text", "text": text}],
+                },
+                "parent_tool_use_id": None,
+                "session_id": session_id,
+            }
+        )
+    duration_ms = int((time.perf_counter() - started) * 1000)
+    _write(
+        {
+            "type": "result",
+            "subtype": "success",
+            "duration_ms": duration_ms,
+            "duration_api_ms": duration_ms,
+            "is_error": False,
+            "num_turns": 1,
+            "session_id": session_id,
+            "total_cost_usd": 0.0,
+            "usage": {"input_tokens": len(prompt), "output_tokens": 0},
+            "result": text,
+        }
+    )
+
+
+def main(argv: list[str]) -> int:
+    if "--version" in argv:
+        print(f"{_VERSION} (Claude Code, fake)")
+        return 0
+    if _STARTUP_DELAY:
+        time.sleep(_STARTUP_DELAY)
+    partial = "--include-partial-messages" in argv
+    session_id = uuid.uuid4().hex
+    _write(
+        {"type": "system", "subtype": "init", "session_id": session_id, "model": _MODEL}
+    )
+
+    if "--print" in argv:
+        _answer(argv[argv.index("--print") + 1], session_id, partial)
+        return 0
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        message = json.loads(line)
+        if message.get("type") == "control_request":
+            _write(
+                {
+                    "type": "control_response",
+                    "response": {
+                        "subtype": "success",
+                        "request_id": message.get("request_id"),
+                        "response": {},
+                    },
+                }
+            )
+        elif message.get("type") == "user":
+            content = message["message"]["content"]
+            if not isinstance(content, str):
+                content = json.dumps(content)
+            _answer(content, message.get("session_id") or session_id, partial)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
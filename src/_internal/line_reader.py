@@ -0,0 +1,89 @@
+"""Read lines from a blocking text stream without blocking the event loop."""
+
+import contextlib
+import sys
+import threading
+from typing import TextIO
+
+import anyio
+import anyio.from_thread
+from anyio.lowlevel import EventLoopToken, current_token
+
+
+class _PendingRead:
+    __slots__ = ("line", "error", "done", "token")
+
+    def __init__(self) -> None:
+        self.line = ""
+        self.error: BaseException | None = None
+        # Set from the reader thread through the event loop that started it
+        self.done = anyio.Event()
+        self.token: EventLoopToken = current_token()
+
+
+class AsyncLineReader:
+    """
+    Async readline() over a blocking stream such as sys.stdin.
+
+    Each read runs in a daemon thread that wakes the event loop once the
+    line is in, so streaming output, interrupts and other tasks keep running
+    while the user types, without any polling. A cancelled readline()
+    does not lose input: the read stays pending and its line is returned by
+    the next readline() call.
+
+    Example:
+        ```python
+        reader = AsyncLineReader()
+        while True:
+            try:
+                prompt = await reader.readline("> ")
+            except EOFError:
+                break
+        ```
+    """
+
+    def __init__(self, stream: TextIO | None = None):
+        self._stream = stream if stream is not None else sys.stdin
+        self._pending: _PendingRead | None = None
+
+    def isatty(self) -> bool:
+        """Whether the underlying stream is an interactive terminal."""
+        try:
+            return self._stream.isatty()
+        except (AttributeError, ValueError):
+            return False
+
+    async def readline(self, prompt: str = "") -> str:
+        """
+        Print prompt and return the next line without its line ending.
+
+        Raises:
+            EOFError: If the stream is exhausted
+        """
+        if prompt:
+            print(prompt, end="", flush=True)
+
+        pending = self._pending
+        if pending is None:
+            pending = self._pending = _PendingRead()
+            threading.Thread(
+                target=self._read_into, args=(pending,), daemon=True
+            ).start()
+
+        await pending.done.wait()
+
+        self._pending = None
+        if pending.error is not None:
+            raise pending.error
+        if not pending.line:
+            raise EOFError
+        return pending.line.rstrip("\r\n")
+
+    def _read_into(self, pending: _PendingRead) -> None:
+        try:
+            pending.line = self._stream.readline()
+        except BaseException as e:
+            pending.error = e
+        # If the event loop has finished, nobody is left to read the line
+        with contextlib.suppress(anyio.RunFinishedError):
+            anyio.from_thread.run_sync(pending.done.set, token=pending.token)
@@ -0,0 +1,82 @@
+"""Message-type filtering pushed down to the transport."""
+
+from collections.abc import AsyncIterator, Collection
+from typing import Any
+
+from ..sdk_types import (
+    AssistantMessage,
+    Message,
+    ResultMessage,
+    StreamEvent,
+    SystemMessage,
+    UserMessage,
+)
+from .transport import Transport
+from .transport.subprocess_cli import SubprocessCLITransport
+
+# Message classes accepted by message_types=..., or raw "type" values for
+# types handled by a registered parser. A single class or string is accepted
+# on its own.
+MessageTypes = type | str | Collection[type | str]
+
+_TYPE_NAMES: dict[type, str] = {
+    UserMessage: "user",
+    AssistantMessage: "assistant",
+    SystemMessage: "system",
+    ResultMessage: "result",
+    StreamEvent: "stream_event",
+}
+
+
+def message_type_names(message_types: MessageTypes) -> frozenset[str]:
+    """
+    Return the CLI "type" values selected by message_types.
+
+    "result" is always included so callers can tell when a response is
+    complete.
+
+    Raises:
+        ValueError: If a class is not one of the SDK message types
+    """
+    if isinstance(message_types, type | str):
+        # A bare string is a collection of characters; never iterate it
+        message_types = (message_types,)
+    names = {"result"}
+    for message_type in message_types:
+        if isinstance(message_type, str):
+            names.add(message_type)
+            continue
+        name = _TYPE_NAMES.get(message_type)
+        if name is None:
+            raise ValueError(f"Unknown message type: {message_type!r}")
+        names.add(name)
+    return frozenset(names)
+
+
+def message_matches(message: Message, wanted: frozenset[str]) -> bool:
+    """Whether an already parsed message is selected by wanted."""
+    return _TYPE_NAMES.get(type(message)) in wanted
+
+
+def receive_filtered(
+    transport: Transport, wanted: frozenset[str] | None
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Receive raw messages from transport, keeping only the wanted types.
+
+    The subprocess transport skips unwanted lines before decoding them;
+    other transports are filtered after they have produced each message.
+    """
+    if wanted is None:
+        return transport.receive_messages()
+    if isinstance(transport, SubprocessCLITransport):
+        return transport.receive_messages(message_types=wanted)
+    return _filter(transport.receive_messages(), wanted)
+
+
+async def _filter(
+    messages: AsyncIterator[dict[str, Any]], wanted: frozenset[str]
+) -> AsyncIterator[dict[str, Any]]:
+    async for data in messages:
+        if data.get("type") in wanted:
+            yield data
@@ -1,7 +1,9 @@
 """Message parser for Claude Code SDK responses."""
 
 import logging
-from typing import Any
+import sys
+from collections.abc import Callable, Iterator, Sequence
+from typing import Any, overload
 
 from .._errors import MessageParseError
 from ..sdk_types import (
@@ -9,6 +11,7 @@ from ..sdk_types import (
     ContentBlock,
     Message,
     ResultMessage,
+    StreamEvent,
     SystemMessage,
     TextBlock,
     ThinkingBlock,
@@ -19,13 +22,229 @@ from ..sdk_types import (
 
 logger = logging.getLogger(__name__)
 
+# Model names, tool names and subtypes repeat across nearly every message, so
+# they are interned with sys.intern to keep one copy per distinct value.
 
-def parse_message(data: dict[str, Any]) -> Message:
+BlockParser = Callable[[dict[str, Any]], Any]
+MessageParser = Callable[[dict[str, Any]], Any]
+
+
+def _parse_text_block(block: dict[str, Any]) -> TextBlock:
+    return TextBlock(block["text"])
+
+
+def _parse_thinking_block(block: dict[str, Any]) -> ThinkingBlock:
+    return ThinkingBlock(block["thinking"], block["signature"])
+
+
+def _parse_tool_use_block(block: dict[str, Any]) -> ToolUseBlock:
+    return ToolUseBlock(block["id"], sys.intern(block["name"]), block["input"])
+
+
+def _parse_tool_result_block(block: dict[str, Any]) -> ToolResultBlock:
+    return ToolResultBlock(
+        block["tool_use_id"], block.get("content"), block.get("is_error")
+    )
+
+
+_BLOCK_PARSERS: dict[str, BlockParser] = {
+    "text": _parse_text_block,
+    "thinking": _parse_thinking_block,
+    "tool_use": _parse_tool_use_block,
+    "tool_result": _parse_tool_result_block,
+}
+
+
+def parse_content_blocks(blocks: list[dict[str, Any]]) -> list[ContentBlock]:
+    """Parse raw content blocks, skipping block types with no registered parser."""
+    parsers = _BLOCK_PARSERS
+    return [
+        parser(block)
+        for block in blocks
+        if (parser := parsers.get(block["type"])) is not None
+    ]
+
+
+class LazyContentBlocks(Sequence[ContentBlock]):
+    """
+    Content blocks that are parsed the first time they are accessed.
+
+    Holds the raw block dictionaries until any element, the length or an
+    iterator is requested, then parses them all once and drops the raw data.
+    Compares equal to the list of parsed blocks. A block that fails to parse
+    raises MessageParseError on that first access rather than from
+    parse_message().
+    """
+
+    __slots__ = ("_raw", "_blocks")
+
+    def __init__(self, raw: list[dict[str, Any]]):
+        self._raw: list[dict[str, Any]] | None = raw
+        self._blocks: list[ContentBlock] | None = None
+
+    @property
+    def materialized(self) -> bool:
+        """Whether the blocks have been parsed yet."""
+        return self._blocks is not None
+
+    def raw_types(self) -> list[str | None] | None:
+        """The "type" of each block while still unparsed, None once parsed.
+
+        Lets callers inspect what a message holds without paying for parsing.
+        A block without a "type" shows up as None here and only fails once
+        the blocks are parsed.
+        """
+        if self._blocks is not None:
+            return None
+        return [block.get("type") for block in self._raw or []]
+
+    def _materialize(self) -> list[ContentBlock]:
+        if self._blocks is None:
+            raw = self._raw
+            try:
+                self._blocks = parse_content_blocks(raw or [])
+            except KeyError as e:
+                raise MessageParseError(
+                    f"Missing required field in content block: {e}", {"content": raw}
+                ) from e
+            self._raw = None
+        return self._blocks
+
+    @overload
+    def __getitem__(self, index: int) -> ContentBlock: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[ContentBlock]: ...
+
+    def __getitem__(self, index: int | slice) -> ContentBlock | list[ContentBlock]:
+        return self._materialize()[index]
+
+    def __len__(self) -> int:
+        return len(self._materialize())
+
+    def __iter__(self) -> Iterator[ContentBlock]:
+        return iter(self._materialize())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, LazyContentBlocks):
+            other = other._materialize()
+        return self._materialize() == other
+
+    def __repr__(self) -> str:
+        if self._blocks is None:
+            return f"LazyContentBlocks(<{len(self._raw or [])} unparsed>)"
+        return repr(self._blocks)
+
+
+def _parse_user_message(data: dict[str, Any]) -> UserMessage:
+    content = data["message"]["content"]
+    if isinstance(content, list):
+        return UserMessage(parse_content_blocks(content))
+    return UserMessage(content)
+
+
+def _parse_assistant_message(data: dict[str, Any]) -> AssistantMessage:
+    message = data["message"]
+    return AssistantMessage(
+        parse_content_blocks(message["content"]), sys.intern(message["model"])
+    )
+
+
+def _parse_user_message_lazy(data: dict[str, Any]) -> UserMessage:
+    content = data["message"]["content"]
+    if isinstance(content, list):
+        return UserMessage(LazyContentBlocks(content))  # type: ignore[arg-type]
+    return UserMessage(content)
+
+
+def _parse_assistant_message_lazy(data: dict[str, Any]) -> AssistantMessage:
+    message = data["message"]
+    return AssistantMessage(
+        LazyContentBlocks(message["content"]),  # type: ignore[arg-type]
+        sys.intern(message["model"]),
+    )
+
+
+def _parse_system_message(data: dict[str, Any]) -> SystemMessage:
+    return SystemMessage(sys.intern(data["subtype"]), data)
+
+
+def _parse_result_message(data: dict[str, Any]) -> ResultMessage:
+    get = data.get
+    return ResultMessage(
+        sys.intern(data["subtype"]),
+        data["duration_ms"],
+        data["duration_api_ms"],
+        data["is_error"],
+        data["num_turns"],
+        data["session_id"],
+        get("total_cost_usd"),
+        get("usage"),
+        get("result"),
+    )
+
+
+def _parse_stream_event(data: dict[str, Any]) -> StreamEvent:
+    return StreamEvent(
+        data["uuid"], data["session_id"], data["event"], data.get("parent_tool_use_id")
+    )
+
+
+_MESSAGE_PARSERS: dict[str, MessageParser] = {
+    "user": _parse_user_message,
+    "assistant": _parse_assistant_message,
+    "system": _parse_system_message,
+    "result": _parse_result_message,
+    "stream_event": _parse_stream_event,
+}
+
+# Used instead of _MESSAGE_PARSERS entries when lazy_content is requested
+_LAZY_MESSAGE_PARSERS: dict[str, MessageParser] = {
+    "user": _parse_user_message_lazy,
+    "assistant": _parse_assistant_message_lazy,
+}
+
+
+def register_block_parser(block_type: str, parser: BlockParser) -> None:
+    """
+    Register the parser for a content block type, replacing any existing one.
+
+    The parser receives the raw block dictionary and returns the block object.
+    It is used for content blocks of both user and assistant messages. A
+    KeyError raised by the parser is reported as a MessageParseError.
+
+    Args:
+        block_type: Value of the block's "type" field
+        parser: Callable building a block from the raw dictionary
+    """
+    _BLOCK_PARSERS[block_type] = parser
+
+
+def register_message_parser(message_type: str, parser: MessageParser) -> None:
+    """
+    Register the parser for a message type, replacing any existing one.
+
+    The parser receives the full raw message dictionary and may call
+    parse_content_blocks() for its content. A KeyError raised by the parser is
+    reported as a MessageParseError. The parser is used whether or not lazy
+    content is requested.
+
+    Args:
+        message_type: Value of the message's "type" field
+        parser: Callable building a message from the raw dictionary
+    """
+    _MESSAGE_PARSERS[message_type] = parser
+    _LAZY_MESSAGE_PARSERS.pop(message_type, None)
+
+
+def parse_message(data: dict[str, Any], lazy_content: bool = False) -> Message:
     """
     Parse message from CLI output into typed Message objects.
 
     Args:
         data: Raw message dictionary from CLI output
+        lazy_content: Give user and assistant messages LazyContentBlocks
+            instead of a parsed list
 
     Returns:
         Parsed Message object
@@ -43,107 +262,15 @@ def parse_message(data: dict[str, Any]) -> Message:
     if not message_type:
         raise MessageParseError("Message missing 'type' field", data)
 
-    match message_type:
-        case "user":
-            try:
-                if isinstance(data["message"]["content"], list):
-                    user_content_blocks: list[ContentBlock] = []
-                    for block in data["message"]["content"]:
-                        match block["type"]:
-                            case "text":
-                                user_content_blocks.append(
-                                    TextBlock(text=block["text"])
-                                )
-                            case "tool_use":
-                                user_content_blocks.append(
-                                    ToolUseBlock(
-                                        id=block["id"],
-                                        name=block["name"],
-                                        input=block["input"],
-                                    )
-                                )
-                            case "tool_result":
-                                user_content_blocks.append(
-                                    ToolResultBlock(
-                                        tool_use_id=block["tool_use_id"],
-                                        content=block.get("content"),
-                                        is_error=block.get("is_error"),
-                                    )
-                                )
-                    return UserMessage(content=user_content_blocks)
-                return UserMessage(content=data["message"]["content"])
-            except KeyError as e:
-                raise MessageParseError(
-                    f"Missing required field in user message: {e}", data
-                ) from e
+    parser = _MESSAGE_PARSERS.get(message_type)
+    if lazy_content:
+        parser = _LAZY_MESSAGE_PARSERS.get(message_type, parser)
+    if parser is None:
+        raise MessageParseError(f"Unknown message type: {message_type}", data)
 
-        case "assistant":
-            try:
-                content_blocks: list[ContentBlock] = []
-                for block in data["message"]["content"]:
-                    match block["type"]:
-                        case "text":
-                            content_blocks.append(TextBlock(text=block["text"]))
-                        case "thinking":
-                            content_blocks.append(
-                                ThinkingBlock(
-                                    thinking=block["thinking"],
-                                    signature=block["signature"],
-                                )
-                            )
-                        case "tool_use":
-                            content_blocks.append(
-                                ToolUseBlock(
-                                    id=block["id"],
-                                    name=block["name"],
-                                    input=block["input"],
-                                )
-                            )
-                        case "tool_result":
-                            content_blocks.append(
-                                ToolResultBlock(
-                                    tool_use_id=block["tool_use_id"],
-                                    content=block.get("content"),
-                                    is_error=block.get("is_error"),
-                                )
-                            )
-
-                return AssistantMessage(
-                    content=content_blocks, model=data["message"]["model"]
-                )
-            except KeyError as e:
-                raise MessageParseError(
-                    f"Missing required field in assistant message: {e}", data
-                ) from e
-
-        case "system":
-            try:
-                return SystemMessage(
-                    subtype=data["subtype"],
-                    data=data,
-                )
-            except KeyError as e:
-                raise MessageParseError(
-                    f"Missing required field in system message: {e}", data
-                ) from e
-
-        case "result":
-            try:
-                return ResultMessage(
-                    subtype=data["subtype"],
-                    duration_ms=data["duration_ms"],
-                    duration_api_ms=data["duration_api_ms"],
-                    is_error=data["is_error"],
-                    num_turns=data["num_turns"],
-                    session_id=data["session_id"],
-                    total_cost_usd=data.get("total_cost_usd"),
-                    usage=data.get("usage"),
-                    result=data.get("result"),
-                )
-            except KeyError as e:
-                raise MessageParseError(
-                    f"Missing required field in result message: {e}", data
-                ) from e
-
-        case _:
-            raise MessageParseError(f"Unknown message type: {message_type}", data)
+    try:
+        return parser(data)  # type: ignore[no-any-return]
+    except KeyError as e:
+        raise MessageParseError(
+            f"Missing required field in {message_type} message: {e}", data
+        ) from e
@@ -0,0 +1,80 @@
+"""Stable keys for ClaudeCodeOptions."""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any
+
+from ..sdk_types import ClaudeCodeOptions
+
+# Fields that change the CLI command line or the process it runs in.
+# max_thinking_tokens is not forwarded to the CLI, so it is left out.
+_INVOCATION_FIELDS = (
+    "allowed_tools",
+    "system_prompt",
+    "append_system_prompt",
+    "mcp_servers",
+    "permission_mode",
+    "continue_conversation",
+    "resume",
+    "max_turns",
+    "disallowed_tools",
+    "model",
+    "permission_prompt_tool_name",
+    "cwd",
+    "settings",
+    "add_dirs",
+    "env",
+    "extra_args",
+    "include_partial_messages",
+)
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, Path):
+        return str(value)
+    if isinstance(value, dict):
+        return tuple(
+            sorted(((str(k), _freeze(v)) for k, v in value.items()), key=_first)
+        )
+    if isinstance(value, list | tuple):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _first(item: tuple[str, Any]) -> str:
+    return item[0]
+
+
+def options_snapshot(options: ClaudeCodeOptions) -> tuple[tuple[str, Any], ...]:
+    """Return the invocation fields of options as canonical nested tuples.
+
+    Dicts become key-sorted (key, value) pairs, lists become tuples and
+    paths become strings, so the result is hashable and independent of
+    insertion order.
+    """
+    return tuple((name, _freeze(getattr(options, name))) for name in _INVOCATION_FIELDS)
+
+
+def snapshot_digest(snapshot: tuple[tuple[str, Any], ...]) -> str:
+    """Return a hex digest of a snapshot that is stable across interpreter runs."""
+    encoded = json.dumps(snapshot, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def options_key(options: ClaudeCodeOptions) -> str:
+    """Return a hex digest identifying how options configure the CLI process.
+
+    Two options objects with the same key produce the same command line,
+    working directory and environment, so processes spawned for one can
+    serve the other. Same as ClaudeCodeOptions.fingerprint().
+    """
+    return options.fingerprint()
+
+
+def query_key(prompt: str, options: ClaudeCodeOptions) -> str:
+    """Return a hex digest identifying a string prompt run with options."""
+    digest = hashlib.sha256(options.fingerprint().encode())
+    digest.update(b"\0")
+    digest.update(prompt.encode())
+    return digest.hexdigest()
@@ -0,0 +1,64 @@
+"""Content-addressed files for CLI arguments too large for argv."""
+
+import atexit
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+_directory: Path | None = None
+
+
+def _arg_file_dir() -> Path:
+    """
+    Return this process's directory for argument files.
+
+    mkdtemp creates it under a random name, readable only by the current
+    user, so nobody else can plant or read files in it. It is removed at
+    interpreter exit, and created again if something deletes it meanwhile.
+    """
+    global _directory
+    if _directory is None or not _directory.is_dir():
+        _directory = Path(tempfile.mkdtemp(prefix="claude-sdk-args-"))
+        atexit.register(_remove, _directory, os.getpid())
+    return _directory
+
+
+def _remove(directory: Path, pid: int) -> None:
+    # A forked child inherits the handler but not the ownership
+    if os.getpid() == pid:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def write_arg_file(content: str, suffix: str) -> str:
+    """
+    Return the path of a file holding content, writing it if needed.
+
+    Files are named after the SHA-256 of their content, so every spawn
+    passing the same argument shares one file. Files are kept for reuse
+    until the process exits.
+    """
+    data = content.encode()
+    name = hashlib.sha256(data).hexdigest()[:32] + suffix
+    path = _arg_file_dir() / name
+    if not path.exists():
+        _write_atomic(path, data)
+    return str(path)
+
+
+def arg_files_exist(paths: tuple[str, ...]) -> bool:
+    """Whether every previously written file is still in place."""
+    return all(Path(path).exists() for path in paths)
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    # Concurrent writers race benignly: the content is identical
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        Path(tmp).replace(path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
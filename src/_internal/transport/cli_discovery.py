@@ -0,0 +1,144 @@
+"""Locate the Claude Code CLI once per process and probe its version."""
+
+import os
+import shutil
+from pathlib import Path
+
+import anyio
+
+from ..._errors import CLINotFoundError, ProcessError
+
+_VERSION_PROBE_TIMEOUT = 10.0
+
+
+def _search() -> str:
+    """Look for the CLI on PATH and in the usual install locations."""
+    if cli := shutil.which("claude"):
+        return cli
+
+    locations = [
+        Path.home() / ".npm-global/bin/claude",
+        Path("/usr/local/bin/claude"),
+        Path.home() / ".local/bin/claude",
+        Path.home() / "node_modules/.bin/claude",
+        Path.home() / ".yarn/bin/claude",
+    ]
+
+    for path in locations:
+        if path.exists() and path.is_file():
+            return str(path)
+
+    node_installed = shutil.which("node") is not None
+
+    if not node_installed:
+        error_msg = "Claude Code requires Node.js, which is not installed.\n\n"
+        error_msg += "Install Node.js from: https://nodejs.org/\n"
+        error_msg += "\nAfter installing Node.js, install Claude Code:\n"
+        error_msg += "  npm install -g @anthropic-ai/claude-code"
+        raise CLINotFoundError(error_msg)
+
+    raise CLINotFoundError(
+        "Claude Code not found. Install with:\n"
+        "  npm install -g @anthropic-ai/claude-code\n"
+        "\nIf already installed locally, try:\n"
+        '  export PATH="$HOME/node_modules/.bin:$PATH"\n'
+        "\nOr specify the path when creating transport:\n"
+        "  SubprocessCLITransport(..., cli_path='/path/to/claude')"
+    )
+
+
+class CLIResolver:
+    """
+    Process-wide cache of the CLI location and version.
+
+    The search runs once; later lookups only check that the cached file still
+    exists and that PATH has not changed. Failed searches are not cached.
+    Versions are cached per path and modification time, so an upgraded CLI
+    is probed again.
+    """
+
+    def __init__(self) -> None:
+        self._path: str | None = None
+        self._search_path: str | None = None
+        self._versions: dict[tuple[str, int], str] = {}
+
+    def find(self) -> str:
+        """
+        Return the CLI path, searching only if the cached one is stale.
+
+        Raises:
+            CLINotFoundError: If the CLI is not installed
+        """
+        search_path = os.environ.get("PATH")
+        cached = self._path
+        if (
+            cached is not None
+            and search_path == self._search_path
+            and Path(cached).exists()
+        ):
+            return cached
+        path = _search()
+        self._path, self._search_path = path, search_path
+        return path
+
+    async def version(self, cli_path: str | Path | None = None) -> str:
+        """
+        Return the version reported by ``claude --version``.
+
+        Args:
+            cli_path: CLI to probe; defaults to the one find() returns
+
+        Raises:
+            CLINotFoundError: If the CLI does not exist
+            ProcessError: If the CLI fails or does not answer in time
+        """
+        path = str(cli_path) if cli_path else self.find()
+        try:
+            key = (path, Path(path).stat().st_mtime_ns)
+        except FileNotFoundError as e:
+            raise CLINotFoundError("Claude Code not found", path) from e
+        if (cached := self._versions.get(key)) is not None:
+            return cached
+
+        try:
+            with anyio.fail_after(_VERSION_PROBE_TIMEOUT):
+                result = await anyio.run_process([path, "--version"], check=False)
+        except TimeoutError as e:
+            raise ProcessError(
+                f"Claude Code did not report its version within {_VERSION_PROBE_TIMEOUT}s"
+            ) from e
+        if result.returncode != 0:
+            raise ProcessError(
+                "Failed to read Claude Code version",
+                exit_code=result.returncode,
+                stderr=result.stderr.decode(errors="replace"),
+            )
+        # e.g. "1.0.93 (Claude Code)"
+        output = result.stdout.decode(errors="replace").strip()
+        version = output.split()[0] if output else ""
+        self._versions[key] = version
+        return version
+
+    def invalidate(self) -> None:
+        """Forget the cached location and versions."""
+        self._path = None
+        self._search_path = None
+        self._versions.clear()
+
+
+default_resolver = CLIResolver()
+
+
+def find_cli() -> str:
+    """Return the path of the Claude Code CLI, cached for the process."""
+    return default_resolver.find()
+
+
+async def cli_version(cli_path: str | Path | None = None) -> str:
+    """Return the installed Claude Code CLI version, cached per binary."""
+    return await default_resolver.version(cli_path)
+
+
+def invalidate_cli_cache() -> None:
+    """Forget the cached CLI location and version, e.g. after reinstalling it."""
+    default_resolver.invalidate()
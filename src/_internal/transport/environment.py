@@ -0,0 +1,75 @@
+"""Environment for CLI subprocesses, merged once per distinct options.env."""
+
+import os
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any
+
+_MAX_CACHED_ENVIRONMENTS = 64
+
+
+class EnvironmentBuilder:
+    """
+    Build the CLI's environment: os.environ, then options.env, then the
+    SDK's CLAUDE_CODE_ENTRYPOINT.
+
+    Merged environments are cached per (entrypoint, options.env) and shared
+    by every transport that asks for the same one, so a new connection costs
+    a dict comparison instead of decoding and copying all of os.environ.
+    options.env is keyed by its items regardless of insertion order.
+
+    The cache is dropped whenever os.environ changes. On CPython this is
+    detected by comparing os.environ's raw storage (the private ``_data``
+    dict of undecoded values) against a snapshot, a C-level comparison with
+    no decoding or copying. Where ``_data`` does not exist, nothing is
+    cached and every build() merges os.environ afresh, which is always
+    correct. The process environment is never modified.
+
+    Returned dicts are shared and must not be mutated.
+    """
+
+    def __init__(self, max_size: int = _MAX_CACHED_ENVIRONMENTS):
+        self._max_size = max_size
+        self._base: dict[Any, Any] | None = None
+        self._cache: OrderedDict[
+            tuple[str, frozenset[tuple[str, str]]], dict[str, str]
+        ] = OrderedDict()
+
+    def build(self, env: Mapping[str, str], entrypoint: str) -> dict[str, str]:
+        """Return the merged environment for options.env and entrypoint."""
+        # os.environ keeps its undecoded values in _data; comparing that is
+        # much cheaper than the copy it saves
+        data = getattr(os.environ, "_data", None)
+        if data is None:
+            # No cheap way to notice changes to os.environ, so do not cache
+            return {**os.environ, **env, "CLAUDE_CODE_ENTRYPOINT": entrypoint}
+        if data != self._base:
+            self._cache.clear()
+            self._base = dict(data)
+
+        key = (entrypoint, frozenset(env.items()))
+        try:
+            merged = self._cache[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable values; not worth caching
+            return {**os.environ, **env, "CLAUDE_CODE_ENTRYPOINT": entrypoint}
+        else:
+            self._cache.move_to_end(key)
+            return merged
+
+        merged = {**os.environ, **env, "CLAUDE_CODE_ENTRYPOINT": entrypoint}
+        self._cache[key] = merged
+        if len(self._cache) > self._max_size:
+            self._cache.popitem(last=False)
+        return merged
+
+    def clear(self) -> None:
+        """Forget every cached environment."""
+        self._cache.clear()
+        self._base = None
+
+
+# Shared by all transports in the process
+default_environment = EnvironmentBuilder()
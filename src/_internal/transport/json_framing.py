@@ -0,0 +1,199 @@
+"""Incremental JSON framing for the CLI's stream-json output."""
+
+import json
+import re
+from collections.abc import Callable
+from typing import Any
+
+from ..._errors import CLIJSONDecodeError as SDKJSONDecodeError
+
+_MAX_BUFFER_SIZE = 1024 * 1024  # 1MB buffer limit
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+JSONLoads = Callable[[bytes], Any]
+
+# The CLI writes the top-level "type" key first, so it can be read without
+# decoding the rest of the line.
+_TYPE_PREFIX = re.compile(rb'\{\s*"type"\s*:\s*"([^"\\]*)"')
+
+# A second top-level object on the same line has to start right after the
+# first one's closing brace, so a line without "}" then "{" holds one object.
+# Matches inside strings only cost a full decode.
+_OBJECT_BOUNDARY = re.compile(rb"\}\s*\{")
+
+
+def _stdlib_loads(data: bytes) -> Any:
+    """json.loads for UTF-8 bytes without per-call encoding detection."""
+    return _decoder.decode(data.decode("utf-8", "surrogatepass"))
+
+
+def resolve_json_loads(
+    decoder: str | Callable[[bytes], Any] = "auto",
+) -> JSONLoads:
+    """Return the function used to decode JSON frames.
+
+    Args:
+        decoder: "json" for the standard library, "orjson" to require orjson,
+            "auto" to use orjson when it is installed, or any callable that
+            accepts bytes and returns the decoded object.
+    """
+    if callable(decoder):
+        return decoder
+    if decoder == "json":
+        return _stdlib_loads
+    if decoder == "orjson":
+        try:
+            import orjson
+        except ImportError as e:
+            raise ImportError(
+                "json_decoder='orjson' requires orjson. Install with:\n"
+                "  pip install orjson"
+            ) from e
+        return orjson.loads
+    if decoder == "auto":
+        try:
+            import orjson
+        except ImportError:
+            return _stdlib_loads
+        return orjson.loads
+    raise ValueError(f"Unknown json_decoder: {decoder!r}")
+
+
+class JSONFrameDecoder:
+    """Split a chunked byte stream into JSON objects.
+
+    The CLI writes one JSON object per line, so frames are delimited by
+    ``b"\\n"`` and each complete line is handed to the JSON decoder exactly
+    once, straight from a reusable ``bytearray`` without decoding to str
+    first. Chunks that do not end on a newline are buffered without any
+    parsing attempt. Lines that do not decode on their own (several objects
+    concatenated without a separator, or an object broken across lines) fall
+    back to ``raw_decode``-style scanning, and any incomplete tail is kept
+    until more data arrives.
+
+    When ``wanted_types`` is set, a complete line holding a single object
+    whose leading ``"type"`` value is not in it is dropped without being
+    decoded at all. Lines whose type cannot be peeked, or that may hold
+    several objects, are decoded as usual, so callers still filter the
+    returned objects. If the line after a dropped one does not decode on
+    its own, the dropped line was the start of a longer object and the two
+    are decoded together.
+    """
+
+    def __init__(
+        self,
+        max_buffer_size: int = _MAX_BUFFER_SIZE,
+        loads: JSONLoads = _stdlib_loads,
+    ):
+        self._max_buffer_size = max_buffer_size
+        self._loads = loads
+        self._buffer = bytearray()
+        self._pending = b""
+        self._skipped_line = b""
+        self.wanted_types: frozenset[bytes] | None = None
+        self.skipped = 0
+
+    def feed(self, chunk: bytes | str) -> list[Any]:
+        """Consume a chunk and return every object it completed."""
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+
+        objects: list[Any] = []
+        buffer = self._buffer
+        # Only the new chunk can contain the next newline
+        newline = chunk.find(b"\n")
+        if newline == -1:
+            buffer += chunk
+            self._check_size(len(buffer) + len(self._pending))
+            return objects
+
+        offset = len(buffer)
+        buffer += chunk
+        newline += offset
+        start = 0
+        while newline != -1:
+            self._decode_line(buffer[start:newline], objects)
+            start = newline + 1
+            newline = buffer.find(b"\n", start)
+        del buffer[:start]
+        self._check_size(len(buffer) + len(self._pending))
+
+        return objects
+
+    def flush(self) -> list[Any]:
+        """Decode whatever is left once the stream has ended."""
+        objects: list[Any] = []
+        if self._buffer:
+            line = bytes(self._buffer)
+            self._buffer.clear()
+            self._decode_line(line, objects)
+        # An unterminated object at EOF is silently dropped, matching the
+        # behaviour of the previous speculative decoder.
+        self._pending = b""
+        return objects
+
+    def _decode_line(self, raw: bytes | bytearray, objects: list[Any]) -> None:
+        # Decoders are handed bytes, as JSONLoads promises; this copy replaces
+        # the one strip() would make of a bytearray
+        line = bytes(raw).strip()
+        if not line:
+            return
+
+        if self._pending:
+            line = self._pending + line
+            self._pending = b""
+        elif self.wanted_types is not None and line.endswith(b"}"):
+            match = _TYPE_PREFIX.match(line)
+            if (
+                match is not None
+                and match.group(1) not in self.wanted_types
+                and _OBJECT_BOUNDARY.search(line) is None
+            ):
+                # Kept in case it is only the first line of an object that
+                # continues on the next one
+                self._skipped_line = line
+                self.skipped += 1
+                return
+
+        try:
+            objects.append(self._loads(line))
+            if self._skipped_line:
+                self._skipped_line = b""
+            return
+        except ValueError:
+            pass
+
+        if self._skipped_line:
+            line = self._skipped_line + b"\n" + line
+            self._skipped_line = b""
+            self.skipped -= 1
+
+        # Slow path: concatenated objects or an object spanning several lines.
+        try:
+            text = line.decode()
+        except UnicodeDecodeError:
+            self._pending = line
+            return
+        idx = 0
+        end = len(text)
+        while idx < end:
+            try:
+                obj, idx = _decoder.raw_decode(text, idx)
+            except json.JSONDecodeError:
+                self._pending = text[idx:].encode()
+                return
+            objects.append(obj)
+            while idx < end and text[idx] in _WHITESPACE:
+                idx += 1
+
+    def _check_size(self, size: int) -> None:
+        if size > self._max_buffer_size:
+            self._buffer.clear()
+            self._pending = b""
+            self._skipped_line = b""
+            raise SDKJSONDecodeError(
+                f"JSON message exceeded maximum buffer size of {self._max_buffer_size} bytes",
+                ValueError(f"Buffer size {size} exceeds limit {self._max_buffer_size}"),
+            )
@@ -0,0 +1,321 @@
+"""Record a CLI session to a file and replay it without a CLI."""
+
+import gzip
+import json
+import math
+import queue
+import threading
+import time
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Literal, TextIO
+
+import anyio
+import anyio.lowlevel
+
+from ..._errors import CLIConnectionError
+from ...sdk_types import ClaudeCodeOptions
+from . import Transport
+from .json_framing import JSONFrameDecoder
+from .subprocess_cli import (
+    _CONTROL_MESSAGE_TYPES,
+    FRAME_IN,
+    FRAME_OUT,
+    SubprocessCLITransport,
+)
+
+_FORMAT_VERSION = 2
+
+_COMPACT = (",", ":")
+
+_Frame = tuple[float, str, bytes]
+
+
+def _open(path: Path, mode: Literal["r", "w"]) -> TextIO:
+    if path.suffix == ".gz":
+        if mode == "r":
+            return gzip.open(path, "rt", encoding="utf-8")
+        return gzip.open(path, "wt", encoding="utf-8")
+    return path.open(mode, encoding="utf-8")
+
+
+def _encode_frame(offset: float, direction: str, data: bytes) -> str:
+    # A stdout chunk can end inside a UTF-8 character; surrogateescape keeps
+    # such bytes, and JSON's \u escapes carry them through the file
+    text = data.decode("utf-8", "surrogateescape")
+    return json.dumps([offset, direction, text], separators=_COMPACT) + "\n"
+
+
+@dataclass
+class TransportRecording:
+    """
+    A recorded session, decoded for replay.
+
+    The file holds the raw frames: stdout chunks as the CLI wrote them and
+    every line sent to its stdin. Loading decodes the stdout chunks into
+    messages once, so ``frames`` holds ``(seconds, direction, message)``
+    tuples, each stdout message at the offset of the chunk that completed
+    it. Load a recording once and pass it to many ReplayTransports to share
+    the decoded frames.
+    """
+
+    frames: list[tuple[float, str, dict[str, Any]]] = field(default_factory=list)
+    prompt: str | None = None  # The --print prompt, for string-mode sessions
+
+    @classmethod
+    def load(cls, path: str | Path) -> "TransportRecording":
+        """Read a file written by RecordingTransport (gzip if it ends in .gz)."""
+        frames: list[tuple[float, str, dict[str, Any]]] = []
+        decoder = JSONFrameDecoder()
+        with _open(Path(path), "r") as file:
+            header = json.loads(file.readline())
+            if header.get("version") != _FORMAT_VERSION:
+                raise ValueError(
+                    f"Unsupported recording version: {header.get('version')!r}"
+                )
+            for line in file:
+                if not line.strip():
+                    continue
+                offset, direction, text = json.loads(line)
+                data = text.encode("utf-8", "surrogateescape")
+                if direction == FRAME_IN:
+                    for message in decoder.feed(data):
+                        frames.append((offset, direction, message))
+                else:
+                    frames.append((offset, direction, json.loads(data)))
+        last = frames[-1][0] if frames else 0.0
+        frames.extend((last, FRAME_IN, message) for message in decoder.flush())
+        return cls(frames=frames, prompt=header.get("prompt"))
+
+    @property
+    def duration(self) -> float:
+        """Seconds from connect() to the last frame."""
+        return self.frames[-1][0] if self.frames else 0.0
+
+
+class _FrameWriter:
+    """Write frames to a recording file from a thread of its own.
+
+    put() only queues the frame, so encoding, compression and disk writes
+    never run on the event loop.
+    """
+
+    def __init__(self, file: TextIO, header: dict[str, Any]):
+        self._file = file
+        self._header = header
+        self._queue: queue.SimpleQueue[_Frame | None] = queue.SimpleQueue()
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(
+            target=self._run, name="claude-recording-writer", daemon=True
+        )
+        self._thread.start()
+
+    def put(self, frame: _Frame) -> None:
+        if self._error is None:
+            self._queue.put(frame)
+
+    def _run(self) -> None:
+        try:
+            with self._file as file:
+                file.write(json.dumps(self._header, separators=_COMPACT) + "\n")
+                while (frame := self._queue.get()) is not None:
+                    file.write(_encode_frame(*frame))
+        except BaseException as e:
+            self._error = e
+
+    async def close(self) -> None:
+        """Write the queued frames, close the file and re-raise write errors."""
+        self._queue.put(None)
+        await anyio.to_thread.run_sync(self._thread.join)
+        if self._error is not None:
+            raise self._error
+
+
+class RecordingTransport(Transport):
+    """
+    SubprocessCLITransport that records every raw frame it exchanges.
+
+    Everything read from the CLI's stdout is recorded as the chunks it
+    arrived in, including control responses the transport consumes itself,
+    and every line written to stdin is recorded as sent, including control
+    requests with their request_id. The file has a JSON header line followed
+    by one compact ``[seconds, direction, text]`` line per frame,
+    gzip-compressed when the path ends in ``.gz``. Frames are written by a
+    background thread, so recording does no file I/O on the event loop.
+    Replay the file with ReplayTransport.
+
+    Example:
+        ```python
+        transport = RecordingTransport("Hello", options, "session.jsonl.gz")
+        async for message in query(prompt="Hello", options=options, transport=transport):
+            print(message)
+        ```
+    """
+
+    def __init__(
+        self,
+        prompt: str | AsyncIterable[dict[str, Any]],
+        options: ClaudeCodeOptions,
+        path: str | Path,
+        cli_path: str | Path | None = None,
+    ):
+        self._path = Path(path)
+        self._prompt = prompt
+        self._writer: _FrameWriter | None = None
+        self._started = 0.0
+        self._transport = SubprocessCLITransport(
+            prompt=prompt, options=options, cli_path=cli_path
+        )
+        self._transport._frame_hook = self._record
+
+    def _record(self, direction: str, data: bytes) -> None:
+        if self._writer is not None:
+            offset = round(time.monotonic() - self._started, 6)
+            self._writer.put((offset, direction, data))
+
+    async def connect(self) -> None:
+        """Open the recording file and start the CLI."""
+        if self._writer is not None:
+            return
+        file = await anyio.to_thread.run_sync(_open, self._path, "w")
+        header = {
+            "version": _FORMAT_VERSION,
+            "prompt": self._prompt if isinstance(self._prompt, str) else None,
+        }
+        self._writer = _FrameWriter(file, header)
+        self._started = time.monotonic()
+        try:
+            await self._transport.connect()
+        except BaseException:
+            with anyio.CancelScope(shield=True):
+                await self._close_writer()
+            raise
+
+    async def disconnect(self) -> None:
+        """Stop the CLI and finish the recording file."""
+        try:
+            await self._transport.disconnect()
+        finally:
+            with anyio.CancelScope(shield=True):
+                await self._close_writer()
+
+    async def _close_writer(self) -> None:
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            await writer.close()
+
+    async def send_request(
+        self, messages: list[dict[str, Any]], options: dict[str, Any]
+    ) -> None:
+        """Send messages to the CLI; each line sent is recorded."""
+        await self._transport.send_request(messages, options)
+
+    async def interrupt(self, timeout: float | None = None) -> None:
+        """Send an interrupt; the control request and response are recorded."""
+        await self._transport.interrupt(timeout)
+
+    def receive_messages(self) -> AsyncIterator[dict[str, Any]]:
+        """Receive messages from the CLI; the raw output is recorded."""
+        return self._transport.receive_messages()
+
+    def is_connected(self) -> bool:
+        """Check if the CLI process is running."""
+        return self._transport.is_connected()
+
+
+class ReplayTransport(Transport):
+    """
+    Transport that replays a recorded session without starting a CLI.
+
+    Received frames are delivered at their recorded offsets divided by
+    ``speed``; ``speed=math.inf`` delivers them as fast as they are read.
+    Frames that followed a send_request() or interrupt() in the recording
+    are held back until the same number of sends has happened here, and
+    their timing restarts from that send, so interactive clients see the
+    same turn structure as the live session.
+
+    Frames are shared between transports replaying the same
+    TransportRecording and must not be mutated.
+
+    Example:
+        ```python
+        recording = TransportRecording.load("session.jsonl.gz")
+
+        async def one_session():
+            transport = ReplayTransport(recording, speed=math.inf)
+            async for message in query(prompt="Hello", transport=transport):
+                ...
+        ```
+    """
+
+    def __init__(self, recording: TransportRecording | str | Path, speed: float = 1.0):
+        if speed <= 0:
+            raise ValueError("speed must be > 0")
+        if not isinstance(recording, TransportRecording):
+            recording = TransportRecording.load(recording)
+        self.recording = recording
+        self._speed = speed
+        self._connected = False
+        self._sent = 0
+        self._sent_changed = anyio.Event()
+
+    async def connect(self) -> None:
+        """Start the replay clock."""
+        self._connected = True
+
+    async def disconnect(self) -> None:
+        """Stop replaying."""
+        self._connected = False
+
+    async def send_request(
+        self, messages: list[dict[str, Any]], options: dict[str, Any]
+    ) -> None:
+        """Count sent messages; recorded responses to them are released."""
+        if not self._connected:
+            raise CLIConnectionError("Not connected")
+        self._count_sent(len(messages))
+
+    async def interrupt(self, timeout: float | None = None) -> None:
+        """Count the interrupt as a send, like the recording did."""
+        if not self._connected:
+            raise CLIConnectionError("Not connected")
+        self._count_sent(1)
+
+    def _count_sent(self, count: int) -> None:
+        self._sent += count
+        self._sent_changed.set()
+        self._sent_changed = anyio.Event()
+
+    async def receive_messages(self) -> AsyncIterator[dict[str, Any]]:
+        """Yield recorded messages from the CLI at the replay speed."""
+        if not self._connected:
+            raise CLIConnectionError("Not connected")
+        scale = 0.0 if math.isinf(self._speed) else 1.0 / self._speed
+        anchor_offset = 0.0
+        anchor_time = time.monotonic()
+        outbound = 0
+        for offset, direction, message in self.recording.frames:
+            if direction == FRAME_OUT:
+                outbound += 1
+                if self._sent < outbound:
+                    while self._sent < outbound:
+                        await self._sent_changed.wait()
+                    anchor_offset, anchor_time = offset, time.monotonic()
+                continue
+            if direction != FRAME_IN or message.get("type") in _CONTROL_MESSAGE_TYPES:
+                # Control responses are consumed by the transport, not yielded
+                continue
+            delay = anchor_time + (offset - anchor_offset) * scale - time.monotonic()
+            if delay > 0:
+                await anyio.sleep(delay)
+            else:
+                await anyio.lowlevel.checkpoint()
+            if not self.is_connected():
+                return
+            yield message
+        self._connected = False
+
+    def is_connected(self) -> bool:
+        """Check if the replay is still running."""
+        return self._connected
@@ -0,0 +1,110 @@
+"""Tear down many CLI processes at once."""
+
+import contextlib
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+import anyio
+from anyio.abc import Process
+from anyio.lowlevel import current_token
+
+from .subprocess_cli import SubprocessCLITransport, _live_transports
+
+
+@dataclass
+class ShutdownReport:
+    """What close_all() did and how long it took."""
+
+    processes: int  # Processes that were still running
+    terminated: int  # Exited after SIGTERM within their grace period
+    killed: int  # Needed SIGKILL
+    duration: float  # Seconds from the first signal until all had exited
+
+
+async def close_all(
+    transports: Iterable[SubprocessCLITransport] | None = None,
+    grace_period: float | None = None,
+) -> ShutdownReport:
+    """
+    Stop the CLI processes of many transports concurrently.
+
+    Every process gets SIGTERM at once. They are then awaited together, and
+    the ones still running when their grace period ends get SIGKILL in one
+    batch. Teardown takes about as long as the slowest process instead of
+    the sum of all of them.
+
+    Only the processes are stopped. Each transport's disconnect() still has
+    to run in the task that connected it, as anyio requires, but it returns
+    at once because its process has already exited. Anyone still reading a
+    transport's messages gets a ProcessError carrying the signal's exit
+    code (such as -15 for SIGTERM). The reaping is shielded from
+    cancellation.
+
+    Args:
+        transports: Transports to stop, all connected on the running event
+            loop; defaults to every connected SubprocessCLITransport of this
+            event loop. Transports owned by other loops or threads are left
+            alone, since their processes can only be awaited there
+        grace_period: Seconds to wait after SIGTERM, shared by all processes;
+            defaults to each transport's own grace_period
+
+    Returns:
+        A ShutdownReport with counts and the wall time taken.
+
+    Example:
+        ```python
+        report = await close_all(grace_period=2.0)
+        print(f"{report.processes} stopped in {report.duration:.2f}s")
+        ```
+    """
+    if transports is None:
+        token = current_token()
+        transports = [t for t in list(_live_transports) if t._loop_token == token]
+
+    groups: dict[float, list[Process]] = {}
+    for transport in transports:
+        process = transport._process
+        if process is None or process.returncode is not None:
+            continue
+        grace = transport.grace_period if grace_period is None else grace_period
+        groups.setdefault(grace, []).append(process)
+
+    started = time.perf_counter()
+    # Signal everything first, so the children shut down in parallel
+    for group in groups.values():
+        for process in group:
+            with contextlib.suppress(ProcessLookupError):
+                process.terminate()
+
+    killed = 0
+
+    async def reap(grace: float, group: list[Process]) -> None:
+        nonlocal killed
+        with anyio.move_on_after(grace):
+            await _wait_all(group)
+        stragglers = [p for p in group if p.returncode is None]
+        for process in stragglers:
+            with contextlib.suppress(ProcessLookupError):
+                process.kill()
+        killed += len(stragglers)
+        await _wait_all(stragglers)
+
+    with anyio.CancelScope(shield=True):
+        async with anyio.create_task_group() as tg:
+            for grace, group in groups.items():
+                tg.start_soon(reap, grace, group)
+
+    count = sum(len(group) for group in groups.values())
+    return ShutdownReport(
+        processes=count,
+        terminated=count - killed,
+        killed=killed,
+        duration=time.perf_counter() - started,
+    )
+
+
+async def _wait_all(processes: list[Process]) -> None:
+    async with anyio.create_task_group() as tg:
+        for process in processes:
+            tg.start_soon(process.wait)
@@ -3,26 +3,114 @@
 import json
 import logging
 import os
-import shutil
+import re
 import tempfile
+import weakref
 from collections import deque
-from collections.abc import AsyncIterable, AsyncIterator
+from collections.abc import (
+    AsyncGenerator,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Collection,
+)
 from pathlib import Path
 from subprocess import PIPE
 from typing import Any
 
 import anyio
-from anyio.abc import Process
+from anyio.abc import ByteReceiveStream, Process
+from anyio.lowlevel import current_token
 from anyio.streams.text import TextReceiveStream, TextSendStream
 
 from ..._errors import CLIConnectionError, CLINotFoundError, ProcessError
-from ..._errors import CLIJSONDecodeError as SDKJSONDecodeError
 from ...sdk_types import ClaudeCodeOptions
 from . import Transport
+from .arg_files import arg_files_exist, write_arg_file
+from .cli_discovery import default_resolver
+from .environment import default_environment
+from .json_framing import _MAX_BUFFER_SIZE as _MAX_BUFFER_SIZE
+from .json_framing import JSONFrameDecoder, resolve_json_loads
 
 logger = logging.getLogger(__name__)
 
-_MAX_BUFFER_SIZE = 1024 * 1024  # 1MB buffer limit
+_DEFAULT_CONTROL_REQUEST_TIMEOUT = 30.0
+_STDERR_MAX_LINES = 100
+_STDERR_MAX_BYTES = 64 * 1024
+# Oldest CLI release taken to accept --system-prompt-file and
+# --append-system-prompt-file; older or unparsable versions are refused
+_MIN_PROMPT_FILE_VERSION = (2, 0, 0)
+
+# Consumed by the transport itself, so never filtered out
+_CONTROL_MESSAGE_TYPES = frozenset({"control_response"})
+
+_DEFAULT_GRACE_PERIOD = 5.0
+
+# Directions of the raw frames passed to SubprocessCLITransport._frame_hook:
+# stdout chunks, lines sent by send_request() and control requests, and lines
+# from the initial prompt stream
+FRAME_IN = "i"
+FRAME_OUT = "o"
+FRAME_PROMPT = "p"
+
+FrameHook = Callable[[str, bytes], None]
+
+# Transports with a running process, for close_all(); each records the event
+# loop it connected on in _loop_token
+_live_transports: "weakref.WeakSet[SubprocessCLITransport]" = weakref.WeakSet()
+
+
+async def idle_stream() -> AsyncIterator[dict[str, Any]]:
+    """
+    Streaming-mode prompt that never sends anything.
+
+    Keeps the CLI's stdin open so messages can be sent later with
+    send_request().
+    """
+    return
+    yield {}  # type: ignore[unreachable]
+
+
+class _StderrBuffer:
+    """Keep the tail of the CLI's stderr, capped by line count and size."""
+
+    def __init__(
+        self, max_lines: int = _STDERR_MAX_LINES, max_bytes: int = _STDERR_MAX_BYTES
+    ):
+        # (line, size of the line in UTF-8 bytes)
+        self._lines: deque[tuple[str, int]] = deque(maxlen=max_lines)
+        self._max_bytes = max_bytes
+        self._size = 0
+        self._seen = 0
+
+    def append(self, line: str) -> None:
+        if len(self._lines) == self._lines.maxlen:
+            self._size -= self._lines[0][1]
+        size = len(line.encode(errors="replace"))
+        self._lines.append((line, size))
+        self._size += size
+        self._seen += 1
+        while self._size > self._max_bytes and len(self._lines) > 1:
+            self._size -= self._lines.popleft()[1]
+
+    def render(self) -> str:
+        output = "\n".join(line for line, _size in self._lines)
+        if self._seen > len(self._lines):
+            output = (
+                f"[stderr truncated, showing last {len(self._lines)} lines]\n" + output
+            )
+        return output
+
+
+class _PendingControlRequest:
+    """A control request awaiting its response from the reader loop."""
+
+    __slots__ = ("event", "response", "error")
+
+    def __init__(self) -> None:
+        self.event = anyio.Event()
+        self.response: dict[str, Any] | None = None
+        self.error: Exception | None = None
 
 
 class SubprocessCLITransport(Transport):
@@ -34,66 +122,132 @@ class SubprocessCLITransport(Transport):
         options: ClaudeCodeOptions,
         cli_path: str | Path | None = None,
         close_stdin_after_prompt: bool = False,
+        control_request_timeout: float | None = _DEFAULT_CONTROL_REQUEST_TIMEOUT,
+        entrypoint: str = "sdk-py",
+        grace_period: float = _DEFAULT_GRACE_PERIOD,
     ):
         self._prompt = prompt
         self._is_streaming = not isinstance(prompt, str)
         self._options = options
+        self._cli_path_found = not cli_path
         self._cli_path = str(cli_path) if cli_path else self._find_cli()
         self._cwd = str(options.cwd) if options.cwd else None
         self._process: Process | None = None
-        self._stdout_stream: TextReceiveStream | None = None
+        self._loop_token: object = None  # Event loop that owns _process
+        self._stdout_stream: ByteReceiveStream | None = None
         self._stderr_stream: TextReceiveStream | None = None
         self._stdin_stream: TextSendStream | None = None
-        self._pending_control_responses: dict[str, dict[str, Any]] = {}
+        # Called with (direction, raw bytes) for every frame; RecordingTransport
+        self._frame_hook: FrameHook | None = None
+        self._pending_control_requests: dict[str, _PendingControlRequest] = {}
+        self._control_request_timeout = control_request_timeout
         self._request_counter = 0
         self._close_stdin_after_prompt = close_stdin_after_prompt
+        self._entrypoint = entrypoint
+        # Seconds disconnect() waits after SIGTERM before sending SIGKILL
+        self.grace_period = grace_period
         self._task_group: anyio.abc.TaskGroup | None = None
         self._stderr_file: Any = None  # tempfile.NamedTemporaryFile
+        self._stderr_buffer: _StderrBuffer | None = None
+        self._stderr_drained: anyio.Event | None = None
+        self._decoder = JSONFrameDecoder(loads=resolve_json_loads(options.json_decoder))
 
     def _find_cli(self) -> str:
         """Find Claude Code CLI binary."""
-        if cli := shutil.which("claude"):
-            return cli
-
-        locations = [
-            Path.home() / ".npm-global/bin/claude",
-            Path("/usr/local/bin/claude"),
-            Path.home() / ".local/bin/claude",
-            Path.home() / "node_modules/.bin/claude",
-            Path.home() / ".yarn/bin/claude",
-        ]
-
-        for path in locations:
-            if path.exists() and path.is_file():
-                return str(path)
-
-        node_installed = shutil.which("node") is not None
-
-        if not node_installed:
-            error_msg = "Claude Code requires Node.js, which is not installed.\n\n"
-            error_msg += "Install Node.js from: https://nodejs.org/\n"
-            error_msg += "\nAfter installing Node.js, install Claude Code:\n"
-            error_msg += "  npm install -g @anthropic-ai/claude-code"
-            raise CLINotFoundError(error_msg)
-
-        raise CLINotFoundError(
-            "Claude Code not found. Install with:\n"
-            "  npm install -g @anthropic-ai/claude-code\n"
-            "\nIf already installed locally, try:\n"
-            '  export PATH="$HOME/node_modules/.bin:$PATH"\n'
-            "\nOr specify the path when creating transport:\n"
-            "  SubprocessCLITransport(..., cli_path='/path/to/claude')"
-        )
+        return default_resolver.find()
 
     def _build_command(self) -> list[str]:
         """Build CLI command with arguments."""
-        cmd = [self._cli_path, "--output-format", "stream-json", "--verbose"]
+        # The option-derived part is built once per options until a field
+        # changes, or until one of its argument files has been removed
+        derived = self._options._derived
+        option_args = derived.get("cli_args")
+        if option_args is None or not arg_files_exist(derived["cli_arg_files"]):
+            arg_files: list[str] = []
+            option_args = derived["cli_args"] = tuple(
+                self._build_option_args(arg_files)
+            )
+            derived["cli_arg_files"] = tuple(arg_files)
+        cmd = [self._cli_path, *option_args]
+
+        # Add prompt handling based on mode
+        if self._is_streaming:
+            # Streaming mode: use --input-format stream-json
+            cmd.extend(["--input-format", "stream-json"])
+        else:
+            # String mode: use --print with the prompt
+            cmd.extend(["--print", str(self._prompt)])
+
+        return cmd
+
+    def _over_threshold(self, value: str) -> bool:
+        """Whether value is too large for argv and goes to a file."""
+        threshold = self._options.arg_file_threshold
+        return threshold is not None and len(value.encode()) > threshold
+
+    async def _check_prompt_file_support(self) -> None:
+        """Refuse to pass system prompts by file to a CLI without the flags.
+
+        Raises:
+            CLIConnectionError: If a system prompt would go to a file and the
+                CLI version does not accept the file flags or is unknown
+        """
+        flags = [
+            flag
+            for flag, value in (
+                ("--system-prompt-file", self._options.system_prompt),
+                ("--append-system-prompt-file", self._options.append_system_prompt),
+            )
+            if value and self._over_threshold(value)
+        ]
+        if not flags:
+            return
+        try:
+            version = await default_resolver.version(self._cli_path)
+        except ProcessError as e:
+            raise CLIConnectionError(
+                f"Cannot pass system prompts with {' and '.join(flags)}: "
+                f"failed to read the Claude Code version: {e}"
+            ) from e
+        match = re.match(r"(\d+)\.(\d+)\.(\d+)", version)
+        if match is None or tuple(map(int, match.groups())) < _MIN_PROMPT_FILE_VERSION:
+            minimum = ".".join(map(str, _MIN_PROMPT_FILE_VERSION))
+            raise CLIConnectionError(
+                f"System prompts over arg_file_threshold "
+                f"({self._options.arg_file_threshold} bytes) are passed with "
+                f"{' and '.join(flags)}, which need Claude Code {minimum} or "
+                f"later; {self._cli_path} reports {version!r}. Upgrade Claude "
+                f"Code, or shorten the prompts."
+            )
+
+    def _spill(self, value: str, suffix: str, arg_files: list[str]) -> str | None:
+        """Return a file holding value if it is too large for argv, else None."""
+        if not self._over_threshold(value):
+            return None
+        path = write_arg_file(value, suffix)
+        arg_files.append(path)
+        return path
+
+    def _build_option_args(self, arg_files: list[str]) -> list[str]:
+        """Build the CLI arguments that depend only on the options.
+
+        Values over options.arg_file_threshold are written to files, which
+        are recorded in arg_files, and passed by path.
+        """
+        cmd = ["--output-format", "stream-json", "--verbose"]
 
         if self._options.system_prompt:
-            cmd.extend(["--system-prompt", self._options.system_prompt])
+            if path := self._spill(self._options.system_prompt, ".txt", arg_files):
+                cmd.extend(["--system-prompt-file", path])
+            else:
+                cmd.extend(["--system-prompt", self._options.system_prompt])
 
         if self._options.append_system_prompt:
-            cmd.extend(["--append-system-prompt", self._options.append_system_prompt])
+            append = self._options.append_system_prompt
+            if path := self._spill(append, ".txt", arg_files):
+                cmd.extend(["--append-system-prompt-file", path])
+            else:
+                cmd.extend(["--append-system-prompt", append])
 
         if self._options.allowed_tools:
             cmd.extend(["--allowedTools", ",".join(self._options.allowed_tools)])
@@ -122,7 +276,13 @@ class SubprocessCLITransport(Transport):
             cmd.extend(["--resume", self._options.resume])
 
         if self._options.settings:
-            cmd.extend(["--settings", self._options.settings])
+            settings = self._options.settings
+            # --settings takes a file path or a JSON string; only JSON can spill
+            if settings.lstrip().startswith("{") and (
+                path := self._spill(settings, ".json", arg_files)
+            ):
+                settings = path
+            cmd.extend(["--settings", settings])
 
         if self._options.add_dirs:
             # Convert all paths to strings and add each directory
@@ -132,16 +292,20 @@ class SubprocessCLITransport(Transport):
         if self._options.mcp_servers:
             if isinstance(self._options.mcp_servers, dict):
                 # Dict format: serialize to JSON
+                config = json.dumps({"mcpServers": self._options.mcp_servers})
                 cmd.extend(
-                    [
-                        "--mcp-config",
-                        json.dumps({"mcpServers": self._options.mcp_servers}),
-                    ]
+                    ["--mcp-config", self._spill(config, ".json", arg_files) or config]
                 )
             else:
                 # String or Path format: pass directly as file path or JSON string
                 cmd.extend(["--mcp-config", str(self._options.mcp_servers)])
 
+        if (
+            self._options.include_partial_messages
+            and "include-partial-messages" not in self._options.extra_args
+        ):
+            cmd.append("--include-partial-messages")
+
         # Add extra args for future CLI flags
         for flag, value in self._options.extra_args.items():
             if value is None:
@@ -151,14 +315,6 @@ class SubprocessCLITransport(Transport):
                 # Flag with value
                 cmd.extend([f"--{flag}", str(value)])
 
-        # Add prompt handling based on mode
-        if self._is_streaming:
-            # Streaming mode: use --input-format stream-json
-            cmd.extend(["--input-format", "stream-json"])
-        else:
-            # String mode: use --print with the prompt
-            cmd.extend(["--print", str(self._prompt)])
-
         return cmd
 
     async def connect(self) -> None:
@@ -166,33 +322,46 @@ class SubprocessCLITransport(Transport):
         if self._process:
             return
 
+        await self._check_prompt_file_support()
         cmd = self._build_command()
+        pipe_stderr = (
+            self._options.stderr_mode == "pipe" or self._options.stderr is not None
+        )
         try:
-            # Create a temp file for stderr to avoid pipe buffer deadlock
-            # We can't use context manager as we need it for the subprocess lifetime
-            self._stderr_file = tempfile.NamedTemporaryFile(  # noqa: SIM115
-                mode="w+", prefix="claude_stderr_", suffix=".log", delete=False
-            )
+            if pipe_stderr:
+                # Drained in the background into a bounded in-memory buffer
+                stderr_target: Any = PIPE
+            else:
+                # Create a temp file for stderr to avoid pipe buffer deadlock
+                # We can't use context manager as we need it for the subprocess lifetime
+                self._stderr_file = tempfile.NamedTemporaryFile(  # noqa: SIM115
+                    mode="w+", prefix="claude_stderr_", suffix=".log", delete=False
+                )
+                stderr_target = self._stderr_file
 
             # Enable stdin pipe for both modes (but we'll close it for string mode)
             # Merge environment variables: system -> user -> SDK required
-            process_env = {
-                **os.environ,
-                **self._options.env,  # User-provided env vars
-                "CLAUDE_CODE_ENTRYPOINT": "sdk-py",
-            }
+            process_env = default_environment.build(self._options.env, self._entrypoint)
 
             self._process = await anyio.open_process(
                 cmd,
                 stdin=PIPE,
                 stdout=PIPE,
-                stderr=self._stderr_file,
+                stderr=stderr_target,
                 cwd=self._cwd,
                 env=process_env,
             )
+            self._loop_token = current_token()
+            _live_transports.add(self)
 
             if self._process.stdout:
-                self._stdout_stream = TextReceiveStream(self._process.stdout)
+                # Read raw bytes; frames go to the JSON decoder undecoded
+                self._stdout_stream = self._process.stdout
+
+            if pipe_stderr and self._process.stderr:
+                self._stderr_buffer = _StderrBuffer()
+                self._stderr_drained = anyio.Event()
+                await self._start_task(self._drain_stderr, self._process.stderr)
 
             # Handle stdin based on mode
             if self._is_streaming:
@@ -200,9 +369,7 @@ class SubprocessCLITransport(Transport):
                 if self._process.stdin:
                     self._stdin_stream = TextSendStream(self._process.stdin)
                     # Start streaming messages to stdin in background
-                    self._task_group = anyio.create_task_group()
-                    await self._task_group.__aenter__()
-                    self._task_group.start_soon(self._stream_to_stdin)
+                    await self._start_task(self._stream_to_stdin)
             else:
                 # String mode: close stdin immediately (backward compatible)
                 if self._process.stdin:
@@ -214,45 +381,128 @@ class SubprocessCLITransport(Transport):
                 raise CLIConnectionError(
                     f"Working directory does not exist: {self._cwd}"
                 ) from e
+            if self._cli_path_found:
+                # The cached location went away; search again next time
+                default_resolver.invalidate()
             raise CLINotFoundError(f"Claude Code not found at: {self._cli_path}") from e
         except Exception as e:
             raise CLIConnectionError(f"Failed to start Claude Code: {e}") from e
 
-    async def disconnect(self) -> None:
-        """Terminate subprocess."""
-        if not self._process:
-            return
-
-        # Cancel task group if it exists
-        if self._task_group:
-            self._task_group.cancel_scope.cancel()
-            await self._task_group.__aexit__(None, None, None)
-            self._task_group = None
+    async def _start_task(self, func: Any, *args: Any) -> None:
+        """Run a background task for the lifetime of the process."""
+        if self._task_group is None:
+            self._task_group = anyio.create_task_group()
+            await self._task_group.__aenter__()
+        self._task_group.start_soon(func, *args)
+
+    async def _drain_stderr(self, stream: ByteReceiveStream) -> None:
+        """Read stderr into the ring buffer, forwarding lines to the callback."""
+        assert self._stderr_buffer is not None
+        callback = self._options.stderr
+        # Bytes of the line being read, capped so a stream that never sends
+        # a newline cannot grow it without bound
+        partial = bytearray()
+        try:
+            async for chunk in stream:
+                end = chunk.rfind(b"\n")
+                if end == -1:
+                    partial += chunk
+                else:
+                    partial += chunk[:end]
+                    for line in partial.split(b"\n"):
+                        self._record_stderr_line(line, callback)
+                    partial = bytearray(chunk[end + 1 :])
+                if len(partial) > _STDERR_MAX_BYTES:
+                    del partial[:-_STDERR_MAX_BYTES]
+            self._record_stderr_line(partial, callback)
+        except (anyio.ClosedResourceError, anyio.BrokenResourceError):
+            pass
+        finally:
+            if self._stderr_drained is not None:
+                self._stderr_drained.set()
 
-        if self._process.returncode is None:
+    def _record_stderr_line(self, data: bytes | bytearray, callback: Any) -> None:
+        line = data.decode(errors="replace").strip()
+        if not line:
+            return
+        assert self._stderr_buffer is not None
+        self._stderr_buffer.append(line)
+        if callback is not None:
             try:
-                self._process.terminate()
-                with anyio.fail_after(5.0):
-                    await self._process.wait()
-            except TimeoutError:
-                self._process.kill()
-                await self._process.wait()
-            except ProcessLookupError:
-                pass
-
-        # Clean up temp file
+                callback(line)
+            except Exception as e:
+                logger.debug(f"stderr callback raised: {e}")
+
+    async def _collect_stderr(self) -> str:
+        """Return the tail of stderr once the process has exited."""
+        if self._stderr_drained is not None:
+            # stderr reaches EOF with the process unless a child inherited it
+            with anyio.move_on_after(1.0):
+                await self._stderr_drained.wait()
+            return self._stderr_buffer.render() if self._stderr_buffer else ""
+
+        # Read stderr from temp file (keep only the tail for memory efficiency)
+        stderr_buffer = _StderrBuffer()
         if self._stderr_file:
             try:
-                self._stderr_file.close()
-                Path(self._stderr_file.name).unlink()
+                # Flush any pending writes
+                self._stderr_file.flush()
+                # Read from the beginning
+                self._stderr_file.seek(0)
+                for line in self._stderr_file:
+                    line_text = line.strip()
+                    if line_text:
+                        stderr_buffer.append(line_text)
             except Exception:
                 pass
-            self._stderr_file = None
+        return stderr_buffer.render()
+
+    async def disconnect(self) -> None:
+        """Terminate subprocess."""
+        if not self._process:
+            return
 
-        self._process = None
-        self._stdout_stream = None
-        self._stderr_stream = None
-        self._stdin_stream = None
+        self._fail_pending_control_requests(
+            CLIConnectionError("Transport disconnected")
+        )
+
+        try:
+            # Cancel task group if it exists
+            if self._task_group:
+                task_group, self._task_group = self._task_group, None
+                task_group.cancel_scope.cancel()
+                await task_group.__aexit__(None, None, None)
+        finally:
+            # Shielded so a cancelled caller still reaps the CLI process. The
+            # task group above cannot be shielded by the caller: it must be
+            # exited from the cancel scope it was entered in.
+            with anyio.CancelScope(shield=True):
+                if self._process.returncode is None:
+                    try:
+                        self._process.terminate()
+                        with anyio.fail_after(self.grace_period):
+                            await self._process.wait()
+                    except TimeoutError:
+                        self._process.kill()
+                        await self._process.wait()
+                    except ProcessLookupError:
+                        pass
+
+            # Clean up temp file
+            if self._stderr_file:
+                try:
+                    self._stderr_file.close()
+                    Path(self._stderr_file.name).unlink()
+                except Exception:
+                    pass
+                self._stderr_file = None
+
+            _live_transports.discard(self)
+            self._process = None
+            self._stdout_stream = None
+            self._stderr_stream = None
+            self._stdin_stream = None
+            self._stderr_drained = None
 
     async def send_request(self, messages: list[Any], options: dict[str, Any]) -> None:
         """Send additional messages in streaming mode."""
@@ -273,7 +523,14 @@ class SubprocessCLITransport(Transport):
                     "session_id": options.get("session_id", "default"),
                 }
 
-            await self._stdin_stream.send(json.dumps(message) + "\n")
+            await self._send_line(json.dumps(message) + "\n", FRAME_OUT)
+
+    async def _send_line(self, line: str, direction: str) -> None:
+        if self._stdin_stream is None:
+            raise CLIConnectionError("stdin not available - stream may have ended")
+        if self._frame_hook is not None:
+            self._frame_hook(direction, line.encode())
+        await self._stdin_stream.send(line)
 
     async def _stream_to_stdin(self) -> None:
         """Stream messages to stdin for streaming mode."""
@@ -284,7 +541,7 @@ class SubprocessCLITransport(Transport):
             async for message in self._prompt:
                 if not self._stdin_stream:
                     break
-                await self._stdin_stream.send(json.dumps(message) + "\n")
+                await self._send_line(json.dumps(message) + "\n", FRAME_PROMPT)
 
             # Close stdin after prompt if requested (e.g., for query() one-shot mode)
             if self._close_stdin_after_prompt and self._stdin_stream:
@@ -297,61 +554,37 @@ class SubprocessCLITransport(Transport):
                 await self._stdin_stream.aclose()
                 self._stdin_stream = None
 
-    async def receive_messages(self) -> AsyncIterator[dict[str, Any]]:
-        """Receive messages from CLI."""
+    async def receive_messages(
+        self, message_types: str | Collection[str] | None = None
+    ) -> AsyncGenerator[dict[str, Any], None]:
+        """Receive messages from CLI.
+
+        Args:
+            message_types: Values of the "type" field to deliver, or a single
+                value. Other messages are dropped, without being decoded when
+                their type can be read from the start of the line. None
+                delivers all.
+        """
         if not self._process or not self._stdout_stream:
             raise CLIConnectionError("Not connected")
 
-        json_buffer = ""
+        wanted = None
+        if isinstance(message_types, str):
+            wanted = frozenset({message_types}) | _CONTROL_MESSAGE_TYPES
+        elif message_types is not None:
+            wanted = frozenset(message_types) | _CONTROL_MESSAGE_TYPES
 
         # Process stdout messages first
         try:
-            async for line in self._stdout_stream:
-                line_str = line.strip()
-                if not line_str:
+            async for data in self._read_frames(wanted):
+                if self._handle_control_response(data):
                     continue
-
-                json_lines = line_str.split("\n")
-
-                for json_line in json_lines:
-                    json_line = json_line.strip()
-                    if not json_line:
-                        continue
-
-                    # Keep accumulating partial JSON until we can parse it
-                    json_buffer += json_line
-
-                    if len(json_buffer) > _MAX_BUFFER_SIZE:
-                        json_buffer = ""
-                        raise SDKJSONDecodeError(
-                            f"JSON message exceeded maximum buffer size of {_MAX_BUFFER_SIZE} bytes",
-                            ValueError(
-                                f"Buffer size {len(json_buffer)} exceeds limit {_MAX_BUFFER_SIZE}"
-                            ),
-                        )
-
-                    try:
-                        data = json.loads(json_buffer)
-                        json_buffer = ""
-
-                        # Handle control responses separately
-                        if data.get("type") == "control_response":
-                            response = data.get("response", {})
-                            request_id = response.get("request_id")
-                            if request_id:
-                                # Store the response for the pending request
-                                self._pending_control_responses[request_id] = response
-                            continue
-
-                        try:
-                            yield data
-                        except GeneratorExit:
-                            return
-                    except json.JSONDecodeError:
-                        # We are speculatively decoding the buffer until we get
-                        # a full JSON object. If there is an actual issue, we
-                        # raise an error after _MAX_BUFFER_SIZE.
-                        continue
+                if wanted is not None and data.get("type") not in wanted:
+                    continue
+                try:
+                    yield data
+                except GeneratorExit:
+                    return
 
         except anyio.ClosedResourceError:
             pass
@@ -359,20 +592,10 @@ class SubprocessCLITransport(Transport):
             # Client disconnected - still need to clean up
             pass
 
-        # Read stderr from temp file (keep only last N lines for memory efficiency)
-        stderr_lines: deque[str] = deque(maxlen=100)  # Keep last 100 lines
-        if self._stderr_file:
-            try:
-                # Flush any pending writes
-                self._stderr_file.flush()
-                # Read from the beginning
-                self._stderr_file.seek(0)
-                for line in self._stderr_file:
-                    line_text = line.strip()
-                    if line_text:
-                        stderr_lines.append(line_text)
-            except Exception:
-                pass
+        # Nothing will answer outstanding control requests once stdout is gone
+        self._fail_pending_control_requests(
+            CLIConnectionError("CLI output ended before control response")
+        )
 
         # Check process completion and handle errors
         try:
@@ -380,13 +603,7 @@ class SubprocessCLITransport(Transport):
         except Exception:
             returncode = -1
 
-        # Convert deque to string for error reporting
-        stderr_output = "\n".join(list(stderr_lines)) if stderr_lines else ""
-        if len(stderr_lines) == stderr_lines.maxlen:
-            stderr_output = (
-                f"[stderr truncated, showing last {stderr_lines.maxlen} lines]\n"
-                + stderr_output
-            )
+        stderr_output = await self._collect_stderr()
 
         # Use exit code for error detection, not string matching
         if returncode is not None and returncode != 0:
@@ -399,12 +616,67 @@ class SubprocessCLITransport(Transport):
             # Log stderr for debugging but don't fail on non-zero exit
             logger.debug(f"Process stderr: {stderr_output}")
 
+    async def _read_frames(
+        self, wanted: frozenset[str] | None = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Decode JSON objects from stdout, parsing each frame exactly once."""
+        assert self._stdout_stream is not None
+        decoder = self._decoder
+        hook = self._frame_hook
+        if wanted is not None:
+            decoder.wanted_types = frozenset(t.encode() for t in wanted)
+        try:
+            async for chunk in self._stdout_stream:
+                if hook is not None:
+                    hook(FRAME_IN, chunk)
+                for data in decoder.feed(chunk):
+                    yield data
+            for data in decoder.flush():
+                yield data
+        finally:
+            decoder.wanted_types = None
+
+    @property
+    def skipped_messages(self) -> int:
+        """Messages dropped by a message_types filter without being decoded."""
+        return self._decoder.skipped
+
+    def _handle_control_response(self, data: dict[str, Any]) -> bool:
+        """Route control responses to their pending request.
+
+        Returns True if the message was a control response and was consumed.
+        """
+        if data.get("type") != "control_response":
+            return False
+        response = data.get("response", {})
+        request_id = response.get("request_id")
+        pending = self._pending_control_requests.get(request_id)
+        if pending is None:
+            # Late response for a request that already timed out or was never ours
+            logger.debug(f"Dropping orphaned control response: {request_id}")
+            return True
+        pending.response = response
+        pending.event.set()
+        return True
+
+    def _fail_pending_control_requests(self, error: Exception) -> None:
+        """Wake every waiting control request with an error."""
+        for pending in self._pending_control_requests.values():
+            if not pending.event.is_set():
+                pending.error = error
+                pending.event.set()
+
     def is_connected(self) -> bool:
         """Check if subprocess is running."""
         return self._process is not None and self._process.returncode is None
 
-    async def interrupt(self) -> None:
-        """Send interrupt control request (only works in streaming mode)."""
+    async def interrupt(self, timeout: float | None = None) -> None:
+        """Send interrupt control request (only works in streaming mode).
+
+        Args:
+            timeout: Seconds to wait for the CLI to acknowledge the interrupt.
+                Defaults to the transport's ``control_request_timeout``.
+        """
         if not self._is_streaming:
             raise CLIConnectionError(
                 "Interrupt requires streaming mode (AsyncIterable prompt)"
@@ -413,13 +685,23 @@ class SubprocessCLITransport(Transport):
         if not self._stdin_stream:
             raise CLIConnectionError("Not connected or stdin not available")
 
-        await self._send_control_request({"subtype": "interrupt"})
+        await self._send_control_request({"subtype": "interrupt"}, timeout=timeout)
+
+    async def _send_control_request(
+        self, request: dict[str, Any], timeout: float | None = None
+    ) -> dict[str, Any]:
+        """Send a control request and wait for response.
 
-    async def _send_control_request(self, request: dict[str, Any]) -> dict[str, Any]:
-        """Send a control request and wait for response."""
+        The response is delivered by receive_messages(), which must be running
+        concurrently. Raises CLIConnectionError if no response arrives within
+        the deadline; the pending entry is always removed.
+        """
         if not self._stdin_stream:
             raise CLIConnectionError("Stdin not available")
 
+        if timeout is None:
+            timeout = self._control_request_timeout
+
         # Generate unique request ID
         self._request_counter += 1
         request_id = f"req_{self._request_counter}_{os.urandom(4).hex()}"
@@ -431,15 +713,27 @@ class SubprocessCLITransport(Transport):
             "request": request,
         }
 
-        # Send request
-        await self._stdin_stream.send(json.dumps(control_request) + "\n")
+        pending = _PendingControlRequest()
+        self._pending_control_requests[request_id] = pending
+        try:
+            # Send request
+            await self._send_line(json.dumps(control_request) + "\n", FRAME_OUT)
 
-        # Wait for response
-        while request_id not in self._pending_control_responses:
-            await anyio.sleep(0.1)
+            # Wait for the reader loop to resolve it
+            try:
+                with anyio.fail_after(timeout):
+                    await pending.event.wait()
+            except TimeoutError as e:
+                raise CLIConnectionError(
+                    f"Control request {request.get('subtype')!r} timed out after {timeout}s"
+                ) from e
+        finally:
+            self._pending_control_requests.pop(request_id, None)
 
-        response = self._pending_control_responses.pop(request_id)
+        if pending.error is not None:
+            raise pending.error
 
+        response = pending.response or {}
         if response.get("subtype") == "error":
             raise CLIConnectionError(f"Control request failed: {response.get('error')}")
 
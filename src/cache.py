@@ -0,0 +1,296 @@
+"""Content-addressed cache of query() results."""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, fields, is_dataclass, replace
+from pathlib import Path
+from typing import Any
+
+import anyio
+
+from ._internal.message_parser import LazyContentBlocks
+from ._internal.options_key import query_key
+from .sdk_types import (
+    AssistantMessage,
+    ClaudeCodeOptions,
+    Message,
+    ResultMessage,
+    StreamEvent,
+    SystemMessage,
+    TextBlock,
+    ThinkingBlock,
+    ToolResultBlock,
+    ToolUseBlock,
+    UserMessage,
+)
+
+_TYPE_TAG = "__sdk_type__"
+_SERIALIZABLE_TYPES: dict[str, type] = {
+    cls.__name__: cls
+    for cls in (
+        UserMessage,
+        AssistantMessage,
+        SystemMessage,
+        ResultMessage,
+        StreamEvent,
+        TextBlock,
+        ThinkingBlock,
+        ToolUseBlock,
+        ToolResultBlock,
+    )
+}
+
+
+def _encode(value: Any) -> Any:
+    if is_dataclass(value) and not isinstance(value, type):
+        encoded = {f.name: _encode(getattr(value, f.name)) for f in fields(value)}
+        encoded[_TYPE_TAG] = type(value).__name__
+        return encoded
+    if isinstance(value, list | LazyContentBlocks):
+        return [_encode(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _encode(v) for k, v in value.items()}
+    return value
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    if isinstance(value, dict):
+        decoded = {k: _decode(v) for k, v in value.items() if k != _TYPE_TAG}
+        type_name = value.get(_TYPE_TAG)
+        if type_name is not None:
+            return _SERIALIZABLE_TYPES[type_name](**decoded)
+        return decoded
+    return value
+
+
+@dataclass
+class CacheStats:
+    """Counters for a QueryCache."""
+
+    hits: int = 0
+    misses: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class QueryCache:
+    """
+    Cache complete query() message sequences by prompt and options.
+
+    Entries are keyed by a SHA-256 of the prompt and the options that affect
+    the CLI invocation. Lookups go to an in-memory LRU first, then to an
+    optional SQLite file shared across processes and runs. Only successful
+    runs (ending in a non-error ResultMessage) for string prompts are stored.
+
+    Cached messages are replayed as the same objects on memory hits, so
+    callers should treat them as read-only. query() uses aget() and aput(),
+    which run the SQLite reads and writes in a worker thread so disk I/O
+    never blocks the event loop.
+
+    Example:
+        ```python
+        cache = QueryCache(path=".claude-cache.sqlite", ttl=3600)
+        async for message in query(prompt="Explain this repo", cache=cache):
+            print(message)
+        print(cache.stats().hit_rate)
+        ```
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl: float | None = None,
+        path: str | Path | None = None,
+        max_disk_entries: int | None = 10_000,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Entries kept in the in-memory LRU tier
+            ttl: Seconds an entry stays valid; None keeps entries until evicted
+            path: SQLite file for the on-disk tier; None disables it
+            max_disk_entries: Entries kept on disk; least recently used go first
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_entries = max_disk_entries
+        self._memory: OrderedDict[str, tuple[float, list[Message]]] = OrderedDict()
+        self._stats = CacheStats()
+        self._db: sqlite3.Connection | None = None
+        # Serializes use of the connection across worker threads
+        self._db_lock = threading.Lock()
+        if path is not None:
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS query_cache ("
+                "key TEXT PRIMARY KEY, created REAL, accessed REAL, messages TEXT)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS query_cache_accessed "
+                "ON query_cache (accessed)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def key(prompt: str, options: ClaudeCodeOptions) -> str:
+        """Return the cache key for a prompt run with options."""
+        return query_key(prompt, options)
+
+    def get(self, key: str) -> list[Message] | None:
+        """Return the cached messages for key, or None on a miss."""
+        now = time.time()
+        messages = self._get_memory(key, now)
+        if messages is None and self._db is not None:
+            messages = self._disk_hit(key, self._read_disk(key, now))
+        if messages is None:
+            self._stats.misses += 1
+        return messages
+
+    async def aget(self, key: str) -> list[Message] | None:
+        """Like get(), but reads the on-disk tier in a worker thread."""
+        now = time.time()
+        messages = self._get_memory(key, now)
+        if messages is None and self._db is not None:
+            found = await anyio.to_thread.run_sync(self._read_disk, key, now)
+            messages = self._disk_hit(key, found)
+        if messages is None:
+            self._stats.misses += 1
+        return messages
+
+    def put(self, key: str, messages: list[Message]) -> None:
+        """Store a complete message sequence under key."""
+        now = time.time()
+        self._remember(key, now, messages)
+        self._stats.stores += 1
+        if self._db is not None:
+            self._stats.evictions += self._write_disk(key, now, messages)
+
+    async def aput(self, key: str, messages: list[Message]) -> None:
+        """Like put(), but writes the on-disk tier in a worker thread."""
+        now = time.time()
+        self._remember(key, now, messages)
+        self._stats.stores += 1
+        if self._db is not None:
+            self._stats.evictions += await anyio.to_thread.run_sync(
+                self._write_disk, key, now, messages
+            )
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers."""
+        self._memory.clear()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.execute("DELETE FROM query_cache")
+                self._db.commit()
+
+    def stats(self) -> CacheStats:
+        """Return a copy of the hit/miss counters."""
+        return replace(self._stats)
+
+    def close(self) -> None:
+        """Close the on-disk tier."""
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _get_memory(self, key: str, now: float) -> list[Message] | None:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        created, messages = entry
+        if self._expired(created, now):
+            del self._memory[key]
+            self._stats.evictions += 1
+            return None
+        self._memory.move_to_end(key)
+        self._stats.hits += 1
+        self._stats.memory_hits += 1
+        return messages
+
+    def _read_disk(
+        self, key: str, now: float
+    ) -> tuple[float, list[Message] | None] | None:
+        """Look key up on disk; messages are None if the entry had expired.
+
+        Runs in a worker thread for aget(), so it must not touch the stats or
+        the memory tier.
+        """
+        with self._db_lock:
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT created, messages FROM query_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            created, payload = row
+            if self._expired(created, now):
+                self._db.execute("DELETE FROM query_cache WHERE key = ?", (key,))
+                self._db.commit()
+                return created, None
+            self._db.execute(
+                "UPDATE query_cache SET accessed = ? WHERE key = ?", (now, key)
+            )
+            self._db.commit()
+        return created, _decode(json.loads(payload))
+
+    def _disk_hit(
+        self, key: str, found: tuple[float, list[Message] | None] | None
+    ) -> list[Message] | None:
+        if found is None:
+            return None
+        created, messages = found
+        if messages is None:
+            self._stats.evictions += 1
+            return None
+        self._remember(key, created, messages)
+        self._stats.hits += 1
+        self._stats.disk_hits += 1
+        return messages
+
+    def _write_disk(self, key: str, now: float, messages: list[Message]) -> int:
+        """Store messages on disk; returns the number of entries evicted."""
+        payload = json.dumps(_encode(messages))
+        with self._db_lock:
+            if self._db is None:
+                return 0
+            self._db.execute(
+                "INSERT OR REPLACE INTO query_cache VALUES (?, ?, ?, ?)",
+                (key, now, now, payload),
+            )
+            evicted = 0
+            if self.max_disk_entries is not None:
+                cursor = self._db.execute(
+                    "DELETE FROM query_cache WHERE key IN ("
+                    "SELECT key FROM query_cache ORDER BY accessed DESC "
+                    "LIMIT -1 OFFSET ?)",
+                    (self.max_disk_entries,),
+                )
+                evicted = max(cursor.rowcount, 0)
+            self._db.commit()
+        return evicted
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl is not None and now - created > self.ttl
+
+    def _remember(self, key: str, created: float, messages: list[Message]) -> None:
+        self._memory[key] = (created, messages)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats.evictions += 1
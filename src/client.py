@@ -1,11 +1,65 @@
 """Claude SDK Client for interacting with Claude Code."""
 
-import os
+import time
+from collections import deque
 from collections.abc import AsyncIterable, AsyncIterator
-from typing import Any
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 from ._errors import CLIConnectionError
-from .sdk_types import ClaudeCodeOptions, Message, ResultMessage
+from ._internal.message_parser import LazyContentBlocks
+from .sdk_types import (
+    AssistantMessage,
+    ClaudeCodeOptions,
+    Message,
+    ResultMessage,
+    StreamEvent,
+    TextBlock,
+)
+
+if TYPE_CHECKING:
+    from ._internal.message_filter import MessageTypes
+
+
+@dataclass
+class ResponseTiming:
+    """Latency of one response, measured from the query() that requested it."""
+
+    sent_at: float  # time.perf_counter() when the query was sent
+    time_to_first_token: float | None = None  # Seconds until the first text
+    duration: float | None = None  # Seconds until the ResultMessage
+
+    def _observe(self, message: Message) -> None:
+        if self.time_to_first_token is None and _has_text(message):
+            self.time_to_first_token = time.perf_counter() - self.sent_at
+        if isinstance(message, ResultMessage) and self.duration is None:
+            self.duration = time.perf_counter() - self.sent_at
+
+
+def _text_delta(message: StreamEvent) -> str | None:
+    """Return the text carried by a content_block_delta event, if any."""
+    event = message.event
+    if event.get("type") != "content_block_delta":
+        return None
+    delta = event.get("delta") or {}
+    if delta.get("type") != "text_delta":
+        return None
+    return delta.get("text") or None
+
+
+def _has_text(message: Message) -> bool:
+    if isinstance(message, StreamEvent):
+        return _text_delta(message) is not None
+    if isinstance(message, AssistantMessage):
+        content = message.content
+        # Do not force lazily parsed content just to time it
+        if isinstance(content, LazyContentBlocks):
+            raw_types = content.raw_types()
+            if raw_types is not None:
+                return "text" in raw_types
+        return any(isinstance(block, TextBlock) for block in content)
+    return False
 
 
 class ClaudeSDKClient:
@@ -90,43 +144,70 @@ class ClaudeSDKClient:
         ```
     """
 
-    def __init__(self, options: ClaudeCodeOptions | None = None):
-        """Initialize Claude SDK client."""
+    def __init__(
+        self,
+        options: ClaudeCodeOptions | None = None,
+        cli_path: str | Path | None = None,
+    ):
+        """Initialize Claude SDK client.
+
+        Args:
+            options: Options for the CLI process
+            cli_path: Optional explicit path to the Claude Code CLI
+        """
         if options is None:
             options = ClaudeCodeOptions()
         self.options = options
+        self._cli_path = cli_path
         self._transport: Any | None = None
-        os.environ["CLAUDE_CODE_ENTRYPOINT"] = "sdk-py-client"
+        # One entry per query() whose ResultMessage has not arrived yet
+        self._pending_timings: deque[ResponseTiming] = deque()
+        self.last_timing: ResponseTiming | None = None
 
     async def connect(
         self, prompt: str | AsyncIterable[dict[str, Any]] | None = None
     ) -> None:
         """Connect to Claude with a prompt or message stream."""
-        from ._internal.transport.subprocess_cli import SubprocessCLITransport
-
-        # Auto-connect with empty async iterable if no prompt is provided
-        async def _empty_stream() -> AsyncIterator[dict[str, Any]]:
-            # Never yields, but indicates that this function is an iterator and
-            # keeps the connection open.
-            # This yield is never reached but makes this an async generator
-            return
-            yield {}  # type: ignore[unreachable]
+        from ._internal.transport.subprocess_cli import (
+            SubprocessCLITransport,
+            idle_stream,
+        )
 
+        # Auto-connect with an empty stream if no prompt is provided
         self._transport = SubprocessCLITransport(
-            prompt=_empty_stream() if prompt is None else prompt,
+            prompt=idle_stream() if prompt is None else prompt,
             options=self.options,
+            cli_path=self._cli_path,
+            entrypoint="sdk-py-client",
         )
         await self._transport.connect()
 
-    async def receive_messages(self) -> AsyncIterator[Message]:
-        """Receive all messages from Claude."""
+    async def receive_messages(
+        self, message_types: "MessageTypes | None" = None
+    ) -> AsyncIterator[Message]:
+        """
+        Receive all messages from Claude.
+
+        Args:
+            message_types: Optional message classes to yield, e.g.
+                {AssistantMessage}. Other messages are dropped by the transport
+                before they are decoded or parsed. ResultMessage is always
+                yielded.
+        """
         if not self._transport:
             raise CLIConnectionError("Not connected. Call connect() first.")
 
+        from ._internal.message_filter import message_type_names, receive_filtered
         from ._internal.message_parser import parse_message
 
-        async for data in self._transport.receive_messages():
-            yield parse_message(data)
+        wanted = None if message_types is None else message_type_names(message_types)
+        async for data in receive_filtered(self._transport, wanted):
+            message = parse_message(data, self.options.lazy_content)
+            if self._pending_timings:
+                self._pending_timings[0]._observe(message)
+                if isinstance(message, ResultMessage):
+                    self.last_timing = self._pending_timings.popleft()
+            yield message
 
     async def query(
         self, prompt: str | AsyncIterable[dict[str, Any]], session_id: str = "default"
@@ -141,6 +222,8 @@ class ClaudeSDKClient:
         if not self._transport:
             raise CLIConnectionError("Not connected. Call connect() first.")
 
+        self._pending_timings.append(ResponseTiming(sent_at=time.perf_counter()))
+
         # Handle string prompts
         if isinstance(prompt, str):
             message = {
@@ -162,13 +245,25 @@ class ClaudeSDKClient:
             if messages:
                 await self._transport.send_request(messages, {"session_id": session_id})
 
-    async def interrupt(self) -> None:
-        """Send interrupt signal (only works with streaming mode)."""
+    async def interrupt(self, timeout: float | None = None) -> None:
+        """
+        Send interrupt signal (only works with streaming mode).
+
+        Args:
+            timeout: Seconds to wait for the CLI to acknowledge the interrupt
+                before raising CLIConnectionError. Defaults to the transport's
+                control request timeout.
+        """
         if not self._transport:
             raise CLIConnectionError("Not connected. Call connect() first.")
-        await self._transport.interrupt()
+        if timeout is None:
+            await self._transport.interrupt()
+        else:
+            await self._transport.interrupt(timeout=timeout)
 
-    async def receive_response(self) -> AsyncIterator[Message]:
+    async def receive_response(
+        self, message_types: "MessageTypes | None" = None
+    ) -> AsyncIterator[Message]:
         """
         Receive messages from Claude until and including a ResultMessage.
 
@@ -182,6 +277,10 @@ class ClaudeSDKClient:
         - The ResultMessage IS included in the yielded messages
         - If no ResultMessage is received, the iterator continues indefinitely
 
+        Args:
+            message_types: Optional message classes to yield, as for
+                receive_messages(). The ResultMessage is always included.
+
         Yields:
             Message: Each message received (UserMessage, AssistantMessage, SystemMessage, ResultMessage)
 
@@ -204,11 +303,46 @@ class ClaudeSDKClient:
             To collect all messages: `messages = [msg async for msg in client.receive_response()]`
             The final message in the list will always be a ResultMessage.
         """
-        async for message in self.receive_messages():
+        async for message in self.receive_messages(message_types):
             yield message
             if isinstance(message, ResultMessage):
                 return
 
+    async def receive_text(self) -> AsyncIterator[str]:
+        """
+        Yield the assistant's text for the current response as it arrives.
+
+        With options.include_partial_messages set, text is yielded delta by
+        delta from StreamEvent messages; otherwise each text block is yielded
+        once its AssistantMessage is complete. Stops after the ResultMessage,
+        like receive_response(). The response's time to first token is then
+        available as last_timing.time_to_first_token.
+
+        Example:
+            ```python
+            options = ClaudeCodeOptions(include_partial_messages=True)
+            async with ClaudeSDKClient(options) as client:
+                await client.query("Write a haiku")
+                async for text in client.receive_text():
+                    print(text, end="", flush=True)
+                print(f"\nTTFT: {client.last_timing.time_to_first_token:.2f}s")
+            ```
+        """
+        streamed = False
+        async for message in self.receive_response(
+            message_types=(StreamEvent, AssistantMessage)
+        ):
+            if isinstance(message, StreamEvent):
+                text = _text_delta(message)
+                if text is not None:
+                    streamed = True
+                    yield text
+            elif isinstance(message, AssistantMessage) and not streamed:
+                # Partial messages are off: fall back to whole text blocks
+                for block in message.content:
+                    if isinstance(block, TextBlock):
+                        yield block.text
+
     async def disconnect(self) -> None:
         """Disconnect from Claude."""
         if self._transport:
@@ -0,0 +1,386 @@
+"""Many logical sessions sharing a few streaming Claude Code processes."""
+
+import contextlib
+import logging
+import math
+import time
+import uuid
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import replace
+from pathlib import Path
+from typing import Any
+
+import anyio
+from anyio.abc import TaskGroup, TaskStatus
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
+
+from ._errors import CLIConnectionError
+from ._internal.message_parser import parse_message
+from ._internal.transport.subprocess_cli import SubprocessCLITransport, idle_stream
+from .sdk_types import ClaudeCodeOptions, Message, ResultMessage
+
+logger = logging.getLogger(__name__)
+
+_Turn = tuple[list[dict[str, Any]], anyio.Event]
+
+
+class MultiplexedSession:
+    """
+    A logical conversation served by the multiplexer's processes.
+
+    Obtained from ClaudeSessionMultiplexer.session(). Mirrors the
+    ClaudeSDKClient query()/receive_response() API. Turns run in the order
+    they were queued.
+    """
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        # CLI conversation id, from the last ResultMessage; used to resume the
+        # conversation when the session moves to another process
+        self.cli_session_id: str | None = None
+        self._process: _ConversationProcess | None = None
+        self._turns_send: MemoryObjectSendStream[list[dict[str, Any]]]
+        self._turns_receive: MemoryObjectReceiveStream[list[dict[str, Any]]]
+        self._turns_send, self._turns_receive = anyio.create_memory_object_stream[
+            list[dict[str, Any]]
+        ](math.inf)
+        self._inbox_send: MemoryObjectSendStream[Message | Exception]
+        self._inbox_receive: MemoryObjectReceiveStream[Message | Exception]
+        self._inbox_send, self._inbox_receive = anyio.create_memory_object_stream[
+            Message | Exception
+        ](math.inf)
+
+    async def query(self, prompt: str | AsyncIterable[dict[str, Any]]) -> None:
+        """Queue a turn for this session."""
+        if isinstance(prompt, str):
+            messages = [
+                {
+                    "type": "user",
+                    "message": {"role": "user", "content": prompt},
+                    "parent_tool_use_id": None,
+                    "session_id": self.session_id,
+                }
+            ]
+        else:
+            messages = []
+            async for msg in prompt:
+                msg.setdefault("session_id", self.session_id)
+                messages.append(msg)
+        if messages:
+            try:
+                await self._turns_send.send(messages)
+            except anyio.ClosedResourceError as e:
+                raise CLIConnectionError(
+                    f"Session {self.session_id!r} is closed"
+                ) from e
+
+    async def receive_messages(self) -> AsyncIterator[Message]:
+        """Receive all messages routed to this session."""
+        async for item in self._inbox_receive:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    async def receive_response(self) -> AsyncIterator[Message]:
+        """Receive messages until and including the ResultMessage of a turn."""
+        async for message in self.receive_messages():
+            yield message
+            if isinstance(message, ResultMessage):
+                return
+
+    def _deliver(self, item: Message | Exception) -> None:
+        with contextlib.suppress(anyio.ClosedResourceError, anyio.BrokenResourceError):
+            self._inbox_send.send_nowait(item)
+
+    def close(self) -> None:
+        """Detach the session; queued turns are dropped."""
+        self._turns_send.close()
+        self._inbox_send.close()
+        self._inbox_receive.close()
+
+
+class _ConversationProcess:
+    """A streaming CLI process holding the conversation of a single session."""
+
+    def __init__(
+        self,
+        session: MultiplexedSession,
+        options: ClaudeCodeOptions,
+        cli_path: str | Path | None,
+    ):
+        self.session = session
+        self.options = options
+        self.cli_path = cli_path
+        self.busy = False  # A turn is checked out on this process
+        self.last_used = time.monotonic()
+        self.exited = anyio.Event()
+        self._turns_send, self._turns_receive = anyio.create_memory_object_stream[
+            _Turn
+        ](math.inf)
+        self._turn_done = anyio.Event()
+        self._in_turn = False
+        self._error: Exception | None = None
+
+    @property
+    def usable(self) -> bool:
+        return self._error is None and not self.exited.is_set()
+
+    async def run_turn(self, messages: list[dict[str, Any]]) -> None:
+        """Send one turn and wait until its ResultMessage has been routed."""
+        if self._error is not None:
+            raise self._error
+        done = anyio.Event()
+        try:
+            await self._turns_send.send((messages, done))
+        except (anyio.ClosedResourceError, anyio.BrokenResourceError) as e:
+            raise CLIConnectionError("Claude Code process exited") from e
+        await done.wait()
+
+    def close(self) -> None:
+        self._turns_send.close()
+
+    async def run(self, *, task_status: TaskStatus[None]) -> None:
+        """Own the transport for its whole life so connect/disconnect share a task."""
+        try:
+            transport = SubprocessCLITransport(
+                prompt=idle_stream(), options=self.options, cli_path=self.cli_path
+            )
+            await transport.connect()
+            try:
+                task_status.started()
+                async with anyio.create_task_group() as tg:
+                    tg.start_soon(self._read_loop, transport)
+                    async with self._turns_receive:
+                        async for messages, done in self._turns_receive:
+                            await self._send_turn(transport, messages)
+                            done.set()
+                    tg.cancel_scope.cancel()
+            finally:
+                await transport.disconnect()
+        finally:
+            self.exited.set()
+
+    async def _send_turn(
+        self, transport: SubprocessCLITransport, messages: list[dict[str, Any]]
+    ) -> None:
+        if self._error is not None:
+            self.session._deliver(self._error)
+            return
+        self._turn_done = anyio.Event()
+        self._in_turn = True
+        try:
+            await transport.send_request(
+                messages, {"session_id": self.session.session_id}
+            )
+        except Exception as e:
+            self._fail(e)
+        await self._turn_done.wait()
+
+    async def _read_loop(self, transport: SubprocessCLITransport) -> None:
+        """Route incoming messages to the session while one of its turns runs."""
+        try:
+            async for data in transport.receive_messages():
+                message = parse_message(data, self.options.lazy_content)
+                if self._in_turn:
+                    self.session._deliver(message)
+                else:
+                    logger.debug(
+                        f"Dropping message outside of a turn: {data.get('type')}"
+                    )
+                if isinstance(message, ResultMessage):
+                    self.session.cli_session_id = message.session_id
+                    self._in_turn = False
+                    self._turn_done.set()
+            raise CLIConnectionError("Claude Code process exited")
+        except Exception as e:
+            self._fail(e)
+
+    def _fail(self, error: Exception) -> None:
+        if self._error is None:
+            self._error = error
+        if self._in_turn:
+            self.session._deliver(error)
+            self._in_turn = False
+        self._turn_done.set()
+
+
+class ClaudeSessionMultiplexer:
+    """
+    Run many logical conversations over a small number of CLI processes.
+
+    The CLI keeps one conversation per process, so a process only ever holds
+    a single session's conversation. Sessions take a process when they run a
+    turn: the one already holding their conversation if it is still around,
+    otherwise a new one, started with ``--resume`` on the session's CLI
+    session id once it has had a turn. When all ``max_processes`` are taken,
+    the least recently used idle process is stopped to make room, and if all
+    are mid-turn the session waits for one to finish.
+
+    Sessions therefore never see each other's history. Idle sessions hold no
+    process, so memory scales with the number of concurrently active
+    sessions; size ``max_processes`` to that number to avoid resuming
+    conversations on every turn. Turns of different sessions run in
+    parallel on different processes, and everything the CLI emits until a
+    turn's ResultMessage goes to the session that sent it.
+
+    Example:
+        ```python
+        async with ClaudeSessionMultiplexer(options, max_processes=2) as mux:
+            alice = await mux.session("alice")
+            bob = await mux.session("bob")
+            await alice.query("Summarize README.md")
+            await bob.query("List the TODOs in src/")
+            async for msg in alice.receive_response():
+                print(msg)
+            async for msg in bob.receive_response():
+                print(msg)
+        ```
+    """
+
+    def __init__(
+        self,
+        options: ClaudeCodeOptions | None = None,
+        max_processes: int = 1,
+        cli_path: str | Path | None = None,
+    ):
+        """
+        Initialize the multiplexer.
+
+        Args:
+            options: Options shared by every process
+            max_processes: Maximum number of CLI processes, each holding one
+                session's conversation
+            cli_path: Optional explicit path to the Claude Code CLI
+        """
+        if max_processes < 1:
+            raise ValueError("max_processes must be >= 1")
+        self.options = options or ClaudeCodeOptions()
+        self.max_processes = max_processes
+        self._cli_path = cli_path
+        self._processes: list[_ConversationProcess] = []
+        self._sessions: dict[str, MultiplexedSession] = {}
+        self._released = anyio.Event()
+        self._task_group: TaskGroup | None = None
+
+    async def __aenter__(self) -> "ClaudeSessionMultiplexer":
+        self._task_group = anyio.create_task_group()
+        await self._task_group.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> bool:
+        await self.close()
+        return False
+
+    async def close(self) -> None:
+        """Stop every process and close all sessions; queued turns are dropped."""
+        if self._task_group is None:
+            return
+        for process in self._processes:
+            process.close()
+        task_group, self._task_group = self._task_group, None
+        task_group.cancel_scope.cancel()
+        await task_group.__aexit__(None, None, None)
+        for session in list(self._sessions.values()):
+            session.close()
+        self._sessions.clear()
+        self._processes.clear()
+
+    async def session(self, session_id: str | None = None) -> MultiplexedSession:
+        """Return the session with this id, creating it if new."""
+        if self._task_group is None:
+            raise CLIConnectionError(
+                "Multiplexer is not running. Use 'async with ClaudeSessionMultiplexer()'."
+            )
+        if session_id is None:
+            session_id = uuid.uuid4().hex
+        if session_id in self._sessions:
+            return self._sessions[session_id]
+
+        session = MultiplexedSession(session_id)
+        self._sessions[session_id] = session
+        self._task_group.start_soon(self._serve, session)
+        return session
+
+    def close_session(self, session_id: str) -> None:
+        """Forget a session and stop the process holding its conversation."""
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return
+        session.close()
+        process = session._process
+        if process is not None and not process.busy:
+            self._retire(process)
+
+    @property
+    def process_count(self) -> int:
+        """Number of CLI processes currently running."""
+        return sum(1 for p in self._processes if p.usable)
+
+    @property
+    def session_count(self) -> int:
+        """Number of open logical sessions."""
+        return len(self._sessions)
+
+    async def _serve(self, session: MultiplexedSession) -> None:
+        """Run a session's turns one at a time, each on a process it holds."""
+        async with session._turns_receive:
+            async for messages in session._turns_receive:
+                try:
+                    process = await self._checkout(session)
+                except Exception as e:
+                    session._deliver(e)
+                    continue
+                try:
+                    await process.run_turn(messages)
+                except Exception as e:
+                    session._deliver(e)
+                finally:
+                    process.busy = False
+                    process.last_used = time.monotonic()
+                    self._released.set()
+
+    async def _checkout(self, session: MultiplexedSession) -> _ConversationProcess:
+        """Return a process holding session's conversation, marked busy."""
+        while True:
+            process = session._process
+            if process is not None:
+                if process.usable:
+                    process.busy = True
+                    return process
+                self._retire(process)
+
+            if len(self._processes) >= self.max_processes:
+                idle = [p for p in self._processes if not p.busy]
+                if not idle:
+                    # Every waiter shares one event until a release sets it
+                    if self._released.is_set():
+                        self._released = anyio.Event()
+                    await self._released.wait()
+                    continue
+                # Failed processes go first, then the least recently used
+                self._retire(min(idle, key=lambda p: (p.usable, p.last_used)))
+            return await self._spawn(session)
+
+    async def _spawn(self, session: MultiplexedSession) -> _ConversationProcess:
+        assert self._task_group is not None
+        options = self.options
+        if session.cli_session_id is not None:
+            options = replace(options, resume=session.cli_session_id)
+        process = _ConversationProcess(session, options, self._cli_path)
+        process.busy = True
+        self._processes.append(process)
+        try:
+            await self._task_group.start(process.run)
+        except BaseException:
+            self._processes.remove(process)
+            self._released.set()
+            raise
+        session._process = process
+        return process
+
+    def _retire(self, process: _ConversationProcess) -> None:
+        """Stop a process; it disconnects in its own task."""
+        self._processes.remove(process)
+        if process.session._process is process:
+            process.session._process = None
+        process.close()
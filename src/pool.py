@@ -0,0 +1,313 @@
+"""Pool of pre-warmed Claude Code CLI processes."""
+
+import logging
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import anyio
+from anyio.abc import TaskGroup, TaskStatus
+
+from ._errors import CLIConnectionError
+from ._internal.message_filter import (
+    MessageTypes,
+    message_type_names,
+    receive_filtered,
+)
+from ._internal.message_parser import parse_message
+from ._internal.transport.subprocess_cli import SubprocessCLITransport, idle_stream
+from .sdk_types import ClaudeCodeOptions, Message, ResultMessage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolStats:
+    """Snapshot of ClaudeProcessPool activity."""
+
+    idle: int
+    in_use: int
+    hits: int
+    misses: int
+    spawned: int
+    retired: int
+    spawn_failures: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of acquisitions served by an already running process."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+# SDK-side options a transport is built with when it spawns. They are left
+# out of fingerprint(), but a pooled process must only serve queries that
+# agree on them, or one caller's stderr reaches another caller's callback.
+_TRANSPORT_FIELDS = ("stderr", "stderr_mode", "json_decoder")
+
+_PoolKey = tuple[Any, ...]
+
+
+def _pool_key(options: ClaudeCodeOptions) -> _PoolKey:
+    """Key processes by fingerprint and the transport-side options."""
+    return (
+        options.fingerprint(),
+        *(_hashable(getattr(options, name)) for name in _TRANSPORT_FIELDS),
+    )
+
+
+def _hashable(value: Any) -> Any:
+    # Unhashable callables fall back to identity; the pooled transports keep
+    # them alive, so their ids stay unique
+    try:
+        hash(value)
+    except TypeError:
+        return id(value)
+    return value
+
+
+class _PooledProcess:
+    """A streaming-mode CLI process owned by a pool task."""
+
+    def __init__(self, key: _PoolKey, transport: SubprocessCLITransport):
+        self.key = key
+        self.transport = transport
+        self.uses = 0
+        self.retired = anyio.Event()
+
+
+class ClaudeProcessPool:
+    """
+    Keep streaming-mode Claude Code processes warm for query().
+
+    Spawning the CLI dominates latency for short prompts. The pool starts
+    processes ahead of time, keyed by the options that shape the command line
+    (tools, model, system prompt, cwd, env, ...) and the transport (stderr
+    handling, JSON decoder), and hands one out per query. Processes are
+    retired after ``max_uses`` queries (default 1, so every query gets a
+    fresh conversation) and replaced in the background.
+
+    Setting ``max_uses`` above 1 recycles processes between queries, which
+    also carries the previous queries' conversation context along.
+
+    Example:
+        ```python
+        async with ClaudeProcessPool(size=4) as pool:
+            await pool.warm(options)
+            async for message in query(prompt="Hi", options=options, pool=pool):
+                print(message)
+            print(pool.stats().hit_rate)
+        ```
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_uses: int = 1,
+        cli_path: str | Path | None = None,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            size: Number of idle processes to keep per distinct set of options
+            max_uses: Queries served by a process before it is retired
+            cli_path: Optional explicit path to the Claude Code CLI
+        """
+        if size < 0:
+            raise ValueError("size must be >= 0")
+        if max_uses < 1:
+            raise ValueError("max_uses must be >= 1")
+        self.size = size
+        self.max_uses = max_uses
+        self._cli_path = cli_path
+        self._idle: dict[_PoolKey, deque[_PooledProcess]] = {}
+        self._spawning: dict[_PoolKey, int] = {}
+        self._in_use = 0
+        self._hits = 0
+        self._misses = 0
+        self._spawned = 0
+        self._retired = 0
+        self._spawn_failures = 0
+        self._task_group: TaskGroup | None = None
+
+    async def __aenter__(self) -> "ClaudeProcessPool":
+        self._task_group = anyio.create_task_group()
+        await self._task_group.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> bool:
+        await self.close()
+        return False
+
+    async def close(self) -> None:
+        """Retire every process and wait for them to exit."""
+        if self._task_group is None:
+            return
+        for idle in self._idle.values():
+            while idle:
+                self._retire(idle.popleft())
+        task_group, self._task_group = self._task_group, None
+        task_group.cancel_scope.cancel()
+        await task_group.__aexit__(None, None, None)
+
+    async def warm(self, options: ClaudeCodeOptions | None = None) -> None:
+        """Start idle processes for options until ``size`` are running or starting."""
+        if options is None:
+            options = ClaudeCodeOptions()
+        self._replenish(_pool_key(options), options)
+
+    def stats(self) -> PoolStats:
+        """Return current pool statistics."""
+        return PoolStats(
+            idle=sum(len(idle) for idle in self._idle.values()),
+            in_use=self._in_use,
+            hits=self._hits,
+            misses=self._misses,
+            spawned=self._spawned,
+            retired=self._retired,
+            spawn_failures=self._spawn_failures,
+        )
+
+    async def query(
+        self,
+        prompt: str | AsyncIterable[dict[str, Any]],
+        options: ClaudeCodeOptions | None = None,
+        message_types: MessageTypes | None = None,
+    ) -> AsyncIterator[Message]:
+        """Run one query on a pooled process, yielding messages up to the result.
+
+        message_types selects which messages to yield, as for query().
+        """
+        if options is None:
+            options = ClaudeCodeOptions()
+        wanted = None if message_types is None else message_type_names(message_types)
+
+        process = await self._acquire(options)
+        completed = False
+        try:
+            transport = process.transport
+            if isinstance(prompt, str):
+                await transport.send_request(
+                    [
+                        {
+                            "type": "user",
+                            "message": {"role": "user", "content": prompt},
+                            "parent_tool_use_id": None,
+                            "session_id": "default",
+                        }
+                    ],
+                    {"session_id": "default"},
+                )
+            else:
+                async for message in prompt:
+                    await transport.send_request([message], {})
+
+            async for data in receive_filtered(transport, wanted):
+                parsed = parse_message(data, options.lazy_content)
+                if isinstance(parsed, ResultMessage):
+                    completed = True
+                yield parsed
+                if completed:
+                    return
+        finally:
+            self._release(process, options, completed)
+
+    async def _acquire(self, options: ClaudeCodeOptions) -> _PooledProcess:
+        if self._task_group is None:
+            raise CLIConnectionError(
+                "Pool is not running. Use 'async with ClaudeProcessPool()'."
+            )
+
+        key = _pool_key(options)
+        idle = self._idle.get(key)
+        process: _PooledProcess | None = None
+        while idle:
+            candidate = idle.popleft()
+            if candidate.transport.is_connected():
+                process = candidate
+                break
+            # Died while idle
+            self._retire(candidate)
+
+        if process is not None:
+            self._hits += 1
+        else:
+            self._misses += 1
+            process = await self._task_group.start(self._run_process, key, options)
+
+        self._in_use += 1
+        self._replenish(key, options)
+        return process
+
+    def _release(
+        self, process: _PooledProcess, options: ClaudeCodeOptions, completed: bool
+    ) -> None:
+        self._in_use -= 1
+        process.uses += 1
+        if (
+            completed
+            and process.uses < self.max_uses
+            and self._task_group is not None
+            and process.transport.is_connected()
+        ):
+            self._idle.setdefault(process.key, deque()).append(process)
+        else:
+            self._retire(process)
+            if self._task_group is not None:
+                self._replenish(process.key, options)
+
+    def _retire(self, process: _PooledProcess) -> None:
+        if not process.retired.is_set():
+            self._retired += 1
+            process.retired.set()
+
+    def _replenish(self, key: _PoolKey, options: ClaudeCodeOptions) -> None:
+        if self._task_group is None:
+            return
+        missing = self.size - len(self._idle.get(key, ())) - self._spawning.get(key, 0)
+        for _ in range(missing):
+            self._spawning[key] = self._spawning.get(key, 0) + 1
+            self._task_group.start_soon(self._run_process, key, options)
+
+    async def _run_process(
+        self,
+        key: _PoolKey,
+        options: ClaudeCodeOptions,
+        *,
+        task_status: TaskStatus[_PooledProcess] = anyio.TASK_STATUS_IGNORED,
+    ) -> None:
+        """Own one process for its whole life so connect/disconnect share a task.
+
+        Started via TaskGroup.start() the process is handed to the caller;
+        started via start_soon() it is a background pre-spawn and joins the
+        idle queue.
+        """
+        prespawn = task_status is anyio.TASK_STATUS_IGNORED
+        transport = SubprocessCLITransport(
+            prompt=idle_stream(), options=options, cli_path=self._cli_path
+        )
+        try:
+            await transport.connect()
+        except Exception as e:
+            self._spawn_failures += 1
+            if not prespawn:
+                raise
+            logger.warning(f"Failed to pre-spawn Claude Code process: {e}")
+            return
+        finally:
+            if prespawn:
+                self._spawning[key] -= 1
+
+        self._spawned += 1
+        process = _PooledProcess(key, transport)
+        try:
+            if prespawn:
+                self._idle.setdefault(key, deque()).append(process)
+            else:
+                task_status.started(process)
+            await process.retired.wait()
+        finally:
+            await transport.disconnect()
@@ -1,12 +1,29 @@
-"""Query function for one-shot interactions with Claude Code."""
+"""Query functions for one-shot interactions with Claude Code."""
 
-import os
-from collections.abc import AsyncIterable, AsyncIterator
-from typing import Any
+import time
+from collections.abc import AsyncGenerator, AsyncIterable, AsyncIterator, Iterable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
 
+import anyio
+from anyio.abc import TaskGroup
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
+
+from ._errors import ClaudeSDKError
 from ._internal.client import InternalClient
+from ._internal.message_filter import (
+    MessageTypes,
+    message_matches,
+    message_type_names,
+)
+from ._internal.options_key import query_key
 from ._internal.transport import Transport
-from .sdk_types import ClaudeCodeOptions, Message
+from .sdk_types import ClaudeCodeOptions, Message, ResultMessage
+
+if TYPE_CHECKING:
+    from .cache import QueryCache
+    from .pool import ClaudeProcessPool
+    from .single_flight import SingleFlight
 
 
 async def query(
@@ -14,7 +31,11 @@ async def query(
     prompt: str | AsyncIterable[dict[str, Any]],
     options: ClaudeCodeOptions | None = None,
     transport: Transport | None = None,
-) -> AsyncIterator[Message]:
+    pool: "ClaudeProcessPool | None" = None,
+    cache: "QueryCache | None" = None,
+    single_flight: "SingleFlight | None" = None,
+    message_types: MessageTypes | None = None,
+) -> AsyncGenerator[Message, None]:
     """
     Query Claude Code for one-shot or unidirectional streaming interactions.
 
@@ -61,6 +82,19 @@ async def query(
         transport: Optional transport implementation. If provided, this will be used
                   instead of the default transport selection based on options.
                   The transport will be automatically configured with the prompt and options.
+        pool: Optional ClaudeProcessPool. If provided, the query runs on one of its
+              pre-warmed CLI processes instead of spawning a new one. Cannot be
+              combined with transport.
+        cache: Optional QueryCache. String prompts already answered with the same
+               options are replayed from it without spawning the CLI, and
+               successful new runs are stored in it.
+        single_flight: Optional SingleFlight coordinator. Concurrent calls with the
+                       same string prompt and options share one CLI run, each
+                       receiving the full message sequence.
+        message_types: Optional message classes to yield, e.g. {ResultMessage}.
+                       Other messages are dropped by the transport before they
+                       are decoded or parsed. ResultMessage is always yielded.
+                       Filtered runs are not stored in the cache.
 
     Yields:
         Messages from the conversation
@@ -96,6 +130,14 @@ async def query(
             print(message)
         ```
 
+    Example - With a pre-warmed process pool:
+        ```python
+        async with ClaudeProcessPool(size=4) as pool:
+            await pool.warm(options)
+            async for message in query(prompt="Hello", options=options, pool=pool):
+                print(message)
+        ```
+
     Example - With custom transport:
         ```python
         from claude_code_sdk import query, Transport
@@ -116,11 +158,279 @@ async def query(
     if options is None:
         options = ClaudeCodeOptions()
 
-    os.environ["CLAUDE_CODE_ENTRYPOINT"] = "sdk-py"
+    if pool is not None and transport is not None:
+        raise ValueError("Cannot use both transport and pool")
+
+    wanted = None if message_types is None else message_type_names(message_types)
+
+    if single_flight is not None and isinstance(prompt, str) and transport is None:
+        flight_key = query_key(prompt, options)
+        if wanted is not None:
+            flight_key += ":" + ",".join(sorted(wanted))
+        async for message in single_flight.run(
+            flight_key,
+            lambda: query(
+                prompt=prompt,
+                options=options,
+                pool=pool,
+                cache=cache,
+                message_types=message_types,
+            ),
+        ):
+            yield message
+        return
+
+    messages = _run_query(prompt, options, transport, pool, wanted)
+    if cache is None or not isinstance(prompt, str):
+        async for message in messages:
+            yield message
+        return
+
+    key = cache.key(prompt, options)
+    cached = await cache.aget(key)
+    if cached is not None:
+        for message in cached:
+            if wanted is None or message_matches(message, wanted):
+                yield message
+        return
+
+    if wanted is not None:
+        # A filtered run is not a complete transcript, so it is not stored
+        async for message in messages:
+            yield message
+        return
+
+    collected: list[Message] = []
+    async for message in messages:
+        collected.append(message)
+        yield message
+
+    last = collected[-1] if collected else None
+    if isinstance(last, ResultMessage) and not last.is_error:
+        await cache.aput(key, collected)
+
+
+async def _run_query(
+    prompt: str | AsyncIterable[dict[str, Any]],
+    options: ClaudeCodeOptions,
+    transport: Transport | None,
+    pool: "ClaudeProcessPool | None",
+    wanted: frozenset[str] | None = None,
+) -> AsyncIterator[Message]:
+    if pool is not None:
+        async for message in pool.query(prompt, options, message_types=wanted):
+            yield message
+        return
 
     client = InternalClient()
 
     async for message in client.process_query(
-        prompt=prompt, options=options, transport=transport
+        prompt=prompt, options=options, transport=transport, message_types=wanted
     ):
         yield message
+
+
+@dataclass
+class QueryResult:
+    """Outcome of one prompt run by query_many()."""
+
+    index: int
+    prompt: str
+    messages: list[Message] = field(default_factory=list)
+    result: ResultMessage | None = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        """True if the prompt completed without an exception or error result."""
+        return (
+            self.error is None and self.result is not None and not self.result.is_error
+        )
+
+
+class QueryBatch:
+    """
+    A batch of prompts running concurrently, yielding results as they finish.
+
+    Created by query_many(). Use it as an async context manager and iterate
+    over it; leaving the context cancels prompts that have not finished.
+    Aggregate cost and duration are updated as each result is yielded.
+    """
+
+    def __init__(
+        self,
+        prompts: Iterable[str | tuple[str, ClaudeCodeOptions]],
+        options: ClaudeCodeOptions | None,
+        max_concurrency: int,
+        pool: "ClaudeProcessPool | None",
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        self._prompts = prompts
+        self._options = options
+        self._pool = pool
+        self._limiter = anyio.CapacityLimiter(max_concurrency)
+        self._task_group: TaskGroup | None = None
+        self._results: MemoryObjectReceiveStream[QueryResult] | None = None
+        self._feed_error: Exception | None = None
+        self._started_at = 0.0
+        self._finished_at: float | None = None
+
+        self.completed = 0
+        self.failed = 0
+        self.total_cost_usd = 0.0
+        self.duration_ms = 0
+        self.duration_api_ms = 0
+
+    @property
+    def wall_time_s(self) -> float:
+        """Seconds from start until the last result (or now, if still running)."""
+        end = (
+            self._finished_at if self._finished_at is not None else time.perf_counter()
+        )
+        return end - self._started_at
+
+    async def __aenter__(self) -> "QueryBatch":
+        # Finished prompts hold their slot until their result fits in the
+        # buffer, so a slow consumer also slows down the feed
+        send, self._results = anyio.create_memory_object_stream[QueryResult](
+            self._limiter.total_tokens
+        )
+        self._started_at = time.perf_counter()
+        task_group = anyio.create_task_group()
+        await task_group.__aenter__()
+        try:
+            task_group.start_soon(self._feed, task_group, send)
+        except BaseException:
+            send.close()
+            task_group.cancel_scope.cancel()
+            await task_group.__aexit__(None, None, None)
+            raise
+        self._task_group = task_group
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> bool:
+        if self._task_group is not None:
+            self._task_group.cancel_scope.cancel()
+            await self._task_group.__aexit__(None, None, None)
+            self._task_group = None
+        if self._results is not None:
+            self._results.close()
+        return False
+
+    async def __aiter__(self) -> AsyncIterator[QueryResult]:
+        if self._results is None:
+            raise ClaudeSDKError("Use 'async with query_many(...) as batch' first")
+        async for result in self._results:
+            self._record(result)
+            yield result
+        self._finished_at = time.perf_counter()
+        if self._feed_error is not None:
+            raise self._feed_error
+
+    def _record(self, result: QueryResult) -> None:
+        if result.ok:
+            self.completed += 1
+        else:
+            self.failed += 1
+        if result.result is not None:
+            self.total_cost_usd += result.result.total_cost_usd or 0.0
+            self.duration_ms += result.result.duration_ms
+            self.duration_api_ms += result.result.duration_api_ms
+
+    async def _feed(
+        self, task_group: TaskGroup, send: MemoryObjectSendStream[QueryResult]
+    ) -> None:
+        """Start one task per prompt, pulling the next prompt only once a slot is free.
+
+        Prompts are read lazily, so a large or unbounded iterable never has
+        more than max_concurrency tasks in flight. An exception raised by the
+        iterable stops the feed and is re-raised to the consumer once the
+        prompts already started have been yielded.
+        """
+        async with send:
+            prompts = iter(self._prompts)
+            index = 0
+            while True:
+                token = object()
+                await self._limiter.acquire_on_behalf_of(token)
+                try:
+                    item = next(prompts)
+                except StopIteration:
+                    self._limiter.release_on_behalf_of(token)
+                    return
+                except Exception as e:
+                    self._limiter.release_on_behalf_of(token)
+                    self._feed_error = e
+                    return
+                options: ClaudeCodeOptions | None
+                if isinstance(item, tuple):
+                    prompt, options = item
+                else:
+                    prompt, options = item, self._options
+                task_group.start_soon(
+                    self._run_one, token, index, prompt, options, send.clone()
+                )
+                index += 1
+
+    async def _run_one(
+        self,
+        token: object,
+        index: int,
+        prompt: str,
+        options: ClaudeCodeOptions | None,
+        send: MemoryObjectSendStream[QueryResult],
+    ) -> None:
+        outcome = QueryResult(index=index, prompt=prompt)
+        async with send:
+            try:
+                async for message in query(
+                    prompt=prompt, options=options, pool=self._pool
+                ):
+                    outcome.messages.append(message)
+                    if isinstance(message, ResultMessage):
+                        outcome.result = message
+            except Exception as e:
+                outcome.error = e
+            try:
+                await send.send(outcome)
+            finally:
+                self._limiter.release_on_behalf_of(token)
+
+
+def query_many(
+    prompts: Iterable[str | tuple[str, ClaudeCodeOptions]],
+    options: ClaudeCodeOptions | None = None,
+    *,
+    max_concurrency: int = 4,
+    pool: "ClaudeProcessPool | None" = None,
+) -> QueryBatch:
+    """
+    Run many independent prompts concurrently with bounded parallelism.
+
+    Results are yielded in completion order, not submission order; use
+    QueryResult.index to match them to their prompt. A failing prompt does
+    not stop the batch: its exception is reported in QueryResult.error.
+
+    Args:
+        prompts: Prompt strings, or (prompt, options) tuples to override the
+                 batch options for a single item. Read lazily, one item per
+                 free slot, so generators of any length are fine
+        options: Options used for items without their own
+        max_concurrency: Maximum number of prompts running at the same time
+        pool: Optional ClaudeProcessPool to run the prompts on
+
+    Returns:
+        A QueryBatch to use as an async context manager and iterate over.
+        Its total_cost_usd, duration_ms, completed and failed attributes
+        aggregate the results yielded so far.
+
+    Example:
+        ```python
+        async with query_many(["What is 2+2?", "Name a prime"], max_concurrency=8) as batch:
+            async for item in batch:
+                print(item.index, item.result.result if item.result else item.error)
+        print(f"Total: ${batch.total_cost_usd:.4f} in {batch.wall_time_s:.1f}s")
+        ```
+    """
+    return QueryBatch(prompts, options, max_concurrency, pool)
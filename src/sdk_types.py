@@ -1,5 +1,7 @@
 """Type definitions for Claude SDK."""
 
+import copy
+from collections.abc import Callable
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Literal, TypedDict
@@ -9,6 +11,12 @@ from typing_extensions import NotRequired  # For Python < 3.11 compatibility
 # Permission modes
 PermissionMode = Literal["default", "acceptEdits", "plan", "bypassPermissions"]
 
+# Where the CLI's stderr goes: a temp file, or a pipe drained into memory
+StderrMode = Literal["file", "pipe"]
+
+# JSON decoder used for CLI output: a backend name or a callable taking bytes
+JsonDecoder = Literal["auto", "json", "orjson"] | Callable[[bytes], Any]
+
 
 # MCP Server config
 class McpStdioServerConfig(TypedDict):
@@ -40,14 +48,15 @@ McpServerConfig = McpStdioServerConfig | McpSSEServerConfig | McpHttpServerConfi
 
 
 # Content block types
-@dataclass
+# Message and block types are slotted: transcripts can hold millions of them.
+@dataclass(slots=True)
 class TextBlock:
     """Text content block."""
 
     text: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ThinkingBlock:
     """Thinking content block."""
 
@@ -55,7 +64,7 @@ class ThinkingBlock:
     signature: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolUseBlock:
     """Tool use content block."""
 
@@ -64,7 +73,7 @@ class ToolUseBlock:
     input: dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolResultBlock:
     """Tool result content block."""
 
@@ -77,14 +86,14 @@ ContentBlock = TextBlock | ThinkingBlock | ToolUseBlock | ToolResultBlock
 
 
 # Message types
-@dataclass
+@dataclass(slots=True)
 class UserMessage:
     """User message."""
 
     content: str | list[ContentBlock]
 
 
-@dataclass
+@dataclass(slots=True)
 class AssistantMessage:
     """Assistant message with content blocks."""
 
@@ -92,7 +101,7 @@ class AssistantMessage:
     model: str
 
 
-@dataclass
+@dataclass(slots=True)
 class SystemMessage:
     """System message with metadata."""
 
@@ -100,7 +109,7 @@ class SystemMessage:
     data: dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True)
 class ResultMessage:
     """Result message with cost and usage information."""
 
@@ -115,7 +124,31 @@ class ResultMessage:
     result: str | None = None
 
 
-Message = UserMessage | AssistantMessage | SystemMessage | ResultMessage
+@dataclass(slots=True)
+class StreamEvent:
+    """Partial output event, sent when partial messages are enabled.
+
+    event is the raw API streaming event, e.g. a content_block_delta whose
+    delta carries a text_delta.
+    """
+
+    uuid: str
+    session_id: str
+    event: dict[str, Any]
+    parent_tool_use_id: str | None = None
+
+
+Message = UserMessage | AssistantMessage | SystemMessage | ResultMessage | StreamEvent
+
+# ClaudeCodeOptions fields that can change without being assigned
+_MUTABLE_FIELDS = (
+    "allowed_tools",
+    "disallowed_tools",
+    "mcp_servers",
+    "add_dirs",
+    "env",
+    "extra_args",
+)
 
 
 @dataclass
@@ -141,3 +174,82 @@ class ClaudeCodeOptions:
     extra_args: dict[str, str | None] = field(
         default_factory=dict
     )  # Pass arbitrary CLI flags
+    json_decoder: JsonDecoder = "auto"  # "auto" uses orjson when installed
+    stderr_mode: StderrMode = "file"
+    stderr: Callable[[str], None] | None = None  # Per-line callback; implies "pipe"
+    # Parse user/assistant content blocks on first access (LazyContentBlocks)
+    lazy_content: bool = False
+    include_partial_messages: bool = False  # Emit StreamEvent text deltas
+    # System prompts, MCP config and settings JSON longer than this many bytes
+    # are passed to the CLI as files instead of inline in argv; None disables.
+    # Linux rejects any single argument over 128 KiB (MAX_ARG_STRLEN), so
+    # only values that could not be passed inline go to files by default.
+    arg_file_threshold: int | None = 120 * 1024
+
+    # Values computed from the fields (such as the CLI arguments) are cached
+    # per instance. The cache is dropped whenever a field is assigned, and
+    # when a list or dict field no longer equals the copy taken when the cache
+    # was started, so in-place edits are picked up too. Copies start empty.
+    def __setattr__(self, name: str, value: Any) -> None:
+        self.__dict__.pop("_derived_cache", None)
+        object.__setattr__(self, name, value)
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        state.pop("_derived_cache", None)
+        return state
+
+    @property
+    def _derived(self) -> dict[str, Any]:
+        """Cache of values computed from the current field values."""
+        entry = self.__dict__.get("_derived_cache")
+        if entry is not None:
+            cached: dict[str, Any]
+            cached_stamp, cached = entry
+            for name, value in cached_stamp:
+                if getattr(self, name) != value:
+                    break
+            else:
+                return cached
+        try:
+            stamp = tuple(
+                (name, copy.deepcopy(getattr(self, name))) for name in _MUTABLE_FIELDS
+            )
+        except Exception:
+            # Values that cannot be copied cannot be checked; skip the cache
+            return {}
+        cache: dict[str, Any] = {}
+        self.__dict__["_derived_cache"] = (stamp, cache)
+        return cache
+
+    def snapshot(self) -> tuple[tuple[str, Any], ...]:
+        """
+        Frozen, hashable copy of the fields that affect the CLI invocation.
+
+        Fields that only affect the SDK side (json_decoder, stderr handling,
+        lazy_content, arg_file_threshold) or are not passed to the CLI
+        (max_thinking_tokens) are left out. Cached until a field changes.
+        """
+        derived = self._derived
+        snapshot = derived.get("snapshot")
+        if snapshot is None:
+            from ._internal.options_key import options_snapshot
+
+            snapshot = derived["snapshot"] = options_snapshot(self)
+        return snapshot
+
+    def fingerprint(self) -> str:
+        """
+        Hex digest of snapshot(), stable across processes.
+
+        Options with the same fingerprint launch the same CLI process, so
+        pools, caches and deduplication can key on it. Cached until a field
+        changes.
+        """
+        derived = self._derived
+        fingerprint = derived.get("fingerprint")
+        if fingerprint is None:
+            from ._internal.options_key import snapshot_digest
+
+            fingerprint = derived["fingerprint"] = snapshot_digest(self.snapshot())
+        return fingerprint
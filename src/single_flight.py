@@ -0,0 +1,127 @@
+"""Single-flight deduplication of concurrent identical queries."""
+
+from collections.abc import AsyncGenerator, AsyncIterator, Callable
+from contextlib import aclosing
+from typing import Any
+
+import anyio
+from anyio.abc import TaskGroup
+
+from ._errors import ClaudeSDKError
+from .sdk_types import Message
+
+
+class _Flight:
+    """One in-progress query shared by every caller with the same key."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.messages: list[Message] = []
+        self.done = False
+        self.error: Exception | None = None
+        self.subscribers = 0
+        self.changed = anyio.Event()
+        self.cancel_scope = anyio.CancelScope()
+
+    def notify(self) -> None:
+        changed, self.changed = self.changed, anyio.Event()
+        changed.set()
+
+
+class SingleFlight:
+    """
+    Share one CLI run between concurrent identical query() calls.
+
+    While a query for a given prompt and options fingerprint is running, later
+    identical calls join it instead of spawning another CLI process. Every
+    caller gets its own iterator over the full message sequence, including
+    messages that arrived before it joined. The shared run is cancelled once
+    every caller has stopped iterating; callers that finish normally do not
+    affect the others. Once a run completes, the next identical call starts a
+    new one (combine with QueryCache to reuse finished results).
+
+    Example:
+        ```python
+        async with SingleFlight() as flights:
+            async def handler(prompt: str) -> None:
+                async for message in query(prompt=prompt, single_flight=flights):
+                    ...
+        ```
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[str, _Flight] = {}
+        self._task_group: TaskGroup | None = None
+        self.started = 0
+        self.joined = 0
+
+    async def __aenter__(self) -> "SingleFlight":
+        self._task_group = anyio.create_task_group()
+        await self._task_group.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> bool:
+        if self._task_group is not None:
+            task_group, self._task_group = self._task_group, None
+            task_group.cancel_scope.cancel()
+            await task_group.__aexit__(None, None, None)
+        return False
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct queries currently running."""
+        return len(self._flights)
+
+    async def run(
+        self, key: str, source: Callable[[], AsyncGenerator[Message, None]]
+    ) -> AsyncIterator[Message]:
+        """Iterate the shared run for key, starting it from source() if needed."""
+        if self._task_group is None:
+            raise ClaudeSDKError("Use 'async with SingleFlight()' before querying")
+
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(key)
+            self._flights[key] = flight
+            self.started += 1
+            self._task_group.start_soon(self._produce, flight, source)
+        else:
+            self.joined += 1
+
+        flight.subscribers += 1
+        index = 0
+        try:
+            while True:
+                while index < len(flight.messages):
+                    yield flight.messages[index]
+                    index += 1
+                if flight.done:
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+                await flight.changed.wait()
+        finally:
+            flight.subscribers -= 1
+            if flight.subscribers == 0 and not flight.done:
+                # Nobody is listening any more
+                flight.cancel_scope.cancel()
+                self._forget(flight)
+
+    async def _produce(
+        self, flight: _Flight, source: Callable[[], AsyncGenerator[Message, None]]
+    ) -> None:
+        with flight.cancel_scope:
+            try:
+                async with aclosing(source()) as messages:
+                    async for message in messages:
+                        flight.messages.append(message)
+                        flight.notify()
+            except Exception as e:
+                flight.error = e
+        flight.done = True
+        self._forget(flight)
+        flight.notify()
+
+    def _forget(self, flight: _Flight) -> None:
+        if self._flights.get(flight.key) is flight:
+            del self._flights[flight.key]
@@ -3,6 +3,8 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 # Adiciona o diretório pai ao PYTHONPATH para permitir imports de src
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
@@ -10,4 +12,29 @@ sys.path.insert(0, str(project_root))
 # Configuração para pytest
 pytest_plugins = []
 
-# Fixtures compartilhadas podem ser adicionadas aqui
\ No newline at end of file
+# Fixtures compartilhadas podem ser adicionadas aqui
+
+_ECHO_CLI = f"""#!{sys.executable}
+import json, sys
+for line in sys.stdin:
+    message = json.loads(line)
+    if message.get("type") != "user":
+        continue
+    text = message["message"]["content"]
+    assistant = {{"role": "assistant", "model": "echo",
+                  "content": [{{"type": "text", "text": "echo: " + text}}]}}
+    print(json.dumps({{"type": "assistant", "message": assistant}}), flush=True)
+    print(json.dumps({{"type": "result", "subtype": "success", "duration_ms": 1,
+                      "duration_api_ms": 1, "is_error": False, "num_turns": 1,
+                      "session_id": message.get("session_id", "default")}}),
+          flush=True)
+"""
+
+
+@pytest.fixture
+def echo_cli(tmp_path):
+    """CLI falso em stream-json que responde "echo: <prompt>" a cada mensagem."""
+    script = tmp_path / "claude"
+    script.write_text(_ECHO_CLI)
+    script.chmod(0o755)
+    return script
\ No newline at end of file
@@ -0,0 +1,74 @@
+"""Tests for the offline benchmark and the bundled fake CLI."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import anyio
+
+from src import ClaudeSDKClient, StreamEvent
+from src._internal.bench import (
+    BenchConfig,
+    fake_cli_launcher,
+    fake_cli_options,
+    run_benchmarks,
+)
+
+
+class TestFakeCLI:
+    """Test the scripted CLI the benchmarks run against."""
+
+    def test_split_writes_and_partial_messages(self):
+        """Test that scripted output survives tiny writes and includes deltas."""
+
+        async def _test():
+            options = fake_cli_options(messages=3, message_bytes=100, split_bytes=5)
+            options.include_partial_messages = True
+            async with ClaudeSDKClient(options, cli_path=fake_cli_launcher()) as client:
+                await client.query("hello")
+                messages = [m async for m in client.receive_response()]
+
+            names = [type(m).__name__ for m in messages]
+            assert names.count("AssistantMessage") == 3
+            assert names.count("StreamEvent") == 3
+            assert names[-1] == "ResultMessage"
+            assistant = messages[names.index("AssistantMessage")]
+            assert len(assistant.content[0].text) == 100
+            assert isinstance(messages[names.index("StreamEvent")], StreamEvent)
+
+        anyio.run(_test)
+
+    def test_launcher_uses_the_running_interpreter(self):
+        """Test that the fake CLI runs without its own exec bit or shebang."""
+        launcher = fake_cli_launcher()
+
+        assert fake_cli_launcher() == launcher
+        assert sys.executable in Path(launcher).read_text()
+        result = subprocess.run(
+            [launcher, "--version"], capture_output=True, text=True, check=True
+        )
+        assert result.stdout.startswith("0.0.0")
+
+
+class TestRunBenchmarks:
+    """Test the machine-readable benchmark report."""
+
+    def test_report_layout(self):
+        """Test that a small run fills in every measurement."""
+
+        async def _test():
+            return await run_benchmarks(
+                BenchConfig(iterations=2, messages=20, message_bytes=32, sessions=2)
+            )
+
+        report = anyio.run(_test)
+
+        assert report["schema"] == 1
+        assert report["config"]["cli_path"] == fake_cli_launcher()
+        results = report["results"]
+        for name in ("spawn_ms", "query_ms", "query_overhead_ms", "client_turn_ms"):
+            assert results[name]["n"] == 2
+            assert 0 < results[name]["min"] <= results[name]["p50"] <= results[name]["max"]
+        assert results["parse"]["messages"] == 20
+        assert results["parse"]["messages_per_s"] > 0
+        assert results["memory_per_session_bytes"] > 0
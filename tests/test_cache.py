@@ -0,0 +1,198 @@
+"""Tests for the query() result cache."""
+
+import threading
+from unittest.mock import patch
+
+import anyio
+
+from src import (
+    AssistantMessage,
+    ClaudeCodeOptions,
+    QueryCache,
+    ResultMessage,
+    TextBlock,
+    ToolUseBlock,
+    query,
+)
+from src._internal.message_parser import parse_message
+
+
+def _messages(text: str = "4") -> list:
+    return [
+        AssistantMessage(
+            content=[
+                TextBlock(text=text),
+                ToolUseBlock(id="tool-1", name="Read", input={"file_path": "/a"}),
+            ],
+            model="claude-opus-4-1-20250805",
+        ),
+        ResultMessage(
+            subtype="success",
+            duration_ms=100,
+            duration_api_ms=80,
+            is_error=False,
+            num_turns=1,
+            session_id="cached",
+            total_cost_usd=0.01,
+            usage={"input_tokens": 3},
+        ),
+    ]
+
+
+class TestQueryCache:
+    """Test QueryCache tiers, eviction and the query() integration."""
+
+    def test_query_replays_cached_messages(self):
+        """Test that a repeated query is answered without the CLI."""
+
+        async def _test():
+            calls = 0
+
+            async def fake_process_query(
+                prompt, options, transport=None, message_types=None
+            ):
+                nonlocal calls
+                calls += 1
+                for message in _messages():
+                    yield message
+
+            cache = QueryCache()
+            options = ClaudeCodeOptions(model="sonnet")
+            with patch(
+                "src._internal.client.InternalClient.process_query",
+                side_effect=fake_process_query,
+            ):
+                first = [m async for m in query(prompt="2+2?", options=options, cache=cache)]
+                second = [
+                    m async for m in query(prompt="2+2?", options=options, cache=cache)
+                ]
+                other = [
+                    m
+                    async for m in query(
+                        prompt="2+2?", options=ClaudeCodeOptions(model="opus"), cache=cache
+                    )
+                ]
+
+            assert calls == 2
+            assert second == first
+            assert len(other) == 2
+            stats = cache.stats()
+            assert (stats.hits, stats.misses, stats.stores) == (1, 2, 2)
+            assert stats.hit_rate == 1 / 3
+
+        anyio.run(_test)
+
+    def test_error_results_are_not_cached(self):
+        """Test that failed runs are not stored."""
+
+        async def _test():
+            async def fake_process_query(
+                prompt, options, transport=None, message_types=None
+            ):
+                yield ResultMessage(
+                    subtype="error_during_execution",
+                    duration_ms=1,
+                    duration_api_ms=1,
+                    is_error=True,
+                    num_turns=1,
+                    session_id="x",
+                )
+
+            cache = QueryCache()
+            with patch(
+                "src._internal.client.InternalClient.process_query",
+                side_effect=fake_process_query,
+            ):
+                [m async for m in query(prompt="fail", cache=cache)]
+
+            assert cache.stats().stores == 0
+
+        anyio.run(_test)
+
+    def test_disk_tier_survives_new_instance(self, tmp_path):
+        """Test that entries written to SQLite are decoded into message objects."""
+        path = tmp_path / "cache.sqlite"
+        key = QueryCache.key("prompt", ClaudeCodeOptions())
+
+        writer = QueryCache(path=path)
+        writer.put(key, _messages())
+        writer.close()
+
+        reader = QueryCache(path=path)
+        messages = reader.get(key)
+        reader.close()
+
+        assert messages == _messages()
+        assert isinstance(messages[0].content[1], ToolUseBlock)
+        assert reader.stats().disk_hits == 1
+
+    def test_async_disk_access_runs_off_the_event_loop(self, tmp_path):
+        """Test that aget()/aput() do their SQLite work in a worker thread."""
+        path = tmp_path / "cache.sqlite"
+        key = QueryCache.key("prompt", ClaudeCodeOptions())
+        loop_thread = threading.get_ident()
+        disk_threads = []
+
+        async def _test():
+            writer = QueryCache(path=path)
+            original_write = writer._write_disk
+
+            def write(*args):
+                disk_threads.append(threading.get_ident())
+                return original_write(*args)
+
+            with patch.object(writer, "_write_disk", write):
+                await writer.aput(key, _messages())
+            writer.close()
+
+            reader = QueryCache(path=path)
+            original_read = reader._read_disk
+
+            def read(*args):
+                disk_threads.append(threading.get_ident())
+                return original_read(*args)
+
+            with patch.object(reader, "_read_disk", read):
+                messages = await reader.aget(key)
+                assert await reader.aget("missing") is None
+            reader.close()
+            return messages, reader.stats()
+
+        messages, stats = anyio.run(_test)
+
+        assert messages == _messages()
+        assert len(disk_threads) == 3
+        assert loop_thread not in disk_threads
+        assert (stats.disk_hits, stats.misses) == (1, 1)
+
+    def test_lazy_content_is_stored_as_blocks(self, tmp_path):
+        """Test that lazily parsed messages round-trip through the disk tier."""
+        lazy = parse_message(
+            {
+                "type": "assistant",
+                "message": {"model": "m", "content": [{"type": "text", "text": "hi"}]},
+            },
+            lazy_content=True,
+        )
+        cache = QueryCache(path=tmp_path / "c.sqlite")
+        cache.put("k", [lazy])
+        cache.close()
+
+        reader = QueryCache(path=tmp_path / "c.sqlite")
+        assert reader.get("k") == [AssistantMessage(content=[TextBlock("hi")], model="m")]
+        reader.close()
+
+    def test_lru_and_ttl_eviction(self, tmp_path):
+        """Test size-based and time-based eviction."""
+        cache = QueryCache(max_entries=2, path=tmp_path / "c.sqlite", max_disk_entries=2)
+        for name in ("a", "b", "c"):
+            cache.put(name, _messages(name))
+
+        assert cache.get("a") is None
+        assert cache.get("c") is not None
+        assert cache.stats().evictions >= 2
+
+        cache.ttl = 0
+        with patch("src.cache.time.time", return_value=10**12):
+            assert cache.get("c") is None
+        cache.close()
@@ -0,0 +1,133 @@
+"""Tests for cached CLI discovery and command-line construction."""
+
+import copy
+import os
+import shutil
+from unittest.mock import patch
+
+import anyio
+import pytest
+
+from src._errors import CLINotFoundError
+from src._internal.bench import FAKE_CLI_PATH
+from src._internal.transport.cli_discovery import CLIResolver
+from src._internal.transport.subprocess_cli import SubprocessCLITransport
+from src.sdk_types import ClaudeCodeOptions
+
+
+def _executable(path):
+    path.write_text("#!/bin/sh\n")
+    path.chmod(0o755)
+    return path
+
+
+def _command(options):
+    transport = SubprocessCLITransport("hi", options, cli_path="/usr/bin/claude")
+    return transport._build_command()
+
+
+class TestCLIResolver:
+    """Test the process-wide CLI location and version cache."""
+
+    def test_search_runs_once(self, tmp_path):
+        """Test that later lookups reuse the first search."""
+        cli = _executable(tmp_path / "claude")
+        resolver = CLIResolver()
+        with patch("shutil.which", return_value=str(cli)) as which:
+            assert resolver.find() == str(cli)
+            assert resolver.find() == str(cli)
+        assert which.call_count == 1
+
+    def test_stale_path_is_searched_again(self, tmp_path):
+        """Test that a removed binary, a PATH change or invalidate() re-search."""
+        first = _executable(tmp_path / "first")
+        second = _executable(tmp_path / "second")
+        resolver = CLIResolver()
+
+        with patch("shutil.which", return_value=str(first)):
+            resolver.find()
+        first.unlink()
+        with patch("shutil.which", return_value=str(second)) as which:
+            assert resolver.find() == str(second)
+            with patch.dict(os.environ, {"PATH": str(tmp_path)}):
+                resolver.find()
+            resolver.invalidate()
+            resolver.find()
+        assert which.call_count == 3
+
+    def test_failed_search_is_not_cached(self, tmp_path):
+        """Test that installing the CLI after a failed lookup is noticed."""
+        cli = _executable(tmp_path / "claude")
+        resolver = CLIResolver()
+        with (
+            patch("shutil.which", return_value=None),
+            patch("pathlib.Path.exists", return_value=False),
+            pytest.raises(CLINotFoundError),
+        ):
+            resolver.find()
+        with patch("shutil.which", return_value=str(cli)):
+            assert resolver.find() == str(cli)
+
+    def test_version_is_probed_once_per_binary(self, tmp_path):
+        """Test that the version is cached until the binary changes."""
+        cli = tmp_path / "claude"
+        shutil.copy(FAKE_CLI_PATH, cli)
+        resolver = CLIResolver()
+
+        async def _test():
+            first = await resolver.version(cli)
+            with patch("anyio.run_process") as run_process:
+                assert await resolver.version(cli) == first
+            assert not run_process.called
+
+            os.utime(cli, ns=(0, 0))
+            with patch("anyio.run_process", wraps=anyio.run_process) as run_process:
+                await resolver.version(cli)
+            assert run_process.call_count == 1
+            return first
+
+        assert anyio.run(_test) == "0.0.0"
+
+
+class TestCommandCache:
+    """Test memoization of the option-derived CLI arguments."""
+
+    def test_arguments_rebuilt_after_assignment(self):
+        """Test that assigning an option field invalidates the cached arguments."""
+        options = ClaudeCodeOptions(allowed_tools=["Read"])
+        transport = SubprocessCLITransport("hi", options, cli_path="/usr/bin/claude")
+        first = transport._build_command()
+
+        with patch.object(SubprocessCLITransport, "_build_option_args") as build:
+            assert transport._build_command() == first
+            other = SubprocessCLITransport("bye", options, cli_path="/bin/claude")
+            assert other._build_command()[-1] == "bye"
+        assert not build.called
+
+        options.model = "claude-test"
+        cmd = transport._build_command()
+        assert cmd[cmd.index("--model") + 1] == "claude-test"
+
+    def test_arguments_rebuilt_after_in_place_edit(self):
+        """Test that mutating a list or dict field invalidates the arguments."""
+        options = ClaudeCodeOptions(allowed_tools=["Read"])
+        _command(options)
+
+        options.allowed_tools.append("Write")
+        options.mcp_servers["s"] = {"command": "x"}
+        cmd = _command(options)
+        assert cmd[cmd.index("--allowedTools") + 1] == "Read,Write"
+        assert '"s"' in cmd[cmd.index("--mcp-config") + 1]
+
+    def test_copies_start_with_an_empty_cache(self):
+        """Test that a copy never shares the original's cached arguments."""
+        options = ClaudeCodeOptions(model="sonnet")
+        _command(options)
+
+        clone = copy.copy(options)
+        assert "_derived_cache" not in clone.__dict__
+        clone.model = "opus"
+        cmd = _command(clone)
+        assert cmd[cmd.index("--model") + 1] == "opus"
+        cmd = _command(options)
+        assert cmd[cmd.index("--model") + 1] == "sonnet"
@@ -4,7 +4,18 @@ from unittest.mock import AsyncMock, patch
 
 import anyio
 
-from src import AssistantMessage, ClaudeCodeOptions, query
+import pytest
+
+from src import (
+    AssistantMessage,
+    ClaudeCodeOptions,
+    ClaudeSDKClient,
+    ResultMessage,
+    SystemMessage,
+    Transport,
+    query,
+    query_many,
+)
 from src.sdk_types import TextBlock
 
 
@@ -121,3 +132,254 @@ class TestQueryFunction:
                 assert call_kwargs["options"].cwd == "/custom/path"
 
         anyio.run(_test)
+
+
+class TestQueryMany:
+    """Test concurrent batch queries."""
+
+    def test_results_in_completion_order_with_aggregates(self):
+        """Test that results arrive as they finish and totals are summed."""
+
+        async def _test():
+            running = 0
+            peak = 0
+
+            async def fake_process_query(
+                prompt, options, transport=None, message_types=None
+            ):
+                nonlocal running, peak
+                running += 1
+                peak = max(peak, running)
+                await anyio.sleep(0.03 if prompt == "slow" else 0.01)
+                running -= 1
+                if prompt == "boom":
+                    raise RuntimeError("CLI crashed")
+                yield AssistantMessage(
+                    content=[TextBlock(text=f"{prompt} done")],
+                    model=options.model or "claude-opus-4-1-20250805",
+                )
+                yield ResultMessage(
+                    subtype="success",
+                    duration_ms=100,
+                    duration_api_ms=80,
+                    is_error=False,
+                    num_turns=1,
+                    session_id=prompt,
+                    total_cost_usd=0.25,
+                )
+
+            with patch(
+                "src._internal.client.InternalClient.process_query",
+                side_effect=fake_process_query,
+            ):
+                prompts = [
+                    "slow",
+                    ("fast", ClaudeCodeOptions(model="haiku")),
+                    "boom",
+                ]
+                async with query_many(prompts, max_concurrency=2) as batch:
+                    results = [item async for item in batch]
+
+            assert peak == 2
+            assert [r.index for r in results] == [1, 2, 0]
+            assert results[0].messages[0].model == "haiku"
+            assert results[0].ok
+            assert isinstance(results[1].error, RuntimeError)
+            assert not results[1].ok
+            assert batch.completed == 2
+            assert batch.failed == 1
+            assert batch.total_cost_usd == 0.5
+            assert batch.duration_ms == 200
+
+        anyio.run(_test)
+
+
+    def test_prompts_are_pulled_only_when_a_slot_is_free(self):
+        """Test that an unbounded prompt iterable is consumed lazily."""
+
+        async def _test():
+            pulled = 0
+            running = 0
+            peak_pulled_ahead = 0
+
+            def prompts():
+                nonlocal pulled
+                while True:
+                    pulled += 1
+                    yield f"p{pulled}"
+
+            async def fake_process_query(
+                prompt, options, transport=None, message_types=None
+            ):
+                nonlocal running, peak_pulled_ahead
+                running += 1
+                peak_pulled_ahead = max(peak_pulled_ahead, running)
+                await anyio.sleep(0.01)
+                running -= 1
+                yield ResultMessage(
+                    subtype="success",
+                    duration_ms=1,
+                    duration_api_ms=1,
+                    is_error=False,
+                    num_turns=1,
+                    session_id=prompt,
+                )
+
+            with patch(
+                "src._internal.client.InternalClient.process_query",
+                side_effect=fake_process_query,
+            ):
+                async with query_many(prompts(), max_concurrency=3) as batch:
+                    received = 0
+                    async for _item in batch:
+                        received += 1
+                        if received == 10:
+                            break
+
+            assert peak_pulled_ahead == 3
+            # At most 3 running and 3 buffered results ahead of the consumer
+            assert pulled <= received + 6
+
+        anyio.run(_test)
+
+    def test_iteration_error_is_raised_after_started_prompts(self):
+        """Test that a failing prompt iterable surfaces its error to the consumer."""
+
+        async def _test():
+            def prompts():
+                yield "one"
+                yield "two"
+                raise ValueError("bad input file")
+
+            async def fake_process_query(
+                prompt, options, transport=None, message_types=None
+            ):
+                yield ResultMessage(
+                    subtype="success",
+                    duration_ms=1,
+                    duration_api_ms=1,
+                    is_error=False,
+                    num_turns=1,
+                    session_id=prompt,
+                )
+
+            results = []
+            with patch(
+                "src._internal.client.InternalClient.process_query",
+                side_effect=fake_process_query,
+            ):
+                async with query_many(prompts(), max_concurrency=2) as batch:
+                    with pytest.raises(ValueError, match="bad input file"):
+                        async for item in batch:
+                            results.append(item)
+
+            assert sorted(r.prompt for r in results) == ["one", "two"]
+
+        anyio.run(_test)
+
+
+class ScriptedTransport(Transport):
+    """Transport replaying a fixed list of raw CLI messages."""
+
+    def __init__(self, messages):
+        self.messages = messages
+
+    async def connect(self):
+        pass
+
+    async def disconnect(self):
+        pass
+
+    async def send_request(self, messages, options):
+        pass
+
+    async def receive_messages(self):
+        for data in self.messages:
+            yield data
+
+    def is_connected(self):
+        return True
+
+
+RAW_SESSION = [
+    {"type": "system", "subtype": "init"},
+    {"type": "user", "message": {"content": [{"type": "text", "text": "hi"}]}},
+    {
+        "type": "assistant",
+        "message": {"model": "m", "content": [{"type": "text", "text": "hello"}]},
+    },
+    {
+        "type": "result",
+        "subtype": "success",
+        "duration_ms": 1,
+        "duration_api_ms": 1,
+        "is_error": False,
+        "num_turns": 1,
+        "session_id": "s",
+    },
+]
+
+
+class TestMessageTypeFilter:
+    """Test message_types filtering in query() and ClaudeSDKClient."""
+
+    def test_query_yields_only_wanted_types_and_result(self):
+        """Test that query() drops unwanted messages but keeps the result."""
+
+        async def _test():
+            messages = [
+                m
+                async for m in query(
+                    prompt="hi",
+                    transport=ScriptedTransport(RAW_SESSION),
+                    message_types={SystemMessage},
+                )
+            ]
+            assert [type(m) for m in messages] == [SystemMessage, ResultMessage]
+
+        anyio.run(_test)
+
+    def test_receive_response_with_filter_stops_at_result(self):
+        """Test that receive_response() still ends on the ResultMessage."""
+
+        async def _test():
+            client = ClaudeSDKClient()
+            client._transport = ScriptedTransport(RAW_SESSION * 2)
+            messages = [
+                m async for m in client.receive_response(message_types=[AssistantMessage])
+            ]
+            assert [type(m) for m in messages] == [AssistantMessage, ResultMessage]
+
+        anyio.run(_test)
+
+    def test_single_type_is_not_iterated(self):
+        """Test that a bare string or class selects that one message type."""
+        from src._internal.message_filter import message_type_names
+
+        assert message_type_names("assistant") == {"assistant", "result"}
+        assert message_type_names(AssistantMessage) == {"assistant", "result"}
+
+        async def _test():
+            messages = [
+                m
+                async for m in query(
+                    prompt="hi",
+                    transport=ScriptedTransport(RAW_SESSION),
+                    message_types="assistant",
+                )
+            ]
+            assert [type(m) for m in messages] == [AssistantMessage, ResultMessage]
+
+        anyio.run(_test)
+
+    def test_unknown_message_class_rejected(self):
+        """Test that a non-message class is reported as a ValueError."""
+
+        async def _test():
+            with pytest.raises(ValueError, match="Unknown message type"):
+                async for _ in query(
+                    prompt="hi", transport=ScriptedTransport([]), message_types=[dict]
+                ):
+                    pass
+
+        anyio.run(_test)
@@ -0,0 +1,74 @@
+"""Tests for the cached CLI subprocess environment."""
+
+import os
+from unittest.mock import patch
+
+from src import ClaudeSDKClient
+from src._internal.transport.environment import EnvironmentBuilder
+
+
+class TestEnvironmentBuilder:
+    """Test merging and caching of subprocess environments."""
+
+    def test_merges_and_reuses_environment(self):
+        """Test that equal options.env values share one merged dict."""
+        builder = EnvironmentBuilder()
+        with patch.dict(os.environ, {"SDK_ENV_TEST": "base", "OVERRIDDEN": "base"}):
+            original = dict(os.environ)
+            first = builder.build({"OVERRIDDEN": "user"}, "sdk-py")
+            second = builder.build({"OVERRIDDEN": "user"}, "sdk-py")
+            client = builder.build({"OVERRIDDEN": "user"}, "sdk-py-client")
+
+            assert first is second
+            assert first["SDK_ENV_TEST"] == "base"
+            assert first["OVERRIDDEN"] == "user"
+            assert first["CLAUDE_CODE_ENTRYPOINT"] == "sdk-py"
+            assert client["CLAUDE_CODE_ENTRYPOINT"] == "sdk-py-client"
+            assert dict(os.environ) == original
+
+    def test_rebuilds_after_os_environ_changes(self):
+        """Test that a change to os.environ is picked up by the next build."""
+        builder = EnvironmentBuilder()
+        with patch.dict(os.environ, {"SDK_ENV_TEST": "before"}):
+            before = builder.build({}, "sdk-py")
+            os.environ["SDK_ENV_TEST"] = "after"
+            after = builder.build({}, "sdk-py")
+
+        assert before["SDK_ENV_TEST"] == "before"
+        assert after["SDK_ENV_TEST"] == "after"
+
+    def test_env_order_does_not_matter(self):
+        """Test that equal options.env dicts built in another order share a hit."""
+        builder = EnvironmentBuilder()
+        first = builder.build({"A": "1", "B": "2"}, "sdk-py")
+
+        assert builder.build({"B": "2", "A": "1"}, "sdk-py") is first
+
+    def test_without_raw_environ_storage_nothing_is_cached(self):
+        """Test the fallback for os.environ implementations without _data."""
+        builder = EnvironmentBuilder()
+        with patch.object(os, "environ", {"SDK_ENV_TEST": "plain"}):
+            first = builder.build({}, "sdk-py")
+            second = builder.build({}, "sdk-py")
+
+        assert first == second
+        assert first is not second
+        assert first["SDK_ENV_TEST"] == "plain"
+        assert not builder._cache
+
+    def test_evicts_least_recently_used(self):
+        """Test that the cache stays bounded."""
+        builder = EnvironmentBuilder(max_size=2)
+        first = builder.build({"N": "1"}, "sdk-py")
+        builder.build({"N": "2"}, "sdk-py")
+        assert builder.build({"N": "1"}, "sdk-py") is first
+        builder.build({"N": "3"}, "sdk-py")
+
+        assert builder.build({"N": "1"}, "sdk-py") is first
+        assert len(builder._cache) == 2
+
+    def test_client_does_not_touch_process_environment(self):
+        """Test that creating a client leaves os.environ alone."""
+        original = dict(os.environ)
+        ClaudeSDKClient()
+        assert dict(os.environ) == original
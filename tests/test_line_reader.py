@@ -0,0 +1,63 @@
+"""Tests for the non-blocking line reader used by the chat loops."""
+
+import os
+
+import anyio
+import pytest
+
+from src._internal.line_reader import AsyncLineReader
+
+
+class TestAsyncLineReader:
+    """Test reading stdin-like streams from the event loop."""
+
+    def test_other_tasks_run_while_waiting(self):
+        """Test that a pending read does not block the event loop."""
+
+        async def _test():
+            read_fd, write_fd = os.pipe()
+            with os.fdopen(read_fd) as stream:
+                reader = AsyncLineReader(stream)
+                ticks = 0
+
+                async def ticker():
+                    nonlocal ticks
+                    while True:
+                        ticks += 1
+                        await anyio.sleep(0.01)
+
+                async with anyio.create_task_group() as tg:
+                    tg.start_soon(ticker)
+                    await anyio.sleep(0.05)
+                    os.write(write_fd, b"hello\n")
+                    with anyio.fail_after(2):
+                        line = await reader.readline()
+                    tg.cancel_scope.cancel()
+                os.close(write_fd)
+
+            assert line == "hello"
+            assert ticks >= 3
+
+        anyio.run(_test)
+
+    def test_cancelled_read_carries_over(self):
+        """Test that input typed after a cancelled read is not lost."""
+
+        async def _test():
+            read_fd, write_fd = os.pipe()
+            with os.fdopen(read_fd) as stream:
+                reader = AsyncLineReader(stream)
+                with anyio.move_on_after(0.05) as scope:
+                    await reader.readline()
+                assert scope.cancelled_caught
+
+                os.write(write_fd, b"typed later\nnext\n")
+                with anyio.fail_after(2):
+                    assert await reader.readline() == "typed later"
+                    assert await reader.readline() == "next"
+
+                os.close(write_fd)
+                with anyio.fail_after(2), pytest.raises(EOFError):
+                    await reader.readline()
+
+        anyio.run(_test)
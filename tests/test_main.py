@@ -0,0 +1,216 @@
+"""Tests for the interactive command line in src/__main__.py."""
+
+import io
+import json
+from unittest.mock import patch
+
+import anyio
+
+from src import AssistantMessage, ResponseTiming, ResultMessage, TextBlock
+from src.__main__ import batch_mode, interactive_mode
+
+
+class FakeClient:
+    """ClaudeSDKClient stand-in that records its lifecycle."""
+
+    instances: list["FakeClient"] = []
+
+    def __init__(self, options=None):
+        self.prompts = []
+        self.connected = False
+        self.last_timing = None
+        FakeClient.instances.append(self)
+
+    async def connect(self):
+        self.connected = True
+
+    async def disconnect(self):
+        self.connected = False
+
+    async def query(self, prompt):
+        self.prompts.append(prompt)
+
+    async def receive_response(self):
+        self.last_timing = ResponseTiming(
+            sent_at=0.0, time_to_first_token=0.25, duration=1.5
+        )
+        yield ResultMessage(
+            subtype="success",
+            duration_ms=1,
+            duration_api_ms=1,
+            is_error=False,
+            num_turns=1,
+            session_id="s",
+        )
+
+
+class TestInteractiveMode:
+    """Test process reuse and timings in interactive mode."""
+
+    def _run(self, lines, **kwargs):
+        FakeClient.instances = []
+        stdin = io.StringIO("".join(f"{line}\n" for line in lines))
+        with patch("src.__main__.ClaudeSDKClient", FakeClient), patch(
+            "sys.stdin", stdin
+        ):
+            anyio.run(lambda: interactive_mode(**kwargs))
+        return FakeClient.instances
+
+    def test_reuses_one_process(self, capsys):
+        """Test that every prompt goes to the same client, with timings."""
+        clients = self._run(["um", "dois", "sair"], timings=True)
+
+        assert len(clients) == 1
+        assert clients[0].prompts == ["um", "dois"]
+        assert not clients[0].connected
+        output = capsys.readouterr().out
+        assert "primeiro token: 250 ms | total: 1500 ms" in output
+        assert "spawn: reutilizado" in output
+
+    def test_stateless_replaces_process_each_turn(self):
+        """Test that stateless mode starts a fresh client after every turn."""
+        clients = self._run(["um", "dois", "sair"], stateless=True)
+
+        assert [c.prompts for c in clients] == [["um"], ["dois"], []]
+        assert not any(c.connected for c in clients)
+
+
+class FakeBatchQuery:
+    """query() stand-in that answers every prompt and tracks concurrency."""
+
+    def __init__(self, fail_on=()):
+        self.prompts = []
+        self.running = 0
+        self.max_running = 0
+        self.fail_on = set(fail_on)
+
+    async def __call__(self, *, prompt, options=None, message_types=None):
+        self.prompts.append(prompt)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await anyio.sleep(0.01)
+            if prompt in self.fail_on:
+                raise RuntimeError(f"falhou: {prompt}")
+            yield AssistantMessage(content=[TextBlock(text=f"eco: {prompt}")], model="m")
+            yield ResultMessage(
+                subtype="success",
+                duration_ms=10,
+                duration_api_ms=5,
+                is_error=False,
+                num_turns=1,
+                session_id=f"s-{prompt}",
+                total_cost_usd=0.01,
+            )
+        finally:
+            self.running -= 1
+
+
+class TestBatchMode:
+    """Test the JSONL batch mode."""
+
+    def _run(self, fake, input_path, out_path, workers=2):
+        with patch("src.__main__.query", fake):
+            return anyio.run(
+                lambda: batch_mode(str(input_path), str(out_path), workers)
+            )
+
+    def test_runs_prompts_with_bounded_concurrency(self, tmp_path):
+        """Test that every prompt gets one result line, at most `workers` at once."""
+        entrada = tmp_path / "in.jsonl"
+        linhas = [json.dumps({"id": f"p{i}", "prompt": f"q{i}"}) for i in range(6)]
+        entrada.write_text("\n".join(linhas + ['"solto"', "{ruim"]) + "\n")
+        saida = tmp_path / "out.jsonl"
+        fake = FakeBatchQuery(fail_on={"q3"})
+
+        sucessos, falhas, pulados = self._run(fake, entrada, saida)
+
+        assert (sucessos, falhas, pulados) == (6, 2, 0)
+        assert fake.max_running == 2
+        registros = {r["id"]: r for r in map(json.loads, saida.read_text().splitlines())}
+        assert registros["p0"]["ok"] is True
+        assert registros["p0"]["result"] == "eco: q0"
+        assert registros["p0"]["session_id"] == "s-q0"
+        assert registros["p0"]["total_cost_usd"] == 0.01
+        assert registros["p0"]["duration_ms"] == 10
+        assert registros["p3"]["ok"] is False
+        assert registros["p3"]["error"] == "falhou: q3"
+        assert registros[7]["result"] == "eco: solto"
+        assert registros[8]["ok"] is False
+
+    def test_resume_skips_written_ids(self, tmp_path):
+        """Test that a rerun only runs prompts missing from the output file."""
+        entrada = tmp_path / "in.jsonl"
+        entrada.write_text(
+            "".join(json.dumps({"id": i, "prompt": f"q{i}"}) + "\n" for i in range(4))
+        )
+        saida = tmp_path / "out.jsonl"
+        # Resultado de uma execução interrompida no meio da gravação
+        saida.write_text(json.dumps({"id": 0, "ok": True}) + "\n" + '{"id": 1, "o')
+        fake = FakeBatchQuery()
+
+        sucessos, falhas, pulados = self._run(fake, entrada, saida)
+
+        assert (sucessos, falhas, pulados) == (3, 0, 1)
+        assert sorted(fake.prompts) == ["q1", "q2", "q3"]
+        linhas = saida.read_text().splitlines()
+        assert linhas[1] == '{"id": 1, "o'
+        assert sorted(json.loads(l)["id"] for l in linhas[2:]) == [1, 2, 3]
+
+    def test_resume_retries_failures_and_keeps_id_types_apart(self, tmp_path):
+        """Test that failed ids run again and 1 and "1" are different ids."""
+        entrada = tmp_path / "in.jsonl"
+        entrada.write_text(
+            json.dumps({"id": 1, "prompt": "q1"}) + "\n"
+            + json.dumps({"id": "1", "prompt": "q1-texto"}) + "\n"
+            + json.dumps({"id": 2, "prompt": "q2"}) + "\n"
+        )
+        saida = tmp_path / "out.jsonl"
+        saida.write_text(
+            json.dumps({"id": 1, "ok": True}) + "\n"
+            + json.dumps({"id": 2, "ok": False, "error": "falhou"}) + "\n"
+        )
+        fake = FakeBatchQuery()
+
+        sucessos, falhas, pulados = self._run(fake, entrada, saida)
+
+        assert (sucessos, falhas, pulados) == (2, 0, 1)
+        assert sorted(fake.prompts) == ["q1-texto", "q2"]
+        ultimo = {}
+        for linha in saida.read_text().splitlines():
+            registro = json.loads(linha)
+            ultimo[json.dumps(registro["id"])] = registro["ok"]
+        assert ultimo == {"1": True, '"1"': True, "2": True}
+
+    def test_reads_long_input_in_chunks(self, tmp_path):
+        """Test that lines spanning several read blocks are put back together."""
+        from src.__main__ import read_lines
+
+        entrada = tmp_path / "in.jsonl"
+        linhas = [json.dumps({"id": i, "prompt": "x" * 50 * i}) for i in range(20)]
+        entrada.write_text("\n".join(linhas))
+
+        async def _ler():
+            with open(entrada, "rb") as arquivo:
+                return [linha async for linha in read_lines(arquivo, tamanho=64)]
+
+        assert anyio.run(_ler) == [linha.encode() for linha in linhas]
+
+    def test_invalid_utf8_fails_only_its_line(self, tmp_path):
+        """Test that a line that is not UTF-8 gets a failed record, not a crash."""
+        entrada = tmp_path / "in.jsonl"
+        entrada.write_bytes(
+            json.dumps({"id": "a", "prompt": "qa"}).encode() + b"\n"
+            + b'{"id": "b", "prompt": "\xff"}\n'
+            + json.dumps({"id": "c", "prompt": "qc"}).encode() + b"\n"
+        )
+        saida = tmp_path / "out.jsonl"
+        fake = FakeBatchQuery()
+
+        sucessos, falhas, pulados = self._run(fake, entrada, saida)
+
+        assert (sucessos, falhas, pulados) == (2, 1, 0)
+        assert sorted(fake.prompts) == ["qa", "qc"]
+        registros = {r["id"]: r for r in map(json.loads, saida.read_text().splitlines())}
+        assert registros[2]["ok"] is False
+        assert "utf-8" in registros[2]["error"]
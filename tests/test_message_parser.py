@@ -1,9 +1,14 @@
 """Tests for message parser error handling."""
 
+from dataclasses import dataclass
+from unittest.mock import patch
+
 import pytest
 
+from src import LazyContentBlocks, register_block_parser, register_message_parser
 from src._errors import MessageParseError
-from src._internal.message_parser import parse_message
+from src._internal import message_parser
+from src._internal.message_parser import parse_content_blocks, parse_message
 from src.sdk_types import (
     AssistantMessage,
     ResultMessage,
@@ -249,3 +254,143 @@ class TestMessageParser:
         with pytest.raises(MessageParseError) as exc_info:
             parse_message(data)
         assert exc_info.value.data == data
+
+
+@dataclass
+class ImageBlock:
+    media_type: str
+
+
+@dataclass
+class ProgressMessage:
+    percent: int
+    content: list
+
+
+class TestParserRegistry:
+    """Test registering parsers for new block and message types."""
+
+    def test_unregistered_block_types_are_skipped(self):
+        """Test that unknown block types do not fail the message."""
+        data = {
+            "type": "assistant",
+            "message": {
+                "model": "claude-opus-4-1-20250805",
+                "content": [
+                    {"type": "image", "source": {"media_type": "image/png"}},
+                    {"type": "text", "text": "after"},
+                ],
+            },
+        }
+        message = parse_message(data)
+        assert message.content == [TextBlock(text="after")]
+
+    def test_register_block_parser_applies_to_user_and_assistant(self):
+        """Test that a registered block parser is shared by both message types."""
+        image = {"type": "image", "source": {"media_type": "image/png"}}
+        with patch.dict(message_parser._BLOCK_PARSERS):
+            register_block_parser(
+                "image", lambda block: ImageBlock(block["source"]["media_type"])
+            )
+            user = parse_message({"type": "user", "message": {"content": [image]}})
+            assistant = parse_message(
+                {"type": "assistant", "message": {"model": "m", "content": [image]}}
+            )
+        assert user.content == [ImageBlock("image/png")]
+        assert assistant.content == [ImageBlock("image/png")]
+        assert "image" not in message_parser._BLOCK_PARSERS
+
+    def test_register_message_parser(self):
+        """Test parsing a new message type, including its missing-field error."""
+        with patch.dict(message_parser._MESSAGE_PARSERS):
+            register_message_parser(
+                "progress",
+                lambda data: ProgressMessage(
+                    percent=data["percent"],
+                    content=parse_content_blocks(data["content"]),
+                ),
+            )
+            message = parse_message(
+                {
+                    "type": "progress",
+                    "percent": 50,
+                    "content": [{"type": "text", "text": "half"}],
+                }
+            )
+            with pytest.raises(MessageParseError) as exc_info:
+                parse_message({"type": "progress", "content": []})
+
+        assert message == ProgressMessage(percent=50, content=[TextBlock(text="half")])
+        assert "Missing required field in progress message" in str(exc_info.value)
+        with pytest.raises(MessageParseError, match="Unknown message type"):
+            parse_message({"type": "progress", "percent": 1, "content": []})
+
+
+class TestLazyContent:
+    """Test deferred parsing of content blocks."""
+
+    def _assistant(self):
+        return {
+            "type": "assistant",
+            "message": {
+                "model": "claude-opus-4-1-20250805",
+                "content": [
+                    {"type": "text", "text": "Reading"},
+                    {"type": "tool_use", "id": "t1", "name": "Read", "input": {}},
+                ],
+            },
+        }
+
+    def test_blocks_parsed_on_first_access_only(self):
+        """Test that no block work happens until content is read."""
+        calls = []
+
+        def counting_text_parser(block):
+            calls.append(block["text"])
+            return TextBlock(text=block["text"])
+
+        with patch.dict(message_parser._BLOCK_PARSERS):
+            register_block_parser("text", counting_text_parser)
+            message = parse_message(self._assistant(), lazy_content=True)
+            assert isinstance(message.content, LazyContentBlocks)
+            assert not message.content.materialized
+            assert calls == []
+
+            assert isinstance(message.content[1], ToolUseBlock)
+            assert len(message.content) == 2
+            list(message.content)
+            assert calls == ["Reading"]
+            assert message.content.materialized
+
+    def test_lazy_message_equals_eager_message(self):
+        """Test that lazy and eager parsing produce equal messages."""
+        lazy = parse_message(self._assistant(), lazy_content=True)
+        eager = parse_message(self._assistant())
+        assert lazy == eager
+        assert eager.content == lazy.content
+
+        user = {
+            "type": "user",
+            "message": {"content": [{"type": "tool_result", "tool_use_id": "t1"}]},
+        }
+        assert parse_message(user, lazy_content=True) == parse_message(user)
+        plain = {"type": "user", "message": {"content": "hi"}}
+        assert parse_message(plain, lazy_content=True).content == "hi"
+
+    def test_invalid_block_raises_on_access(self):
+        """Test that a malformed block is reported when content is read."""
+        data = {
+            "type": "assistant",
+            "message": {"model": "m", "content": [{"type": "text"}]},
+        }
+        message = parse_message(data, lazy_content=True)
+        with pytest.raises(MessageParseError, match="content block"):
+            message.content[0]
+
+    def test_custom_message_parser_overrides_lazy_parser(self):
+        """Test that a registered parser is used even in lazy mode."""
+        with patch.dict(message_parser._MESSAGE_PARSERS), patch.dict(
+            message_parser._LAZY_MESSAGE_PARSERS
+        ):
+            register_message_parser("assistant", lambda data: "custom")
+            assert parse_message(self._assistant(), lazy_content=True) == "custom"
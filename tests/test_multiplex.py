@@ -0,0 +1,213 @@
+"""Tests for multiplexing sessions over shared CLI processes."""
+
+import math
+from typing import Any
+from unittest.mock import patch
+
+import anyio
+import pytest
+
+from src import (
+    AssistantMessage,
+    ClaudeSessionMultiplexer,
+    ResultMessage,
+    TextBlock,
+)
+
+
+class EchoTransport:
+    """Fake streaming transport that answers each user message with an echo."""
+
+    instances: list["EchoTransport"] = []
+
+    def __init__(self, prompt: Any, options: Any, cli_path: Any = None):
+        self.options = options
+        self.sent: list[dict[str, Any]] = []
+        self.connected = False
+        self._send, self._receive = anyio.create_memory_object_stream[
+            dict[str, Any]
+        ](math.inf)
+        EchoTransport.instances.append(self)
+
+    async def connect(self) -> None:
+        self.connected = True
+
+    async def disconnect(self) -> None:
+        self.connected = False
+
+    async def send_request(self, messages: list[Any], options: dict[str, Any]) -> None:
+        for message in messages:
+            self.sent.append(message)
+            text = message["message"]["content"]
+            self._send.send_nowait(
+                {
+                    "type": "assistant",
+                    "message": {
+                        "role": "assistant",
+                        "content": [{"type": "text", "text": f"echo: {text}"}],
+                        "model": "claude-opus-4-1-20250805",
+                    },
+                }
+            )
+            self._send.send_nowait(
+                {
+                    "type": "result",
+                    "subtype": "success",
+                    "duration_ms": 1,
+                    "duration_api_ms": 1,
+                    "is_error": False,
+                    "num_turns": 1,
+                    "session_id": f"cli-{message['session_id']}",
+                }
+            )
+
+    async def receive_messages(self):
+        async for data in self._receive:
+            yield data
+
+
+class TestClaudeSessionMultiplexer:
+    """Test routing and demultiplexing of session traffic."""
+
+    def setup_method(self):
+        EchoTransport.instances = []
+
+    def test_sessions_receive_only_their_own_responses(self):
+        """Test that interleaved turns are demultiplexed per session."""
+
+        async def _test():
+            with patch("src.multiplex.SubprocessCLITransport", EchoTransport):
+                async with ClaudeSessionMultiplexer(max_processes=2) as mux:
+                    alice = await mux.session("alice")
+                    bob = await mux.session("bob")
+
+                    await alice.query("hi from alice")
+                    await bob.query("hi from bob")
+
+                    bob_messages = [m async for m in bob.receive_response()]
+                    alice_messages = [m async for m in alice.receive_response()]
+
+                    assert mux.process_count == 2
+                    assert mux.session_count == 2
+
+                assert not any(t.connected for t in EchoTransport.instances)
+
+            assert isinstance(alice_messages[0], AssistantMessage)
+            assert isinstance(alice_messages[0].content[0], TextBlock)
+            assert alice_messages[0].content[0].text == "echo: hi from alice"
+            assert isinstance(alice_messages[-1], ResultMessage)
+            assert bob_messages[0].content[0].text == "echo: hi from bob"
+
+        anyio.run(_test)
+
+    def test_sessions_never_share_a_conversation(self):
+        """Test that each process only ever carries one session's turns."""
+
+        async def _test():
+            with patch("src.multiplex.SubprocessCLITransport", EchoTransport):
+                async with ClaudeSessionMultiplexer(max_processes=2) as mux:
+                    sessions = [await mux.session(f"s{i}") for i in range(4)]
+                    assert await mux.session("s0") is sessions[0]
+
+                    for session in sessions:
+                        await session.query(session.session_id)
+                    for session in sessions:
+                        messages = [m async for m in session.receive_response()]
+                        assert messages[0].content[0].text == (
+                            f"echo: {session.session_id}"
+                        )
+                        assert mux.process_count <= 2
+
+            for transport in EchoTransport.instances:
+                assert len({m["session_id"] for m in transport.sent}) == 1
+            assert len(EchoTransport.instances) == 4
+
+        anyio.run(_test)
+
+    def test_session_keeps_its_process_between_turns(self):
+        """Test that consecutive turns of a session reuse its process."""
+
+        async def _test():
+            with patch("src.multiplex.SubprocessCLITransport", EchoTransport):
+                async with ClaudeSessionMultiplexer(max_processes=2) as mux:
+                    alice = await mux.session("alice")
+                    for prompt in ["one", "two"]:
+                        await alice.query(prompt)
+                        [m async for m in alice.receive_response()]
+
+            assert len(EchoTransport.instances) == 1
+            assert [m["message"]["content"] for m in EchoTransport.instances[0].sent] == [
+                "one",
+                "two",
+            ]
+
+        anyio.run(_test)
+
+    def test_evicted_session_resumes_its_conversation(self):
+        """Test that a session moved to a new process resumes its CLI session."""
+
+        async def _test():
+            with patch("src.multiplex.SubprocessCLITransport", EchoTransport):
+                async with ClaudeSessionMultiplexer(max_processes=1) as mux:
+                    alice = await mux.session("alice")
+                    bob = await mux.session("bob")
+                    for session in [alice, bob, alice]:
+                        await session.query(f"hi from {session.session_id}")
+                        messages = [m async for m in session.receive_response()]
+                        assert messages[0].content[0].text == (
+                            f"echo: hi from {session.session_id}"
+                        )
+                        assert mux.process_count == 1
+
+            alice_first, bob_only, alice_again = EchoTransport.instances
+            assert alice_first.options.resume is None
+            assert bob_only.options.resume is None
+            assert alice_again.options.resume == "cli-alice"
+            assert [m["session_id"] for m in bob_only.sent] == ["bob"]
+            assert not any(t.connected for t in EchoTransport.instances)
+
+        anyio.run(_test)
+
+    def test_session_requires_running_multiplexer(self):
+        """Test that sessions cannot be opened outside the context manager."""
+        from src._errors import CLIConnectionError
+
+        async def _test():
+            with pytest.raises(CLIConnectionError):
+                await ClaudeSessionMultiplexer().session()
+
+        anyio.run(_test)
+
+    def test_close_with_live_process(self, echo_cli):
+        """Test that a real shared process is torn down cleanly on close."""
+
+        async def _test():
+            async with ClaudeSessionMultiplexer(cli_path=echo_cli) as mux:
+                session = await mux.session("alice")
+                await session.query("ping")
+                messages = [m async for m in session.receive_response()]
+
+            assert messages[0].content[0].text == "echo: ping"
+            assert isinstance(messages[-1], ResultMessage)
+            assert mux.process_count == 0
+
+        anyio.run(_test)
+
+    def test_swapping_live_processes(self, echo_cli):
+        """Test that real processes are replaced as sessions take turns."""
+
+        async def _test():
+            async with ClaudeSessionMultiplexer(cli_path=echo_cli) as mux:
+                alice = await mux.session("alice")
+                bob = await mux.session("bob")
+                for session in [alice, bob, alice]:
+                    await session.query(session.session_id)
+                    messages = [m async for m in session.receive_response()]
+                    assert messages[0].content[0].text == (
+                        f"echo: {session.session_id}"
+                    )
+                    assert mux.process_count == 1
+
+            assert mux.process_count == 0
+
+        anyio.run(_test)
@@ -0,0 +1,202 @@
+"""Tests for the pre-warmed CLI process pool."""
+
+from typing import Any
+from unittest.mock import patch
+
+import anyio
+import pytest
+
+from src import (
+    AssistantMessage,
+    ClaudeCodeOptions,
+    ClaudeProcessPool,
+    ResultMessage,
+    query,
+)
+from src._internal.options_key import options_key
+from src.pool import _pool_key
+
+
+class FakeTransport:
+    """Stand-in for SubprocessCLITransport that answers every prompt."""
+
+    instances: list["FakeTransport"] = []
+
+    def __init__(self, prompt: Any, options: ClaudeCodeOptions, cli_path: Any = None):
+        self.options = options
+        self.connected = False
+        self.sent: list[dict[str, Any]] = []
+        FakeTransport.instances.append(self)
+
+    async def connect(self) -> None:
+        self.connected = True
+
+    async def disconnect(self) -> None:
+        self.connected = False
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    async def send_request(self, messages: list[Any], options: dict[str, Any]) -> None:
+        self.sent.extend(messages)
+
+    async def receive_messages(self):
+        yield {
+            "type": "assistant",
+            "message": {
+                "role": "assistant",
+                "content": [{"type": "text", "text": "pong"}],
+                "model": "claude-opus-4-1-20250805",
+            },
+        }
+        yield {
+            "type": "result",
+            "subtype": "success",
+            "duration_ms": 10,
+            "duration_api_ms": 5,
+            "is_error": False,
+            "num_turns": 1,
+            "session_id": "pooled",
+        }
+
+
+class TestClaudeProcessPool:
+    """Test ClaudeProcessPool behaviour with a fake transport."""
+
+    def setup_method(self):
+        FakeTransport.instances = []
+
+    def test_query_uses_prewarmed_process(self):
+        """Test that a warmed process serves the query and is replaced."""
+
+        async def _test():
+            with patch("src.pool.SubprocessCLITransport", FakeTransport):
+                async with ClaudeProcessPool(size=1) as pool:
+                    await pool.warm()
+                    await anyio.wait_all_tasks_blocked()
+                    assert pool.stats().idle == 1
+
+                    messages = [m async for m in query(prompt="ping", pool=pool)]
+
+                    assert isinstance(messages[0], AssistantMessage)
+                    assert isinstance(messages[-1], ResultMessage)
+                    first = FakeTransport.instances[0]
+                    assert first.sent[0]["message"]["content"] == "ping"
+
+                    await anyio.wait_all_tasks_blocked()
+                    stats = pool.stats()
+                    assert stats.hits == 1
+                    assert stats.misses == 0
+                    assert stats.hit_rate == 1.0
+                    assert stats.retired == 1
+                    assert stats.idle == 1
+                    assert not first.connected
+
+            assert all(not t.connected for t in FakeTransport.instances)
+
+        anyio.run(_test)
+
+    def test_cold_query_is_a_miss(self):
+        """Test that a query without a warm process spawns one on demand."""
+
+        async def _test():
+            with patch("src.pool.SubprocessCLITransport", FakeTransport):
+                async with ClaudeProcessPool(size=0) as pool:
+                    messages = [m async for m in pool.query("ping")]
+                    assert len(messages) == 2
+                    assert pool.stats().misses == 1
+                    assert pool.stats().hit_rate == 0.0
+
+        anyio.run(_test)
+
+    def test_processes_recycled_up_to_max_uses(self):
+        """Test that max_uses keeps a process for several queries."""
+
+        async def _test():
+            with patch("src.pool.SubprocessCLITransport", FakeTransport):
+                async with ClaudeProcessPool(size=1, max_uses=2) as pool:
+                    await pool.warm()
+                    await anyio.wait_all_tasks_blocked()
+                    [m async for m in pool.query("one")]
+                    [m async for m in pool.query("two")]
+                    await anyio.wait_all_tasks_blocked()
+
+                    assert len(FakeTransport.instances[0].sent) == 2
+                    assert pool.stats().hits == 2
+                    assert pool.stats().retired == 1
+
+        anyio.run(_test)
+
+    def test_processes_not_shared_across_stderr_callbacks(self):
+        """Test that a query never runs on a process spawned with another callback."""
+        first: list[str] = []
+        second: list[str] = []
+
+        async def _test():
+            with patch("src.pool.SubprocessCLITransport", FakeTransport):
+                async with ClaudeProcessPool(size=1) as pool:
+                    await pool.warm(ClaudeCodeOptions(stderr=first.append))
+                    await anyio.wait_all_tasks_blocked()
+                    options = ClaudeCodeOptions(stderr=second.append)
+                    [m async for m in query(prompt="ping", options=options, pool=pool)]
+
+                    warmed, used = FakeTransport.instances[:2]
+                    assert warmed.options.stderr == first.append
+                    assert not warmed.sent
+                    assert used.options.stderr == second.append
+                    assert used.sent
+                    assert pool.stats().misses == 1
+
+                    # The same callback finds the process warmed for it
+                    options = ClaudeCodeOptions(stderr=first.append)
+                    [m async for m in query(prompt="ping", options=options, pool=pool)]
+                    assert warmed.sent
+                    assert pool.stats().hits == 1
+
+        anyio.run(_test)
+
+    def test_pool_not_running(self):
+        """Test that using a pool outside its context raises."""
+        from src._errors import CLIConnectionError
+
+        async def _test():
+            pool = ClaudeProcessPool()
+            with pytest.raises(CLIConnectionError):
+                [m async for m in pool.query("ping")]
+
+        anyio.run(_test)
+
+    def test_options_key_ignores_non_cli_fields(self):
+        """Test that the pool key only depends on CLI-relevant options."""
+        base = options_key(ClaudeCodeOptions(model="sonnet"))
+
+        assert options_key(ClaudeCodeOptions(model="sonnet")) == base
+        assert (
+            options_key(ClaudeCodeOptions(model="sonnet", max_thinking_tokens=1))
+            == base
+        )
+        assert options_key(ClaudeCodeOptions(model="opus")) != base
+
+
+class TestPoolWithRealProcesses:
+    """Test the pool against real subprocesses of a fake CLI."""
+
+    def test_query_and_close_with_live_transport(self, echo_cli):
+        """Test that pooled processes are torn down cleanly on close."""
+
+        async def _test():
+            async with ClaudeProcessPool(size=1, cli_path=echo_cli) as pool:
+                await pool.warm(ClaudeCodeOptions())
+                messages = [m async for m in pool.query("ping")]
+                # Wait for the used process to be retired and replaced
+                with anyio.fail_after(10):
+                    while pool.stats().retired < 1 or pool.stats().idle < 1:
+                        await anyio.sleep(0.01)
+                transports = [p.transport for p in pool._idle[_pool_key(ClaudeCodeOptions())]]
+
+            assert messages[0].content[0].text == "echo: ping"
+            assert isinstance(messages[-1], ResultMessage)
+            assert transports
+            assert all(not t.is_connected() for t in transports)
+
+        anyio.run(_test)
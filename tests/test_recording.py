@@ -0,0 +1,211 @@
+"""Tests for recording and replaying CLI sessions."""
+
+import gzip
+import json
+import math
+import threading
+import time
+from unittest.mock import patch
+
+import anyio
+
+from src import (
+    AssistantMessage,
+    RecordingTransport,
+    ReplayTransport,
+    ResultMessage,
+    TransportRecording,
+    query,
+)
+from src._internal.bench import fake_cli_launcher, fake_cli_options
+from src._internal.transport import recording as recording_module
+
+
+class TestRecordAndReplay:
+    """Test that a replay reproduces the recorded session."""
+
+    def test_replay_matches_live_query(self, tmp_path):
+        """Test that a replayed query() yields the same messages as the live one."""
+        path = tmp_path / "session.jsonl.gz"
+        options = fake_cli_options(messages=3)
+
+        async def _test():
+            transport = RecordingTransport(
+                "hello", options, path, cli_path=fake_cli_launcher()
+            )
+            live = [m async for m in query(prompt="hello", options=options, transport=transport)]
+
+            recording = TransportRecording.load(path)
+            replayed = [
+                m
+                async for m in query(
+                    prompt="hello",
+                    options=options,
+                    transport=ReplayTransport(recording, speed=math.inf),
+                )
+            ]
+            return live, replayed, recording
+
+        live, replayed, recording = anyio.run(_test)
+
+        assert replayed == live
+        assert [type(m) for m in live].count(AssistantMessage) == 3
+        assert isinstance(live[-1], ResultMessage)
+        assert recording.prompt == "hello"
+        assert {direction for _, direction, _ in recording.frames} == {"i"}
+
+    def test_responses_wait_for_sends(self, tmp_path):
+        """Test that frames recorded after a send are held until the replay sends."""
+        path = tmp_path / "session.jsonl"
+        user = {
+            "type": "user",
+            "message": {"role": "user", "content": "hi"},
+            "parent_tool_use_id": None,
+            "session_id": "default",
+        }
+
+        async def _idle():
+            return
+            yield {}
+
+        async def _test():
+            transport = RecordingTransport(
+                _idle(), fake_cli_options(), path, cli_path=fake_cli_launcher()
+            )
+            await transport.connect()
+            messages = transport.receive_messages()
+            # The fake CLI announces itself before any prompt arrives
+            assert (await messages.__anext__())["type"] == "system"
+            for _ in range(2):
+                await transport.send_request([user], {})
+                async for data in messages:
+                    if data["type"] == "result":
+                        break
+            await transport.disconnect()
+
+            replay = ReplayTransport(path, speed=math.inf)
+            await replay.connect()
+            received = []
+
+            async def consume():
+                async for data in replay.receive_messages():
+                    received.append(data["type"])
+
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(consume)
+                await anyio.sleep(0.05)
+                before_send = list(received)
+                await replay.send_request([user], {})
+                await anyio.sleep(0.05)
+                after_one = list(received)
+                await replay.send_request([user], {})
+            return before_send, after_one, received
+
+        before_send, after_one, received = anyio.run(_test)
+
+        assert before_send == ["system"]
+        assert after_one == ["system", "assistant", "result"]
+        assert received == ["system", "assistant", "result", "assistant", "result"]
+
+    def test_records_raw_frames_including_control_messages(self, tmp_path):
+        """Test that control requests and responses are recorded as exchanged."""
+        path = tmp_path / "session.jsonl.gz"
+        written_from = set()
+        encode = recording_module._encode_frame
+
+        def spy(*args):
+            written_from.add(threading.current_thread())
+            return encode(*args)
+
+        async def _idle():
+            await anyio.sleep_forever()
+            yield {}
+
+        async def _test():
+            transport = RecordingTransport(
+                _idle(), fake_cli_options(), path, cli_path=fake_cli_launcher()
+            )
+            await transport.connect()
+            async with anyio.create_task_group() as tg:
+
+                async def consume():
+                    async for _data in transport.receive_messages():
+                        pass
+
+                tg.start_soon(consume)
+                await transport.interrupt(timeout=5)
+                tg.cancel_scope.cancel()
+            await transport.disconnect()
+
+        with patch.object(recording_module, "_encode_frame", spy):
+            anyio.run(_test)
+
+        assert threading.main_thread() not in written_from
+        with gzip.open(path, "rt") as file:
+            raw = [json.loads(line) for line in file.readlines()[1:]]
+        sent = [json.loads(text) for _, direction, text in raw if direction == "o"]
+        assert sent[0]["type"] == "control_request"
+        request_id = sent[0]["request_id"]
+        assert request_id
+        output = "".join(text for _, direction, text in raw if direction == "i")
+        assert request_id in output
+        assert '"control_response"' in output
+
+        # Replays skip what the live transport consumed itself
+        loaded = TransportRecording.load(path)
+        types = [m["type"] for _, d, m in loaded.frames if d == "i"]
+        assert "control_response" in types
+
+        async def _replay():
+            replay = ReplayTransport(loaded, speed=math.inf)
+            await replay.connect()
+            received = []
+
+            async def consume():
+                async for data in replay.receive_messages():
+                    received.append(data["type"])
+
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(consume)
+                await replay.interrupt()
+            return received
+
+        assert anyio.run(_replay) == ["system"]
+
+    def test_load_reassembles_split_chunks(self, tmp_path):
+        """Test that stdout chunks cut mid-object and mid-character decode on load."""
+        path = tmp_path / "session.jsonl"
+        payload = json.dumps({"type": "system", "text": "olá"}, ensure_ascii=False)
+        data = (payload + "\n").encode()
+        cut = data.index("á".encode()) + 1
+        path.write_text(
+            json.dumps({"version": 2, "prompt": "hi"})
+            + "\n"
+            + recording_module._encode_frame(0.1, "i", data[:cut])
+            + recording_module._encode_frame(0.2, "i", data[cut:])
+        )
+
+        recording = TransportRecording.load(path)
+
+        assert recording.frames == [(0.2, "i", {"type": "system", "text": "olá"})]
+
+    def test_speed_scales_recorded_delays(self):
+        """Test that speed divides the recorded gaps between frames."""
+        recording = TransportRecording(
+            frames=[
+                (0.0, "i", {"type": "system", "subtype": "init"}),
+                (0.5, "i", {"type": "system", "subtype": "late"}),
+            ]
+        )
+
+        async def _test():
+            transport = ReplayTransport(recording, speed=10)
+            await transport.connect()
+            started = time.monotonic()
+            frames = [data async for data in transport.receive_messages()]
+            return time.monotonic() - started, frames
+
+        elapsed, frames = anyio.run(_test)
+
+        assert 0.04 <= elapsed < 0.4
+        assert [f["subtype"] for f in frames] == ["init", "late"]
@@ -0,0 +1,132 @@
+"""Tests for concurrent teardown of many CLI processes."""
+
+import sys
+import threading
+import time
+
+import anyio
+
+from src import ClaudeCodeOptions, close_all
+from src._internal.transport.subprocess_cli import SubprocessCLITransport
+
+_STUBBORN_CLI = f"""#!{sys.executable}
+import signal, sys, time
+if "--stubborn" in sys.argv:
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+print('{{"type": "system", "subtype": "init"}}', flush=True)
+time.sleep(30)
+"""
+
+
+async def _idle():
+    await anyio.sleep_forever()
+    yield {}
+
+
+async def _connect(cli, stubborn=False, **kwargs):
+    options = ClaudeCodeOptions(extra_args={"stubborn": None} if stubborn else {})
+    transport = SubprocessCLITransport(
+        prompt=_idle(), options=options, cli_path=cli, **kwargs
+    )
+    await transport.connect()
+    # Wait until the signal handler is installed
+    async for _message in transport.receive_messages():
+        break
+    return transport
+
+
+class TestCloseAll:
+    """Test close_all() and per-transport grace periods."""
+
+    def _cli(self, tmp_path):
+        script = tmp_path / "claude"
+        script.write_text(_STUBBORN_CLI)
+        script.chmod(0o755)
+        return script
+
+    def test_signals_and_kills_in_bulk(self, tmp_path):
+        """Test that teardown takes one grace period, not one per process."""
+        cli = self._cli(tmp_path)
+
+        async def _test():
+            transports = [await _connect(cli, stubborn=i % 2 == 0) for i in range(6)]
+            report = await close_all(transports, grace_period=0.3)
+
+            started = time.perf_counter()
+            for transport in reversed(transports):
+                await transport.disconnect()
+            return report, time.perf_counter() - started, transports
+
+        report, disconnect_time, transports = anyio.run(_test)
+
+        assert (report.processes, report.terminated, report.killed) == (6, 3, 3)
+        assert 0.3 <= report.duration < 1.5
+        assert disconnect_time < 0.5
+        assert not any(t.is_connected() for t in transports)
+
+    def test_uses_each_transports_grace(self, tmp_path):
+        """Test that without a shared grace_period each transport keeps its own."""
+        cli = self._cli(tmp_path)
+
+        async def _test():
+            quick = await _connect(cli, stubborn=True, grace_period=0.1)
+            slow = await _connect(cli, stubborn=True, grace_period=0.6)
+            report = await close_all([quick, slow])
+            quick_code = quick._process.returncode
+            await slow.disconnect()
+            await quick.disconnect()
+            return report, quick_code
+
+        report, quick_code = anyio.run(_test)
+
+        assert report.processes == 2
+        assert report.killed == 2
+        assert quick_code is not None
+        assert 0.6 <= report.duration < 1.5
+
+    def test_defaults_to_transports_of_the_running_loop(self, tmp_path):
+        """Test that close_all() leaves transports of other event loops alone."""
+        cli = self._cli(tmp_path)
+        connected = threading.Event()
+        release = threading.Event()
+        foreign = []
+
+        async def _other_loop():
+            foreign.append(await _connect(cli))
+            connected.set()
+            await anyio.to_thread.run_sync(release.wait)
+            await foreign[0].disconnect()
+
+        thread = threading.Thread(target=anyio.run, args=(_other_loop,))
+        thread.start()
+
+        async def _test():
+            await anyio.to_thread.run_sync(connected.wait)
+            own = await _connect(cli)
+            try:
+                report = await close_all(grace_period=1.0)
+                return report, own._process.returncode, foreign[0].is_connected()
+            finally:
+                await own.disconnect()
+
+        try:
+            report, own_code, foreign_connected = anyio.run(_test)
+        finally:
+            release.set()
+            thread.join()
+
+        assert report.processes >= 1
+        assert own_code is not None
+        assert foreign_connected
+
+    def test_disconnect_uses_grace_period(self, tmp_path):
+        """Test that disconnect() escalates to SIGKILL after grace_period."""
+        cli = self._cli(tmp_path)
+
+        async def _test():
+            transport = await _connect(cli, stubborn=True, grace_period=0.2)
+            started = time.perf_counter()
+            await transport.disconnect()
+            return time.perf_counter() - started
+
+        assert anyio.run(_test) < 1.5
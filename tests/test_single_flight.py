@@ -0,0 +1,110 @@
+"""Tests for single-flight deduplication of identical queries."""
+
+from unittest.mock import patch
+
+import anyio
+
+from src import (
+    AssistantMessage,
+    ClaudeCodeOptions,
+    ResultMessage,
+    SingleFlight,
+    TextBlock,
+    query,
+)
+
+
+class TestSingleFlight:
+    """Test sharing one CLI run between concurrent identical queries."""
+
+    def test_concurrent_identical_queries_share_one_run(self):
+        """Test that every caller sees the full stream from a single run."""
+
+        async def _test():
+            calls = 0
+            release = anyio.Event()
+
+            async def fake_process_query(
+                prompt, options, transport=None, message_types=None
+            ):
+                nonlocal calls
+                calls += 1
+                yield AssistantMessage(
+                    content=[TextBlock(text="shared")], model="claude-opus-4-1-20250805"
+                )
+                await release.wait()
+                yield ResultMessage(
+                    subtype="success",
+                    duration_ms=1,
+                    duration_api_ms=1,
+                    is_error=False,
+                    num_turns=1,
+                    session_id="s",
+                )
+
+            results = {}
+
+            async def caller(name, prompt):
+                results[name] = [
+                    m async for m in query(prompt=prompt, single_flight=flights)
+                ]
+
+            with patch(
+                "src._internal.client.InternalClient.process_query",
+                side_effect=fake_process_query,
+            ):
+                async with SingleFlight() as flights, anyio.create_task_group() as tg:
+                    for name in ("a", "b", "c"):
+                        tg.start_soon(caller, name, "same prompt")
+                    tg.start_soon(caller, "other", "different prompt")
+                    await anyio.wait_all_tasks_blocked()
+                    assert flights.in_flight == 2
+                    release.set()
+
+            assert calls == 2
+            assert flights.started == 2
+            assert flights.joined == 2
+            assert results["a"] == results["b"] == results["c"]
+            assert isinstance(results["a"][-1], ResultMessage)
+            assert flights.in_flight == 0
+
+        anyio.run(_test)
+
+    def test_run_cancelled_when_all_callers_leave(self):
+        """Test that the shared run stops once nobody is consuming it."""
+
+        async def _test():
+            cleaned_up = anyio.Event()
+
+            async def fake_process_query(
+                prompt, options, transport=None, message_types=None
+            ):
+                try:
+                    yield AssistantMessage(
+                        content=[TextBlock(text="first")],
+                        model="claude-opus-4-1-20250805",
+                    )
+                    await anyio.sleep_forever()
+                finally:
+                    cleaned_up.set()
+
+            async def first_message():
+                async for message in query(
+                    prompt="p", options=ClaudeCodeOptions(), single_flight=flights
+                ):
+                    return message
+
+            with patch(
+                "src._internal.client.InternalClient.process_query",
+                side_effect=fake_process_query,
+            ):
+                async with SingleFlight() as flights:
+                    async with anyio.create_task_group() as tg:
+                        tg.start_soon(first_message)
+                        tg.start_soon(first_message)
+
+                    with anyio.fail_after(1):
+                        await cleaned_up.wait()
+                    assert flights.in_flight == 0
+
+        anyio.run(_test)
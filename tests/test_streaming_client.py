@@ -15,6 +15,7 @@ from src import (
     ClaudeSDKClient,
     CLIConnectionError,
     ResultMessage,
+    StreamEvent,
     TextBlock,
     UserMessage,
     query,
@@ -571,3 +572,131 @@ class TestClaudeSDKClientEdgeCases:
                     assert isinstance(messages[-1], ResultMessage)
 
         anyio.run(_test)
+
+
+def _text_delta_event(text):
+    return {
+        "type": "stream_event",
+        "uuid": "evt",
+        "session_id": "test",
+        "event": {
+            "type": "content_block_delta",
+            "index": 0,
+            "delta": {"type": "text_delta", "text": text},
+        },
+    }
+
+
+_ASSISTANT_HELLO = {
+    "type": "assistant",
+    "message": {
+        "role": "assistant",
+        "content": [{"type": "text", "text": "Hello world"}],
+        "model": "claude-opus-4-1-20250805",
+    },
+}
+
+_RESULT = {
+    "type": "result",
+    "subtype": "success",
+    "duration_ms": 1000,
+    "duration_api_ms": 800,
+    "is_error": False,
+    "num_turns": 1,
+    "session_id": "test",
+}
+
+
+class TestReceiveText:
+    """Test incremental text streaming and time-to-first-token."""
+
+    def _run_client(self, raw_messages, check):
+        async def _test():
+            with patch(
+                "src._internal.transport.subprocess_cli.SubprocessCLITransport"
+            ) as mock_transport_class:
+                mock_transport = AsyncMock()
+                mock_transport_class.return_value = mock_transport
+
+                async def mock_receive():
+                    for data in raw_messages:
+                        await anyio.sleep(0.01)
+                        yield data
+
+                mock_transport.receive_messages = mock_receive
+
+                async with ClaudeSDKClient() as client:
+                    await client.query("Say hello")
+                    texts = [text async for text in client.receive_text()]
+                    check(client, texts)
+
+        anyio.run(_test)
+
+    def test_yields_deltas_without_duplicating_final_message(self):
+        """Test that deltas are yielded and the full message is not repeated."""
+        raw = [
+            {
+                "type": "stream_event",
+                "uuid": "start",
+                "session_id": "test",
+                "event": {"type": "message_start", "message": {}},
+            },
+            _text_delta_event("Hello"),
+            _text_delta_event(" world"),
+            _ASSISTANT_HELLO,
+            _RESULT,
+        ]
+
+        def check(client, texts):
+            assert texts == ["Hello", " world"]
+            timing = client.last_timing
+            assert timing is not None
+            # The first token is the first delta, not the message_start event
+            assert 0.015 < timing.time_to_first_token < timing.duration
+
+        self._run_client(raw, check)
+
+    def test_falls_back_to_whole_text_blocks(self):
+        """Test text streaming when partial messages are not enabled."""
+
+        def check(client, texts):
+            assert texts == ["Hello world"]
+            assert client.last_timing.time_to_first_token is not None
+
+        self._run_client([_ASSISTANT_HELLO, _RESULT], check)
+
+    def test_timing_leaves_lazy_content_unparsed(self):
+        """Test that time-to-first-token does not parse lazy content blocks."""
+
+        async def _test():
+            with patch(
+                "src._internal.transport.subprocess_cli.SubprocessCLITransport"
+            ) as mock_transport_class:
+                mock_transport = AsyncMock()
+                mock_transport_class.return_value = mock_transport
+
+                async def mock_receive():
+                    for data in [_ASSISTANT_HELLO, _RESULT]:
+                        await anyio.sleep(0.01)
+                        yield data
+
+                mock_transport.receive_messages = mock_receive
+
+                options = ClaudeCodeOptions(lazy_content=True)
+                async with ClaudeSDKClient(options) as client:
+                    await client.query("Say hello")
+                    messages = [m async for m in client.receive_response()]
+
+            assert not messages[0].content.materialized
+            assert client.last_timing.time_to_first_token is not None
+
+        anyio.run(_test)
+
+    def test_stream_event_parsing(self):
+        """Test that stream_event messages become StreamEvent objects."""
+        from src._internal.message_parser import parse_message
+
+        message = parse_message(_text_delta_event("Hi"))
+        assert isinstance(message, StreamEvent)
+        assert message.event["delta"]["text"] == "Hi"
+        assert message.parent_tool_use_id is None
@@ -9,9 +9,14 @@ import anyio
 import pytest
 
 from src._errors import CLIJSONDecodeError
+from src._internal.transport.json_framing import (
+    JSONFrameDecoder,
+    resolve_json_loads,
+)
 from src._internal.transport.subprocess_cli import (
     _MAX_BUFFER_SIZE,
     SubprocessCLITransport,
+    _StderrBuffer,
 )
 from src.sdk_types import ClaudeCodeOptions
 
@@ -305,3 +310,162 @@ class TestSubprocessBuffering:
             assert messages[2]["subtype"] == "end"
 
         anyio.run(_test)
+
+
+class TestJSONFrameDecoder:
+    """Test the incremental framing decoder used by the transport."""
+
+    def test_concatenated_objects_without_separator(self) -> None:
+        """Objects written back to back on one line are split with raw_decode."""
+        decoder = JSONFrameDecoder()
+
+        objects = decoder.feed('{"a": 1}{"b": 2} {"c": 3}\n')
+
+        assert objects == [{"a": 1}, {"b": 2}, {"c": 3}]
+
+    def test_object_spanning_lines(self) -> None:
+        """A pretty-printed object is accumulated until it decodes."""
+        decoder = JSONFrameDecoder()
+
+        assert decoder.feed('{\n  "type": "system",\n') == []
+        assert decoder.feed('  "subtype": "init"\n}\n') == [
+            {"type": "system", "subtype": "init"}
+        ]
+
+    def test_partial_chunks_are_not_reparsed(self) -> None:
+        """Each frame is decoded once, however many chunks it arrives in."""
+        payload = json.dumps({"type": "user", "content": "x" * 200_000}) + "\n"
+        chunks = [payload[i : i + 1000] for i in range(0, len(payload), 1000)]
+        loads = MagicMock(wraps=json.loads)
+        decoder = JSONFrameDecoder(loads=loads)
+
+        objects = [obj for chunk in chunks for obj in decoder.feed(chunk)]
+
+        assert len(objects) == 1
+        assert loads.call_count == 1
+
+    def test_wanted_types_skip_lines_without_decoding(self) -> None:
+        """Unwanted lines are dropped before the JSON decoder sees them."""
+        loads = MagicMock(wraps=json.loads)
+        decoder = JSONFrameDecoder(loads=loads)
+        decoder.wanted_types = frozenset({b"result"})
+
+        objects = decoder.feed(
+            '{"type": "system", "subtype": "init"}\n'
+            '{"type":"user","message":{"content":[{"type":"result"}]}}\n'
+            '{"subtype": "success", "type": "result"}\n'
+            '{"type": "result", "subtype": "success"}\n'
+        )
+
+        # A type that is not the first key cannot be peeked and is decoded
+        assert objects == [
+            {"subtype": "success", "type": "result"},
+            {"type": "result", "subtype": "success"},
+        ]
+        assert decoder.skipped == 2
+        assert loads.call_count == 2
+
+    def test_wanted_types_keep_concatenated_objects(self) -> None:
+        """A line holding several objects is not skipped on its first type."""
+        decoder = JSONFrameDecoder()
+        decoder.wanted_types = frozenset({b"result"})
+
+        objects = decoder.feed(b'{"type":"user","a":1}{"type":"result","b":2}\n')
+
+        # Unwanted objects decoded along the way are left to the caller
+        assert objects == [{"type": "user", "a": 1}, {"type": "result", "b": 2}]
+        assert decoder.skipped == 0
+
+    def test_wanted_types_keep_objects_spanning_lines(self) -> None:
+        """A skipped line that starts a longer object is joined with the next."""
+        decoder = JSONFrameDecoder()
+        decoder.wanted_types = frozenset({b"result"})
+
+        objects = decoder.feed(
+            b'{"type":"user","message":{"a":1}\n}\n{"type":"result","x":1}\n'
+        )
+
+        assert objects == [
+            {"type": "user", "message": {"a": 1}},
+            {"type": "result", "x": 1},
+        ]
+        assert decoder.skipped == 0
+
+        # A later skip is not joined with lines that decode on their own
+        objects = decoder.feed(b'{"type":"user"}\n{"type":"result","y":2}\n')
+        assert objects == [{"type": "result", "y": 2}]
+        assert decoder.skipped == 1
+
+    def test_multibyte_character_split_across_chunks(self) -> None:
+        """Bytes are only decoded once a full frame is available."""
+        payload = json.dumps({"text": "olá ✓"}, ensure_ascii=False).encode() + b"\n"
+        split = payload.index("✓".encode()) + 1
+        decoder = JSONFrameDecoder()
+
+        assert decoder.feed(payload[:split]) == []
+        assert decoder.feed(payload[split:]) == [{"text": "olá ✓"}]
+
+    def test_resolve_json_loads(self) -> None:
+        """Test selecting the JSON backend."""
+
+        def custom(data: bytes) -> Any:
+            return {"custom": True}
+
+        assert resolve_json_loads("json")(b'{"a": 1}') == {"a": 1}
+        assert resolve_json_loads(custom) is custom
+        assert resolve_json_loads("auto")(b'{"a": 1}') == {"a": 1}
+        with pytest.raises(ValueError):
+            resolve_json_loads("yaml")
+
+    def test_custom_decoder_receives_bytes(self) -> None:
+        """A decoder typed for bytes is never handed the internal bytearray."""
+        seen: list[type] = []
+
+        def loads(data: bytes) -> Any:
+            seen.append(type(data))
+            return json.loads(data)
+
+        decoder = JSONFrameDecoder(loads=loads)
+
+        assert decoder.feed(b'{"a": 1}\n{"b"') == [{"a": 1}]
+        assert decoder.feed(b": 2}\n") == [{"b": 2}]
+        assert seen == [bytes, bytes]
+
+    def test_flush_decodes_unterminated_tail(self) -> None:
+        """The last object does not need a trailing newline."""
+        decoder = JSONFrameDecoder()
+
+        assert decoder.feed('{"a": 1}\n{"b"') == [{"a": 1}]
+        assert decoder.feed(": 2}") == []
+        assert decoder.flush() == [{"b": 2}]
+
+
+class TestStderrBuffer:
+    """Test the bounded stderr ring buffer."""
+
+    def test_byte_cap_drops_oldest_lines(self) -> None:
+        """Lines are dropped from the front once the size cap is exceeded."""
+        buffer = _StderrBuffer(max_lines=100, max_bytes=10)
+
+        for line in ["aaaa", "bbbb", "cccc"]:
+            buffer.append(line)
+
+        assert buffer.render() == (
+            "[stderr truncated, showing last 2 lines]\nbbbb\ncccc"
+        )
+
+    def test_untruncated_output(self) -> None:
+        """Nothing is prefixed while every line fits."""
+        buffer = _StderrBuffer()
+        buffer.append("only line")
+
+        assert buffer.render() == "only line"
+
+    def test_byte_cap_counts_encoded_bytes(self) -> None:
+        """The size cap is measured in UTF-8 bytes, not characters."""
+        buffer = _StderrBuffer(max_lines=100, max_bytes=10)
+
+        buffer.append("éééé")
+        buffer.append("ffff")
+
+        assert buffer.render() == "[stderr truncated, showing last 1 lines]\nffff"
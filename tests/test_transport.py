@@ -1,5 +1,6 @@
 """Tests for Claude SDK transport layer."""
 
+import json
 import os
 import uuid
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -230,6 +231,19 @@ class TestSubprocessCLITransport:
         # Either it's the last element or the next element is another flag
         assert boolean_idx == len(cmd) - 1 or cmd[boolean_idx + 1].startswith("--")
 
+    def test_build_command_with_partial_messages(self):
+        """Test that include_partial_messages adds the CLI flag exactly once."""
+        for extra_args in ({}, {"include-partial-messages": None}):
+            transport = SubprocessCLITransport(
+                prompt="test",
+                options=ClaudeCodeOptions(
+                    include_partial_messages=True, extra_args=extra_args
+                ),
+                cli_path="/usr/bin/claude",
+            )
+            cmd = transport._build_command()
+            assert cmd.count("--include-partial-messages") == 1
+
     def test_build_command_with_mcp_servers(self):
         """Test building CLI command with mcp_servers option."""
         import json
@@ -352,3 +366,329 @@ class TestSubprocessCLITransport:
                     assert env_passed["PATH"] == os.environ["PATH"]
 
         anyio.run(_test)
+
+    def test_control_request_resolved_by_reader(self):
+        """Test that a control response wakes the waiting request immediately."""
+
+        async def _test():
+            async def _empty():
+                return
+                yield {}
+
+            transport = SubprocessCLITransport(
+                prompt=_empty(), options=ClaudeCodeOptions(), cli_path="/usr/bin/claude"
+            )
+            sent = []
+            transport._stdin_stream = MagicMock()
+            transport._stdin_stream.send = AsyncMock(side_effect=sent.append)
+
+            async def _respond():
+                await anyio.wait_all_tasks_blocked()
+                request_id = json.loads(sent[0])["request_id"]
+                transport._handle_control_response(
+                    {
+                        "type": "control_response",
+                        "response": {"request_id": request_id, "subtype": "success"},
+                    }
+                )
+
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(_respond)
+                with anyio.fail_after(1):
+                    response = await transport._send_control_request(
+                        {"subtype": "interrupt"}
+                    )
+
+            assert response["subtype"] == "success"
+            assert transport._pending_control_requests == {}
+
+        anyio.run(_test)
+
+    def test_control_request_timeout_cleans_up(self):
+        """Test that an unanswered control request times out and is removed."""
+        from src._errors import CLIConnectionError
+
+        async def _test():
+            async def _empty():
+                return
+                yield {}
+
+            transport = SubprocessCLITransport(
+                prompt=_empty(),
+                options=ClaudeCodeOptions(),
+                cli_path="/usr/bin/claude",
+                control_request_timeout=0.01,
+            )
+            transport._stdin_stream = MagicMock()
+            transport._stdin_stream.send = AsyncMock()
+
+            with pytest.raises(CLIConnectionError, match="timed out"):
+                await transport.interrupt()
+
+            assert transport._pending_control_requests == {}
+
+            # A late response for the abandoned request is dropped
+            assert transport._handle_control_response(
+                {"type": "control_response", "response": {"request_id": "req_1"}}
+            )
+            assert transport._pending_control_requests == {}
+
+        anyio.run(_test)
+
+    def test_stderr_pipe_mode_captures_tail_and_streams_lines(self, tmp_path):
+        """Test that pipe mode keeps a bounded stderr tail and calls the callback."""
+        from src._errors import ProcessError
+
+        script = tmp_path / "claude"
+        script.write_text(
+            "#!/bin/sh\n"
+            'for i in $(seq 1 150); do echo "warning $i" >&2; done\n'
+            'echo \'{"type": "system", "subtype": "init"}\'\n'
+            "exit 3\n"
+        )
+        script.chmod(0o755)
+        streamed = []
+
+        async def _test():
+            transport = SubprocessCLITransport(
+                prompt="test",
+                options=ClaudeCodeOptions(stderr=streamed.append),
+                cli_path=script,
+            )
+            await transport.connect()
+            assert transport._stderr_file is None
+
+            messages = []
+            with pytest.raises(ProcessError) as exc_info:
+                async for msg in transport.receive_messages():
+                    messages.append(msg)
+            await transport.disconnect()
+
+            assert messages == [{"type": "system", "subtype": "init"}]
+            assert exc_info.value.exit_code == 3
+            stderr_lines = exc_info.value.stderr.split("\n")
+            assert stderr_lines[0] == "[stderr truncated, showing last 100 lines]"
+            assert stderr_lines[1] == "warning 51"
+            assert stderr_lines[-1] == "warning 150"
+
+        anyio.run(_test)
+
+        assert len(streamed) == 150
+        assert streamed[0] == "warning 1"
+
+    def test_stderr_without_newlines_stays_bounded(self, tmp_path):
+        """Test that a stderr stream that never ends a line is capped."""
+        from src._errors import ProcessError
+
+        script = tmp_path / "claude"
+        script.write_text(
+            "#!/bin/sh\n"
+            "head -c 300000 /dev/zero | tr '\\0' x >&2\n"
+            "exit 3\n"
+        )
+        script.chmod(0o755)
+
+        async def _test():
+            transport = SubprocessCLITransport(
+                prompt="test",
+                options=ClaudeCodeOptions(stderr_mode="pipe"),
+                cli_path=script,
+            )
+            await transport.connect()
+            with pytest.raises(ProcessError) as exc_info:
+                async for _msg in transport.receive_messages():
+                    pass
+            await transport.disconnect()
+
+            stderr = exc_info.value.stderr
+            assert stderr.startswith("x")
+            assert len(stderr.encode()) <= 64 * 1024
+
+        anyio.run(_test)
+
+    def test_receive_messages_filters_by_type(self, tmp_path):
+        """Test that unwanted message types are skipped before decoding."""
+        script = tmp_path / "claude"
+        script.write_text(
+            "#!/bin/sh\n"
+            'echo \'{"type": "system", "subtype": "init"}\'\n'
+            'echo \'{"type": "user", "message": {"content": "x"}}\'\n'
+            'echo \'{"type": "assistant", "message": {"content": []}}\'\n'
+            'echo \'{"type": "result", "subtype": "success"}\'\n'
+        )
+        script.chmod(0o755)
+
+        async def _test():
+            transport = SubprocessCLITransport(
+                prompt="test", options=ClaudeCodeOptions(), cli_path=script
+            )
+            await transport.connect()
+            messages = [
+                msg
+                async for msg in transport.receive_messages(
+                    message_types={"assistant", "result"}
+                )
+            ]
+            await transport.disconnect()
+
+            assert [m["type"] for m in messages] == ["assistant", "result"]
+            assert transport.skipped_messages == 2
+
+        anyio.run(_test)
+
+    def test_disconnect_from_cancelled_scope_reaps_process(self, echo_cli):
+        """Test that a caller being cancelled still tears the process down."""
+
+        async def _idle():
+            await anyio.sleep_forever()
+            yield {}
+
+        async def _test():
+            transport = SubprocessCLITransport(
+                prompt=_idle(), options=ClaudeCodeOptions(), cli_path=echo_cli
+            )
+            with anyio.CancelScope() as scope:
+                await transport.connect()
+                process = transport._process
+                scope.cancel()
+                try:
+                    await anyio.sleep_forever()
+                finally:
+                    await transport.disconnect()
+
+            assert process.returncode is not None
+            assert transport._task_group is None
+            assert not transport.is_connected()
+
+        anyio.run(_test)
+
+    def test_large_arguments_passed_as_files(self, tmp_path):
+        """Test that oversized prompts and MCP config go to shared files."""
+        from pathlib import Path
+
+        servers = {"big": {"command": "x" * 200}}
+        options = ClaudeCodeOptions(
+            system_prompt="s" * 300,
+            append_system_prompt="short",
+            mcp_servers=servers,
+            arg_file_threshold=100,
+        )
+        with patch("src._internal.transport.arg_files._directory", tmp_path):
+            cmd = SubprocessCLITransport(
+                prompt="hi", options=options, cli_path="/usr/bin/claude"
+            )._build_command()
+
+            assert "--system-prompt" not in cmd
+            prompt_file = Path(cmd[cmd.index("--system-prompt-file") + 1])
+            assert prompt_file.parent == tmp_path
+            assert prompt_file.read_text() == "s" * 300
+            assert cmd[cmd.index("--append-system-prompt") + 1] == "short"
+            mcp_file = Path(cmd[cmd.index("--mcp-config") + 1])
+            assert json.loads(mcp_file.read_text()) == {"mcpServers": servers}
+
+            # Same content, same file; removed files are written again
+            other = ClaudeCodeOptions(system_prompt="s" * 300, arg_file_threshold=100)
+            transport = SubprocessCLITransport(
+                prompt="hi", options=other, cli_path="/usr/bin/claude"
+            )
+            assert str(prompt_file) in transport._build_command()
+            prompt_file.unlink()
+            assert str(prompt_file) in transport._build_command()
+            assert prompt_file.read_text() == "s" * 300
+
+    def test_argument_file_directory_is_private(self, tmp_path):
+        """Test that argument files go to a fresh directory only we can read."""
+        import shutil
+        import stat
+        from pathlib import Path
+
+        from src._internal.transport import arg_files
+
+        with (
+            patch.object(arg_files, "_directory", None),
+            patch("tempfile.tempdir", str(tmp_path)),
+        ):
+            path = Path(arg_files.write_arg_file("s" * 300, ".txt"))
+            directory = path.parent
+            assert directory.parent == tmp_path
+            info = directory.stat()
+            assert info.st_uid == os.getuid()
+            assert stat.S_IMODE(info.st_mode) == 0o700
+
+            # Recreated under a new name if something deletes it
+            shutil.rmtree(directory)
+            assert Path(arg_files.write_arg_file("s", ".txt")).parent != directory
+
+    def test_default_threshold_only_spills_what_argv_rejects(self, tmp_path):
+        """Test that values under the 128 KiB argument limit stay inline."""
+        inline = ClaudeCodeOptions(system_prompt="s" * 100_000)
+        cmd = SubprocessCLITransport(
+            prompt="hi", options=inline, cli_path="/usr/bin/claude"
+        )._build_command()
+        assert cmd[cmd.index("--system-prompt") + 1] == "s" * 100_000
+
+        spilled = ClaudeCodeOptions(system_prompt="s" * 200_000)
+        with patch("src._internal.transport.arg_files._directory", tmp_path):
+            cmd = SubprocessCLITransport(
+                prompt="hi", options=spilled, cli_path="/usr/bin/claude"
+            )._build_command()
+        assert "--system-prompt-file" in cmd
+
+    def test_prompt_files_refused_by_old_cli(self, tmp_path):
+        """Test that connect() fails clearly when the CLI lacks the file flags."""
+        from src._errors import CLIConnectionError
+        from src._internal.bench import fake_cli_launcher
+
+        options = ClaudeCodeOptions(system_prompt="s" * 300, arg_file_threshold=100)
+        transport = SubprocessCLITransport(
+            prompt="hi", options=options, cli_path=fake_cli_launcher()
+        )
+
+        async def _test():
+            with (
+                patch("src._internal.transport.arg_files._directory", tmp_path),
+                pytest.raises(CLIConnectionError, match="--system-prompt-file"),
+            ):
+                await transport.connect()
+            assert not transport.is_connected()
+            assert list(tmp_path.iterdir()) == []
+
+        anyio.run(_test)
+
+    def test_prompt_files_used_by_new_cli(self, tmp_path):
+        """Test that connect() passes prompt files once the version allows it."""
+        from src._internal.bench import fake_cli_launcher
+
+        options = ClaudeCodeOptions(
+            append_system_prompt="s" * 300, arg_file_threshold=100
+        )
+        transport = SubprocessCLITransport(
+            prompt="hi", options=options, cli_path=fake_cli_launcher()
+        )
+
+        async def _test():
+            with (
+                patch("src._internal.transport.arg_files._directory", tmp_path),
+                patch(
+                    "src._internal.transport.subprocess_cli.default_resolver.version",
+                    AsyncMock(return_value="2.0.0"),
+                ),
+            ):
+                await transport.connect()
+            try:
+                async for _data in transport.receive_messages():
+                    pass
+            finally:
+                await transport.disconnect()
+            assert len(list(tmp_path.iterdir())) == 1
+
+        anyio.run(_test)
+
+    def test_large_arguments_inline_when_disabled(self):
+        """Test that arg_file_threshold=None keeps every value in argv."""
+        options = ClaudeCodeOptions(system_prompt="s" * 100_000, arg_file_threshold=None)
+        cmd = SubprocessCLITransport(
+            prompt="hi", options=options, cli_path="/usr/bin/claude"
+        )._build_command()
+
+        assert cmd[cmd.index("--system-prompt") + 1] == "s" * 100_000
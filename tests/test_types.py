@@ -1,10 +1,20 @@
 """Tests for Claude SDK type definitions."""
 
+import copy
+import subprocess
+import sys
+import tracemalloc
+from dataclasses import fields, make_dataclass
+from pathlib import Path
+from unittest.mock import patch
+
 from src import (
     AssistantMessage,
     ClaudeCodeOptions,
     ResultMessage,
 )
+from src._internal.message_parser import parse_message
+from src._internal.options_key import query_key
 from src.sdk_types import (
     TextBlock,
     ThinkingBlock,
@@ -130,3 +140,183 @@ class TestOptions:
         )
         assert options.model == "claude-3-5-sonnet-20241022"
         assert options.permission_prompt_tool_name == "CustomTool"
+
+
+class TestOptionsFingerprint:
+    """Test the cached snapshot and fingerprint of ClaudeCodeOptions."""
+
+    def test_equal_invocations_share_a_fingerprint(self):
+        """Test that only fields affecting the CLI invocation matter."""
+        base = ClaudeCodeOptions(
+            model="sonnet", env={"A": "1", "B": "2"}, cwd=Path("/tmp")
+        )
+        same = ClaudeCodeOptions(
+            model="sonnet",
+            env={"B": "2", "A": "1"},
+            cwd="/tmp",
+            max_thinking_tokens=1,
+            lazy_content=True,
+            json_decoder="json",
+            stderr=print,
+        )
+
+        assert same.fingerprint() == base.fingerprint()
+        assert same.snapshot() == base.snapshot()
+        assert hash(same.snapshot()) == hash(base.snapshot())
+        assert ClaudeCodeOptions(model="opus").fingerprint() != base.fingerprint()
+
+    def test_cached_until_a_field_is_assigned(self):
+        """Test that the fingerprint is computed once per set of field values."""
+        options = ClaudeCodeOptions(allowed_tools=["Read"])
+        first = options.fingerprint()
+        with patch("src._internal.options_key.options_snapshot") as snapshot:
+            assert options.fingerprint() == first
+        assert not snapshot.called
+
+        options.allowed_tools = ["Read", "Write"]
+        assert options.fingerprint() != first
+        options.allowed_tools = ["Read"]
+        assert options.fingerprint() == first
+
+    def test_in_place_edits_change_the_fingerprint(self):
+        """Test that mutating a list or dict field is not hidden by the cache."""
+        options = ClaudeCodeOptions(
+            allowed_tools=["Read"], mcp_servers={"s": {"command": "x"}}
+        )
+        first = options.fingerprint()
+        key = query_key("hi", options)
+
+        options.allowed_tools.append("Write")
+        assert options.fingerprint() != first
+        assert query_key("hi", options) != key
+        assert options.snapshot() == ClaudeCodeOptions(
+            allowed_tools=["Read", "Write"], mcp_servers={"s": {"command": "x"}}
+        ).snapshot()
+
+        options.allowed_tools.pop()
+        assert options.fingerprint() == first
+        options.mcp_servers["s"]["args"] = ["-y"]  # type: ignore[index]
+        assert options.fingerprint() != first
+        assert query_key("hi", options) != key
+
+    def test_copies_do_not_share_the_cache(self):
+        """Test that a copied options object computes its own fingerprint."""
+        options = ClaudeCodeOptions(model="sonnet")
+        first = options.fingerprint()
+
+        clone = copy.copy(options)
+        clone.model = "opus"
+        assert clone.fingerprint() != first
+        assert options.fingerprint() == first
+
+    def test_stable_across_processes(self):
+        """Test that a fresh interpreter computes the same fingerprint."""
+        options = ClaudeCodeOptions(
+            model="sonnet", mcp_servers={"s": {"command": "x", "args": ["-y"]}}
+        )
+        code = (
+            "from src import ClaudeCodeOptions; print(ClaudeCodeOptions(model='sonnet',"
+            " mcp_servers={'s': {'command': 'x', 'args': ['-y']}}).fingerprint())"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent.parent,
+            env={"PYTHONHASHSEED": "123"},
+        )
+        assert output.stdout.strip() == options.fingerprint()
+
+
+def _unslotted(cls: type) -> type:
+    """Build a plain (dict-backed) dataclass with the same fields as cls."""
+    return make_dataclass(
+        f"Unslotted{cls.__name__}", [(f.name, f.type, f) for f in fields(cls)]
+    )
+
+
+def _bytes_per_instance(factory, count: int = 2000) -> float:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        instances = [factory(i) for i in range(count)]
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    assert len(instances) == count
+    return allocated / count
+
+
+class TestMessageMemory:
+    """Test the memory footprint of message and block instances."""
+
+    def test_messages_and_blocks_are_slotted(self):
+        """Test that instances carry no per-instance __dict__."""
+        instances = [
+            TextBlock(text="t"),
+            ThinkingBlock(thinking="t", signature="s"),
+            ToolUseBlock(id="1", name="Read", input={}),
+            ToolResultBlock(tool_use_id="1"),
+            UserMessage(content="hi"),
+            AssistantMessage(content=[], model="m"),
+            ResultMessage(
+                subtype="success",
+                duration_ms=1,
+                duration_api_ms=1,
+                is_error=False,
+                num_turns=1,
+                session_id="s",
+            ),
+        ]
+        for instance in instances:
+            assert not hasattr(instance, "__dict__"), type(instance).__name__
+
+    def test_slotted_result_message_uses_less_memory(self):
+        """Test bytes per ResultMessage against an equivalent unslotted class."""
+        def make(cls):
+            return lambda i: cls(
+                subtype="success",
+                duration_ms=i,
+                duration_api_ms=i,
+                is_error=False,
+                num_turns=1,
+                session_id="s",
+            )
+
+        slotted_bytes = _bytes_per_instance(make(ResultMessage))
+        unslotted_bytes = _bytes_per_instance(make(_unslotted(ResultMessage)))
+        assert slotted_bytes < unslotted_bytes
+
+    def test_text_block_is_smaller_than_unslotted(self):
+        """Test bytes per TextBlock against an equivalent unslotted class."""
+        unslotted = _unslotted(TextBlock)
+        slotted_bytes = _bytes_per_instance(lambda i: TextBlock(text="x"))
+        unslotted_bytes = _bytes_per_instance(lambda i: unslotted(text="x"))
+        assert slotted_bytes < unslotted_bytes
+
+    def test_parser_interns_repeated_strings(self):
+        """Test that model and tool names share one string object."""
+
+        def raw():
+            # Build fresh strings so equality is not identity by accident
+            return {
+                "type": "assistant",
+                "message": {
+                    "model": "".join(["claude-", "opus"]),
+                    "content": [
+                        {
+                            "type": "tool_use",
+                            "id": "t",
+                            "name": "".join(["Re", "ad"]),
+                            "input": {},
+                        }
+                    ],
+                },
+            }
+
+        first = parse_message(raw())
+        second = parse_message(raw())
+        assert first.model is second.model
+        assert first.content[0].name is second.content[0].name